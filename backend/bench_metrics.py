@@ -0,0 +1,87 @@
+"""Benchmark the per-request and per-command cost of metrics collection.
+
+Drives a one-route FastAPI app directly through its ASGI interface, with and
+without MetricsMiddleware, so the difference is the middleware alone. Also
+times the command listener callbacks and a scrape of the rendered text:
+
+    python bench_metrics.py [requests]
+"""
+import asyncio
+import sys
+import time
+from types import SimpleNamespace
+
+from fastapi import FastAPI
+
+from metrics import CommandMetrics, MetricsMiddleware, RequestMetrics, exposition
+
+def build_app(with_metrics: bool) -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/api/customers/{customer_id}")
+    async def get_customer(customer_id: str):
+        return {"id": customer_id}
+
+    if with_metrics:
+        app.add_middleware(MetricsMiddleware, metrics=RequestMetrics())
+    return app
+
+async def drive(app: FastAPI, requests: int) -> float:
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        pass
+
+    def scope(i: int) -> dict:
+        return {
+            "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET",
+            "scheme": "http", "path": f"/api/customers/{i}", "raw_path": f"/api/customers/{i}".encode(),
+            "query_string": b"", "root_path": "", "headers": [], "server": ("test", 80), "client": ("test", 1),
+        }
+
+    for i in range(100):
+        await app(scope(i), receive, send)
+    start = time.perf_counter()
+    for i in range(requests):
+        await app(scope(i), receive, send)
+    return time.perf_counter() - start
+
+def bench_listener(commands: int) -> float:
+    listener = CommandMetrics()
+    started = SimpleNamespace(command_name="find", command={"find": "customers", "filter": {}}, connection_id=("db", 27017))
+    finished = SimpleNamespace(command_name="find", connection_id=("db", 27017), duration_micros=850)
+    start = time.perf_counter()
+    for i in range(commands):
+        started.request_id = finished.request_id = i
+        listener.started(started)
+        listener.succeeded(finished)
+    return time.perf_counter() - start
+
+def bench_scrape(routes: int) -> float:
+    metrics = RequestMetrics()
+    for i in range(routes):
+        for status_code in (200, 400, 404, 500):
+            metrics.observe("GET", f"/api/route{i}/{{id}}", status_code, 0.01)
+    start = time.perf_counter()
+    exposition(metrics)
+    return time.perf_counter() - start
+
+def main():
+    requests = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+
+    bare = asyncio.run(drive(build_app(False), requests))
+    measured = asyncio.run(drive(build_app(True), requests))
+    print(f"⏱️  Without middleware: {bare / requests * 1e6:.1f} µs/request")
+    print(f"⏱️  With middleware:    {measured / requests * 1e6:.1f} µs/request")
+    print(f"   overhead {(measured - bare) / requests * 1e6:.2f} µs/request")
+
+    elapsed = bench_listener(requests)
+    print(f"⏱️  Command listener: {elapsed / requests * 1e6:.2f} µs/command")
+
+    elapsed = bench_scrape(40)
+    print(f"⏱️  Scrape of 40 routes x 4 statuses: {elapsed * 1e3:.2f} ms")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
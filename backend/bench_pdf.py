@@ -0,0 +1,94 @@
+"""Benchmark PDF rendering throughput, in documents per second per core.
+
+Renders synthetic invoices and CP12 certificates with the same function the
+API runs in its process pool, first on one core and then across a pool:
+
+    python bench_pdf.py [documents] [workers]
+"""
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timedelta, timezone
+
+from pdf_render import render_document
+
+SETTINGS = {
+    "company_name": "Breckland Heating Limited",
+    "address": "1 Market Place, Dereham",
+    "phone": "01362 000000",
+    "email": "office@brecklandheating.com",
+    "registration_number": "01234567",
+    "vat_number": "GB123456789",
+    "bank_name": "Bank",
+    "account_number": "12345678",
+    "sort_code": "00-00-00",
+}
+
+def sample_invoice(i: int) -> dict:
+    items = [
+        {"service_id": str(n), "service_name": f"Service {n}", "description": "Parts and labour",
+         "quantity": 1 + n % 3, "price": 45.0 + n, "total": (1 + n % 3) * (45.0 + n)}
+        for n in range(8)
+    ]
+    subtotal = sum(item["total"] for item in items)
+    issue_date = datetime(2025, 1, 1, tzinfo=timezone.utc) + timedelta(days=i % 365)
+    return {
+        "id": f"invoice-{i}", "invoice_number": f"INV-{i:05d}", "customer_id": "c",
+        "customer_name": f"Customer {i}", "customer_address": f"{i} High Street\nNorwich",
+        "customer_phone": "01603 000000", "customer_email": None, "items": items,
+        "subtotal": subtotal, "vat_rate": 20.0, "vat_amount": subtotal * 0.2, "total": subtotal * 1.2,
+        "status": "unpaid", "issue_date": issue_date, "due_date": issue_date + timedelta(days=30),
+        "notes": "Thank you for your business.",
+    }
+
+def sample_certificate(i: int) -> dict:
+    appliances = [
+        {"appliance_type": "Boiler", "make_model": "Worcester 30i", "installation_area": "Kitchen",
+         "flue_type": "Balanced", "co_reading": "0.0010", "co2_reading": "8.9000", "defects": None}
+        for _ in range(3)
+    ]
+    return {
+        "id": f"certificate-{i}", "certificate_type": "CP12", "certificate_number": f"CP12-{i:05d}",
+        "landlord_customer_name": f"Landlord {i}", "landlord_customer_address": f"{i} Mill Lane",
+        "landlord_customer_phone": "01362 000000", "inspection_address": f"{i} Church Road",
+        "inspection_date": datetime(2025, 3, 1, tzinfo=timezone.utc),
+        "next_inspection_due": datetime(2026, 3, 1, tzinfo=timezone.utc),
+        "engineer_name": "Engineer", "gas_safe_number": "123456",
+        "let_by_tightness_test": True, "equipotential_bonding": True, "ecv_accessible": True,
+        "pipework_visual_inspection": True, "co_alarm_working": True, "smoke_alarm_working": True,
+        "appliances": appliances, "compliance_statement": "All appliances safe to use",
+    }
+
+def render_sample(i: int) -> int:
+    if i % 2:
+        return len(render_document("certificates", sample_certificate(i), SETTINGS, {}))
+    return len(render_document("invoices", sample_invoice(i), SETTINGS, {}))
+
+def report(label: str, documents: int, elapsed: float, cores: int):
+    rate = documents / elapsed
+    print(f"⏱️  {label}: {documents} documents in {elapsed:.2f} s "
+          f"({rate:.1f} docs/s, {rate / cores:.1f} docs/s/core)")
+
+def main():
+    documents = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    workers = int(sys.argv[2]) if len(sys.argv) > 2 else os.cpu_count() or 1
+
+    # Warm up imports and font metrics before timing
+    render_sample(0)
+    render_sample(1)
+
+    start = time.perf_counter()
+    total_bytes = sum(render_sample(i) for i in range(documents))
+    report("Single process", documents, time.perf_counter() - start, 1)
+    print(f"   average size {total_bytes / documents / 1024:.1f} KiB")
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        list(executor.map(render_sample, range(workers)))
+        start = time.perf_counter()
+        list(executor.map(render_sample, range(documents), chunksize=8))
+        report(f"Process pool ({workers} workers)", documents, time.perf_counter() - start, workers)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
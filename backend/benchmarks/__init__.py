@@ -0,0 +1,19 @@
+"""In-process API benchmarks.
+
+Drives server.app through httpx's ASGI transport, so neither the network nor
+uvicorn is in the measurement, against a throwaway database seeded with a
+configurable volume of data. Run from the backend directory:
+
+    python -m benchmarks                                      # in-memory stand-in (mongomock-motor)
+    python -m benchmarks --mongo-url mongodb://localhost:27017
+    python -m benchmarks --save-baseline                      # record benchmarks/baseline.json
+    python -m benchmarks --baseline benchmarks/baseline.json  # exit 1 on regressions
+
+The database named by --db-name is dropped before seeding. Baselines are only
+comparable on the same machine and backend, with the same volumes.
+
+For pagination, search and reporting at production volumes, load a local
+mongod with the same generator and point the server at that database:
+
+    python -m benchmarks.generate --mongo-url mongodb://localhost:27017  # DB_NAME=breckland_synthetic
+"""
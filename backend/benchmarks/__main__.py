@@ -0,0 +1,133 @@
+import argparse
+import asyncio
+import os
+import platform
+import re
+import sys
+from datetime import datetime, timezone
+from pathlib import Path
+
+import httpx
+
+from benchmarks.routes import ROUTES, SKIPPED, Context
+from benchmarks.runner import bench_route, compare, load_baseline, print_results, save_results, set_aside, spare_counts
+from benchmarks.seed import Volumes, seed
+
+DEFAULT_BASELINE = Path(__file__).parent / "baseline.json"
+CREDENTIALS = {"email": "bench@brecklandheating.com", "password": "BenchPass123!"}
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks", description="Benchmark every API route in-process.")
+    parser.add_argument("--mongo-url", help="local mongod to run against; defaults to an in-memory stand-in")
+    parser.add_argument("--db-name", default="breckland_bench", help="database to use; it is dropped first")
+    for name, default in zip(Volumes.names(), Volumes().__dict__.values()):
+        parser.add_argument(f"--{name}", type=int, default=default, help=f"{name} to seed (default {default})")
+    parser.add_argument("--seed", type=int, default=1, help="random seed for the generated data")
+    parser.add_argument("--requests", type=int, default=200, help="timed requests per route")
+    parser.add_argument("--concurrency", type=int, default=10, help="requests in flight per route")
+    parser.add_argument("--warmup", type=int, default=5, help="untimed requests per route first")
+    parser.add_argument("--routes", help="only routes whose 'METHOD /path' matches this regex")
+    parser.add_argument("--output", type=Path, help="write the results to this JSON file")
+    parser.add_argument("--baseline", type=Path, help="compare against this JSON baseline and exit 1 on regressions")
+    parser.add_argument("--save-baseline", nargs="?", type=Path, const=DEFAULT_BASELINE, help="write the results as the baseline")
+    parser.add_argument("--threshold", type=float, default=0.2, help="allowed slowdown before a regression (default 0.2 = 20%%)")
+    parser.add_argument("--min-delta-ms", type=float, default=1.0, help="ignore p95 changes smaller than this")
+    return parser.parse_args()
+
+def load_server(mongo_url: str, db_name: str):
+    """Import server.py against the chosen database."""
+    os.environ["MONGO_URL"] = mongo_url or "mongodb://localhost:27017"
+    os.environ["DB_NAME"] = db_name
+    import server
+
+    if mongo_url is None:
+        try:
+            from mongomock_motor import AsyncMongoMockClient
+        except ImportError:
+            raise SystemExit("The in-memory backend needs mongomock-motor: pip install mongomock-motor, or pass --mongo-url")
+        # No network client was opened yet: Motor connects lazily
+        server.client = AsyncMongoMockClient(tz_aware=True)
+        server.db = server.client[db_name]
+    return server
+
+async def create_indexes(server, in_memory: bool):
+    if not in_memory:
+        return await server.ensure_indexes()
+    # mongomock's create_indexes drops partialFilterExpression, which the
+    # unique estimate_id index relies on; create_index keeps it
+    for collection, indexes in server.INDEXES.items():
+        for index in indexes:
+            options = {key: value for key, value in index.document.items() if key != "key"}
+            await server.db[collection].create_index(list(index.document["key"].items()), **options)
+
+async def run(args: argparse.Namespace) -> int:
+    server = load_server(args.mongo_url, args.db_name)
+    await server.client.drop_database(args.db_name)
+    await create_indexes(server, args.mongo_url is None)
+
+    routes = [route for route in ROUTES if not args.routes or re.search(args.routes, route.name)]
+    # Unhandled errors come back as 500s and are counted, e.g. an aggregation
+    # stage the in-memory stand-in does not implement
+    transport = httpx.ASGITransport(app=server.app, raise_app_exceptions=False)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+        response = await client.post("/api/auth/register", json=dict(CREDENTIALS, name="Bench Admin", role="admin"))
+        response.raise_for_status()
+        client.headers["Authorization"] = f"Bearer {response.json()['token']}"
+
+        volumes = Volumes(**{name: getattr(args, name) for name in Volumes.names()})
+        # Documents the delete and convert routes use up are seeded on top
+        spares = spare_counts(routes, args.requests)
+        seeded = Volumes(**{name: count + spares.get(name, 0) for name, count in volumes.__dict__.items()})
+        print(f"🌱 Seeding {', '.join(f'{count} {name}' for name, count in seeded.__dict__.items())}...")
+        ids = await seed(server, seeded, response.json()["user"]["id"], args.seed)
+        ids, spares = set_aside(ids, spares)
+        ctx = Context(ids, spares, CREDENTIALS)
+
+        results = {}
+        for route in routes:
+            results[route.name] = await bench_route(client, route, ctx, args.requests, args.concurrency, args.warmup)
+            print(f"⏱️  {route.name}: {results[route.name]['p50_ms']:.2f} ms p50")
+
+    print()
+    print_results(results)
+
+    covered = {route.name for route in ROUTES}
+    for path, operations in server.app.openapi()["paths"].items():
+        for method in operations:
+            name = f"{method.upper()} {path}"
+            if name not in covered:
+                print(f"⏭️  {name} not benchmarked: {SKIPPED.get(name, 'no scenario yet')}")
+
+    meta = {
+        "backend": "mongod" if args.mongo_url else "in-memory",
+        "volumes": volumes.__dict__,
+        "requests": args.requests,
+        "concurrency": args.concurrency,
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "created_at": datetime.now(timezone.utc).isoformat(),
+    }
+    if args.output:
+        save_results(args.output, meta, results)
+    if args.save_baseline:
+        save_results(args.save_baseline, meta, results)
+        print(f"💾 Baseline written to {args.save_baseline}")
+
+    if args.baseline:
+        baseline = load_baseline(args.baseline)
+        if baseline["meta"]["backend"] != meta["backend"] or baseline["meta"]["volumes"] != meta["volumes"]:
+            print("⚠️  Baseline was recorded with a different backend or data volume")
+        regressions = compare(results, baseline["routes"], args.threshold, args.min_delta_ms)
+        for regression in regressions:
+            print(f"❌ {regression}")
+        if regressions:
+            return 1
+        print(f"✅ No regressions beyond {args.threshold:.0%} against {args.baseline}")
+    return 0
+
+def main():
+    args = parse_args()
+    return asyncio.run(run(args))
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,104 @@
+"""Load a production-scale synthetic dataset into a mongod.
+
+    python -m benchmarks.generate --mongo-url mongodb://localhost:27017
+    python -m benchmarks.generate --mongo-url mongodb://localhost:27017 --invoices 200000 --workers 4
+
+By default this is 100k customers, 1M invoices, 100k estimates and 500k
+certificates, built by the same Generator the benchmarks seed with. Building
+the documents is CPU bound, so batches are built and written by a pool of
+worker processes, each with its own connection and unordered insert_many.
+Indexes are built once the data is in, which is quicker than maintaining them
+on every insert, then the report rollups are rebuilt and the counters set.
+
+The data depends only on --seed, the volumes and the history window, never on
+--workers or --batch-size. The database named by --db-name is dropped first.
+"""
+import argparse
+import asyncio
+import multiprocessing
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+
+from pymongo import MongoClient
+
+from benchmarks.seed import BATCH_SIZE, EPOCH, HISTORY_DAYS, Generator, Volumes
+
+PRODUCTION_VOLUMES = Volumes(customers=100_000, services=60, invoices=1_000_000, estimates=100_000, certificates=500_000)
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.generate", description="Load a synthetic dataset into mongod.")
+    parser.add_argument("--mongo-url", required=True, help="mongod to load into")
+    parser.add_argument("--db-name", default="breckland_synthetic", help="database to load; it is dropped first")
+    for name, default in zip(Volumes.names(), PRODUCTION_VOLUMES.__dict__.values()):
+        parser.add_argument(f"--{name}", type=int, default=default, help=f"{name} to generate (default {default})")
+    parser.add_argument("--seed", type=int, default=1, help="random seed for the generated data")
+    parser.add_argument("--start", type=lambda value: datetime.fromisoformat(value).replace(tzinfo=timezone.utc),
+                        default=EPOCH, help=f"first day of the history, YYYY-MM-DD (default {EPOCH:%Y-%m-%d})")
+    parser.add_argument("--days", type=int, default=HISTORY_DAYS, help=f"length of the history (default {HISTORY_DAYS})")
+    parser.add_argument("--created-by", default="synthetic", help="user id recorded as the author of every document")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="processes building and writing batches")
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE, help="documents per insert_many")
+    return parser.parse_args()
+
+# Set in each worker process by start_worker
+generator = None
+database = None
+
+def start_worker(mongo_url: str, db_name: str, volumes: Volumes, created_by: str, seed: int, start: datetime, days: int):
+    global generator, database
+    # MONGO_URL and DB_NAME are inherited from the parent
+    import server
+
+    generator = Generator(server, volumes, created_by, seed, start, days)
+    database = MongoClient(mongo_url, tz_aware=True)[db_name]
+
+def load_batch(collection: str, start: int, stop: int) -> int:
+    docs = generator.batch(collection, start, stop)
+    database[collection].insert_many(docs, ordered=False)
+    return len(docs)
+
+async def generate(args: argparse.Namespace):
+    os.environ["MONGO_URL"] = args.mongo_url
+    os.environ["DB_NAME"] = args.db_name
+    import server
+
+    volumes = Volumes(**{name: getattr(args, name) for name in Volumes.names()})
+    print(f"🌱 Generating {', '.join(f'{count:,} {name}' for name, count in volumes.__dict__.items())} into {args.db_name}...")
+    await server.client.drop_database(args.db_name)
+
+    loop = asyncio.get_running_loop()
+    total = sum(volumes.__dict__.values())
+    loaded = reported = 0
+    started = time.perf_counter()
+    # spawn rather than fork: the parent already holds Motor's threads and sockets
+    pool = ProcessPoolExecutor(
+        args.workers, mp_context=multiprocessing.get_context("spawn"), initializer=start_worker,
+        initargs=(args.mongo_url, args.db_name, volumes, args.created_by, args.seed, args.start, args.days)
+    )
+    with pool:
+        batches = []
+        for collection in Volumes.names():
+            count = getattr(volumes, collection)
+            for start in range(1, count + 1, args.batch_size):
+                batches.append(loop.run_in_executor(pool, load_batch, collection, start, min(start + args.batch_size, count + 1)))
+        for batch in asyncio.as_completed(batches):
+            loaded += await batch
+            if loaded - reported >= total / 20 or loaded == total:
+                reported = loaded
+                elapsed = time.perf_counter() - started
+                print(f"📦 {loaded:,}/{total:,} documents in {elapsed:.0f}s ({loaded / elapsed:,.0f}/s)")
+
+    print("🗂️  Building indexes, rollups and counters...")
+    await server.ensure_indexes()
+    await server.rebuild_rollups()
+    await server.seed_counters()
+    print(f"✅ Done in {time.perf_counter() - started:.0f}s")
+
+def main():
+    asyncio.run(generate(parse_args()))
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,128 @@
+"""The request each benchmarked route is driven with.
+
+Every Route builds its i-th request from the seeded ids. Reads and updates
+pick from ids that are never deleted; routes that use a document up (delete,
+convert) take from a spare pool set aside for them when seeding.
+"""
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Callable, Optional
+
+SEARCH_TERMS = ["Smith", "High Street", "Dereham", "INV00042", "Boiler", "Claire", "CP12-00012"]
+SUGGEST_PREFIXES = ["s", "jo", "cla", "c0001", "01362", "bo"]
+
+class Context:
+    def __init__(self, ids: dict, spares: dict, credentials: dict):
+        self.ids = ids
+        self.spares = spares
+        self.credentials = credentials
+
+    def pick(self, collection: str, i: int) -> str:
+        ids = self.ids[collection]
+        return ids[i % len(ids)]
+
+    def take(self, collection: str) -> str:
+        return self.spares[collection].pop()
+
+@dataclass
+class Route:
+    method: str
+    path: str  # the FastAPI route template, e.g. /api/customers/{customer_id}
+    request: Callable = lambda ctx, i: {}  # (ctx, i) -> {"path": {...}, "params": {...}, "json": {...}}
+    consumes: Optional[str] = None  # collection whose spare pool each request uses up
+
+    @property
+    def name(self) -> str:
+        return f"{self.method} {self.path}"
+
+def item(ctx: Context, i: int) -> dict:
+    return {"service_id": ctx.pick("services", i), "service_name": "Boiler service", "quantity": 1, "price": 85.0, "total": 85.0}
+
+def sale(ctx: Context, i: int) -> dict:
+    return {
+        "customer_id": ctx.pick("customers", i),
+        "items": [item(ctx, i), item(ctx, i + 1)],
+        "issue_date": datetime.now(timezone.utc).isoformat(),
+        "vat_rate": 20.0,
+    }
+
+def customer(i: int) -> dict:
+    return {"name": f"Bench Customer {i}", "address": f"{i} Bench Street, Dereham", "phone": "01362 000000"}
+
+def certificate(i: int) -> dict:
+    return {
+        "certificate_type": "CP12",
+        "landlord_customer_name": f"Bench Landlord {i}",
+        "landlord_customer_address": f"{i} Bench Street, Dereham",
+        "landlord_customer_phone": "01362 000000",
+        "inspection_address": f"{i} Bench Street, Dereham",
+        "inspection_date": datetime.now(timezone.utc).isoformat(),
+        "engineer_name": "Benchmark Engineer",
+        "appliances": [{"appliance_type": "Boiler", "make_model": "Worcester 30i", "installation_area": "Kitchen", "flue_type": "Balanced"}],
+    }
+
+ROUTES = [
+    Route("GET", "/api/"),
+    Route("GET", "/api/auth/me"),
+    Route("POST", "/api/auth/login", lambda ctx, i: {"json": ctx.credentials}),
+    Route("GET", "/api/dashboard/stats"),
+    Route("GET", "/api/reports/revenue"),
+    Route("GET", "/api/reports/vat"),
+    Route("GET", "/api/reports/aged-debtors"),
+    Route("GET", "/api/search", lambda ctx, i: {"params": {"q": SEARCH_TERMS[i % len(SEARCH_TERMS)]}}),
+
+    Route("GET", "/api/customers", lambda ctx, i: {"params": {"limit": 100}}),
+    Route("GET", "/api/customers/suggest", lambda ctx, i: {"params": {"prefix": SUGGEST_PREFIXES[i % len(SUGGEST_PREFIXES)]}}),
+    Route("GET", "/api/customers/{customer_id}", lambda ctx, i: {"path": {"customer_id": ctx.pick("customers", i)}}),
+    Route("POST", "/api/customers", lambda ctx, i: {"json": customer(i)}),
+    Route("PUT", "/api/customers/{customer_id}", lambda ctx, i: {"path": {"customer_id": ctx.pick("customers", i)}, "json": customer(i)}),
+    Route("DELETE", "/api/customers/{customer_id}", lambda ctx, i: {"path": {"customer_id": ctx.take("customers")}}, consumes="customers"),
+
+    Route("GET", "/api/services", lambda ctx, i: {"params": {"limit": 100}}),
+    Route("GET", "/api/services/suggest", lambda ctx, i: {"params": {"prefix": SUGGEST_PREFIXES[i % len(SUGGEST_PREFIXES)]}}),
+    Route("GET", "/api/services/{service_id}", lambda ctx, i: {"path": {"service_id": ctx.pick("services", i)}}),
+    Route("POST", "/api/services", lambda ctx, i: {"json": {"name": f"Bench Service {i}", "price": 50.0}}),
+    Route("PUT", "/api/services/{service_id}", lambda ctx, i: {"path": {"service_id": ctx.pick("services", i)}, "json": {"name": f"Bench Service {i}", "price": 55.0}}),
+    Route("DELETE", "/api/services/{service_id}", lambda ctx, i: {"path": {"service_id": ctx.take("services")}}, consumes="services"),
+
+    Route("GET", "/api/invoices", lambda ctx, i: {"params": {"limit": 100}}),
+    Route("GET", "/api/invoices/{invoice_id}", lambda ctx, i: {"path": {"invoice_id": ctx.pick("invoices", i)}}),
+    Route("POST", "/api/invoices", lambda ctx, i: {"json": sale(ctx, i)}),
+    Route("PATCH", "/api/invoices/{invoice_id}/status", lambda ctx, i: {"path": {"invoice_id": ctx.pick("invoices", i)}, "params": {"status": "paid" if i % 2 else "unpaid"}}),
+    Route("DELETE", "/api/invoices/{invoice_id}", lambda ctx, i: {"path": {"invoice_id": ctx.take("invoices")}}, consumes="invoices"),
+
+    Route("GET", "/api/estimates", lambda ctx, i: {"params": {"limit": 100}}),
+    Route("GET", "/api/estimates/{estimate_id}", lambda ctx, i: {"path": {"estimate_id": ctx.pick("estimates", i)}}),
+    Route("POST", "/api/estimates", lambda ctx, i: {"json": sale(ctx, i)}),
+    Route("POST", "/api/estimates/{estimate_id}/convert", lambda ctx, i: {"path": {"estimate_id": ctx.take("estimates")}}, consumes="estimates"),
+    Route("DELETE", "/api/estimates/{estimate_id}", lambda ctx, i: {"path": {"estimate_id": ctx.take("estimates")}}, consumes="estimates"),
+
+    Route("GET", "/api/certificates", lambda ctx, i: {"params": {"limit": 100}}),
+    Route("GET", "/api/certificates/due", lambda ctx, i: {"params": {"within_days": 30}}),
+    Route("GET", "/api/certificates/{certificate_id}", lambda ctx, i: {"path": {"certificate_id": ctx.pick("certificates", i)}}),
+    Route("POST", "/api/certificates", lambda ctx, i: {"json": certificate(i)}),
+    Route("PUT", "/api/certificates/{certificate_id}", lambda ctx, i: {"path": {"certificate_id": ctx.pick("certificates:CP12", i)}, "json": certificate(i)}),
+    Route("DELETE", "/api/certificates/{certificate_id}", lambda ctx, i: {"path": {"certificate_id": ctx.take("certificates")}}, consumes="certificates"),
+
+    Route("GET", "/api/settings"),
+    Route("PUT", "/api/settings", lambda ctx, i: {"json": {"phone": f"01362 {i:06d}"}}),
+    Route("GET", "/api/{collection}/{document_id}/pdf", lambda ctx, i: {"path": {"collection": "invoices", "document_id": ctx.pick("invoices", i)}}),
+    Route("GET", "/api/export/{collection}", lambda ctx, i: {"path": {"collection": "invoices"}, "params": {"date_from": "2024-06-01T00:00:00Z", "date_to": "2024-07-01T00:00:00Z"}}),
+    Route("GET", "/api/reminders", lambda ctx, i: {"params": {"limit": 100}}),
+    Route("GET", "/api/perf/slow-queries"),
+    Route("GET", "/api/perf/profiles"),
+]
+
+# Routes deliberately left out, with the reason printed alongside the results
+SKIPPED = {
+    "POST /api/auth/register": "creates users; login covers password hashing",
+    "GET /api/auth/password-pool": "diagnostics only",
+    "POST /api/settings/logo": "multipart upload of an image",
+    "GET /api/assets/{asset_id}": "needs an uploaded asset",
+    "POST /api/import/{collection}": "bulk CSV upload, see backend_perf_test.py",
+    "POST /api/reminders/run": "sends email",
+    "POST /api/jobs/pdf-batch": "runs in the background, see backend_perf_test.py",
+    "GET /api/jobs/{job_id}": "needs a batch job",
+    "GET /api/jobs/{job_id}/archive": "needs a finished batch job",
+    "GET /api/perf/profiles/{profile_id}": "needs a stored profile",
+}
@@ -0,0 +1,102 @@
+"""Drive each route through the ASGI transport and summarise its latencies."""
+import asyncio
+import itertools
+import json
+import time
+from pathlib import Path
+
+import httpx
+
+def percentile(latencies: list, fraction: float) -> float:
+    # Nearest rank, as in backend_perf_test.py
+    return latencies[min(len(latencies) - 1, int(len(latencies) * fraction))]
+
+def summarise(latencies: list, errors: int, elapsed: float) -> dict:
+    latencies = sorted(latencies)
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "throughput_rps": len(latencies) / elapsed if elapsed else 0.0,
+        "p50_ms": percentile(latencies, 0.50),
+        "p95_ms": percentile(latencies, 0.95),
+        "p99_ms": percentile(latencies, 0.99),
+    }
+
+async def bench_route(client: httpx.AsyncClient, route, ctx, requests: int, concurrency: int, warmup: int) -> dict:
+    async def send(i: int) -> httpx.Response:
+        spec = route.request(ctx, i)
+        url = route.path.format(**spec.get("path", {}))
+        return await client.request(route.method, url, params=spec.get("params"), json=spec.get("json"))
+
+    # Routes that use documents up get no warm-up: their spare pool is sized exactly
+    if route.consumes is None:
+        for i in range(warmup):
+            await send(i)
+
+    latencies = []
+    errors = 0
+    indexes = iter(range(requests))
+
+    async def worker():
+        nonlocal errors
+        for i in indexes:
+            start = time.perf_counter()
+            response = await send(i)
+            latencies.append((time.perf_counter() - start) * 1000)
+            if response.status_code >= 400:
+                errors += 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return summarise(latencies, errors, time.perf_counter() - start)
+
+def spare_counts(routes: list, requests: int) -> dict:
+    """How many documents per collection the consuming routes will use up."""
+    counts = {}
+    for route in routes:
+        if route.consumes:
+            counts[route.consumes] = counts.get(route.consumes, 0) + requests
+    return counts
+
+def set_aside(ids: dict, counts: dict) -> tuple:
+    """Split the seeded ids into those routes may read and the spare pools."""
+    spares = {collection: ids[collection][-count:] for collection, count in counts.items()}
+    reserved = set(itertools.chain.from_iterable(spares.values()))
+    readable = {collection: [id_ for id_ in values if id_ not in reserved] for collection, values in ids.items()}
+    return readable, spares
+
+def print_results(results: dict):
+    print(f"{'route':<48} {'req/s':>9} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'errors':>7}")
+    for name, stats in results.items():
+        print(f"{name:<48} {stats['throughput_rps']:>9.1f} {stats['p50_ms']:>8.2f} "
+              f"{stats['p95_ms']:>8.2f} {stats['p99_ms']:>8.2f} {stats['errors']:>7}")
+
+def compare(results: dict, baseline: dict, threshold: float, min_delta_ms: float) -> list:
+    """Describe every route that is slower than its baseline beyond the threshold.
+
+    A route regresses when its p95 grows by more than threshold (and by more
+    than min_delta_ms, so sub-millisecond jitter is ignored), when its
+    throughput drops by more than threshold, or when it starts failing.
+    """
+    regressions = []
+    for name, stats in results.items():
+        base = baseline.get(name)
+        if base is None:
+            continue
+        if stats["p95_ms"] > base["p95_ms"] * (1 + threshold) and stats["p95_ms"] - base["p95_ms"] > min_delta_ms:
+            regressions.append(f"{name}: p95 {base['p95_ms']:.2f} -> {stats['p95_ms']:.2f} ms")
+        if stats["throughput_rps"] < base["throughput_rps"] * (1 - threshold):
+            regressions.append(f"{name}: throughput {base['throughput_rps']:.1f} -> {stats['throughput_rps']:.1f} req/s")
+        if stats["errors"] > base["errors"]:
+            regressions.append(f"{name}: errors {base['errors']} -> {stats['errors']}")
+    return regressions
+
+def load_baseline(path: Path) -> dict:
+    with open(path) as f:
+        return json.load(f)
+
+def save_results(path: Path, meta: dict, results: dict):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "w") as f:
+        json.dump({"meta": meta, "routes": results}, f, indent=2)
+        f.write("\n")
@@ -0,0 +1,511 @@
+"""Deterministic seed data for the benchmarks, built from the server models.
+
+Every document is derived from (seed, collection, number) alone: it has its own
+random.Random, and the documents it refers to are rebuilt from their numbers
+rather than looked up. Any range of any collection can therefore be generated
+on its own, in any order or process, and comes out the same.
+"""
+import math
+import random
+import uuid
+from dataclasses import dataclass, fields
+from datetime import datetime, timedelta, timezone
+from itertools import accumulate
+
+FIRST_NAMES = ["John", "Sarah", "David", "Emma", "James", "Claire", "Peter", "Helen", "Mark", "Julie", "Robert",
+               "Susan", "Paul", "Karen", "Andrew", "Lisa", "Michael", "Rachel", "Stephen", "Joanne", "Gary", "Nicola",
+               "Ian", "Louise", "Simon", "Amanda", "Richard", "Tracey", "Neil", "Donna"]
+LAST_NAMES = ["Smith", "Jones", "Taylor", "Brown", "Wilson", "Johnson", "Clarke", "Wright", "Green", "Hall", "Wood",
+              "Turner", "Harris", "Cooper", "King", "Baker", "Walker", "Allen", "Howes", "Bunting", "Eagle", "Mayes",
+              "Pegg", "Bishop", "Fisher", "Chapman", "Watson", "Palmer", "Sayer", "Spinks"]
+LETTING_AGENTS = ["Lettings", "Properties", "Estates", "Property Management"]
+STREETS = ["High Street", "Church Road", "Mill Lane", "Station Road", "Market Place", "London Road", "Norwich Road",
+           "The Street", "School Lane", "Quebec Road", "Neatherd Road", "Swanton Road", "Orchard Close",
+           "Chapel Street", "Westfield Road", "Cemetery Road", "Manor Road", "Brisley Road"]
+# Town, postcode district, dialling code
+TOWNS = [("Dereham", "NR19", "01362"), ("Swaffham", "PE37", "01760"), ("Watton", "IP25", "01953"),
+         ("Thetford", "IP24", "01842"), ("Attleborough", "NR17", "01953"), ("Wymondham", "NR18", "01953"),
+         ("Fakenham", "NR21", "01328"), ("Norwich", "NR5", "01603"), ("Shipdham", "IP25", "01362")]
+EMAIL_DOMAINS = ["example.com", "example.co.uk", "example.org", "example.net"]
+POSTCODE_LETTERS = "ABDEFGHJLNPQRSTUWXYZ"
+
+# Name, usual price and how often it turns up on a sale, relative to the others
+SERVICES = [
+    ("Annual boiler service", 85.0, 30),
+    ("Landlord gas safety check", 70.0, 25),
+    ("Oil boiler service", 120.0, 20),
+    ("Emergency call out", 95.0, 8),
+    ("Labour per hour", 55.0, 12),
+    ("Leak repair", 110.0, 6),
+    ("Thermostatic radiator valve", 35.0, 5),
+    ("Radiator replacement", 180.0, 4),
+    ("Magnetic system filter", 145.0, 3),
+    ("Smart thermostat upgrade", 220.0, 3),
+    ("Nozzle and filter replacement", 45.0, 6),
+    ("Gas fire service", 75.0, 3),
+    ("Cooker installation", 90.0, 2),
+    ("Unvented cylinder service", 110.0, 2),
+    ("Fire valve replacement", 130.0, 2),
+    ("Oil tank inspection", 95.0, 3),
+    ("Power flush", 450.0, 2),
+    ("Oil tank replacement", 1850.0, 1),
+    ("Combi boiler installation", 2650.0, 1),
+    ("System boiler installation", 3100.0, 1),
+]
+SALE_NOTES = ["Access via side gate", "Key with neighbour", "Tenant to be present", "Call before arrival",
+              "Parts ordered", "Payment by bank transfer please", "Quote valid for materials at today's prices"]
+
+GAS_BOILERS = ["Worcester Bosch Greenstar 30i", "Vaillant ecoTEC plus 832", "Baxi 800 Combi 2", "Ideal Logic Max C30",
+               "Glow-worm Energy 30c", "Viessmann Vitodens 100-W"]
+OIL_BOILERS = ["Grant Vortex Pro 21/26", "Worcester Bosch Greenstar Heatslave II", "Firebird Enviromax Combi C26",
+               "Warmflow Agentis Pro 26", "Grant VortexBlue 26"]
+OIL_BURNERS = ["Riello RDB2.2", "Bentone BF1", "Electro-oil Inter B", "Riello RDB1"]
+# Appliance type, makes, where it is fitted, flue types
+APPLIANCES = {
+    "Boiler": (GAS_BOILERS, ["Kitchen", "Airing cupboard", "Utility room", "Loft", "Garage"], ["Balanced", "Fan assisted"]),
+    "Gas fire": (["Baxi Bermuda", "Valor Homeflame", "Gazco Logic HE", "Flavel Misermatic"], ["Lounge", "Dining room"], ["Open", "Balanced"]),
+    "Cooker": (["Leisure Cuisinemaster", "Stoves Richmond 1000", "Belling Cookcentre"], ["Kitchen"], ["Flueless"]),
+    "Hob": (["Bosch PGP6B5B90", "Neff T26BR46N0", "Smeg SE70SGH"], ["Kitchen"], ["Flueless"]),
+    "Water heater": (["Ascot 5/5", "Heatrae Sadia Multipoint"], ["Kitchen", "Bathroom"], ["Open", "Balanced"]),
+}
+APPLIANCE_DEFECTS = ["Flue terminal too close to opening window", "Spillage test failed",
+                     "Inadequate ventilation", "Gas escape at appliance isolation valve",
+                     "Fire front damaged", "Flame picture poor, burner needs cleaning"]
+# Engineer, Gas Safe number, OFTEC number
+ENGINEERS = [("Tom Howes", "212345", "C123456"), ("Dan Eagle", "198765", "C234567"),
+             ("Lee Bunting", "204681", "C345678"), ("Chris Mayes", "187654", None)]
+
+# Certificates in every run of 20, roughly the mix a heating firm issues
+CERTIFICATE_MIX = {"CP12": 9, "CD11": 4, "TI133D": 2, "CD10": 2, "BENCHMARK": 2, "GWN": 1}
+CERTIFICATE_TYPES = list(CERTIFICATE_MIX)
+OIL_CERTIFICATES = {"CD11", "CD10", "TI133D"}
+# The mix interleaved, so each type is spread evenly through the numbers
+CERTIFICATE_CYCLE = [cert_type for _, cert_type in sorted(
+    ((slot + 0.5) / count, cert_type) for cert_type, count in CERTIFICATE_MIX.items() for slot in range(count)
+)]
+# Estimates whose number ends in these digits were converted to an invoice
+CONVERTED_DIGITS = {0, 1, 2}
+# What an invoice converted from an estimate copies over
+SALE_FIELDS = ["customer_id", "customer_name", "customer_address", "customer_phone", "customer_email", "items",
+               "subtotal", "vat_rate", "vat_amount", "total", "notes", "created_by"]
+
+EPOCH = datetime(2024, 1, 1, tzinfo=timezone.utc)
+HISTORY_DAYS = 730
+BATCH_SIZE = 1000
+
+@dataclass
+class Volumes:
+    customers: int = 1000
+    services: int = 50
+    invoices: int = 5000
+    estimates: int = 1000
+    certificates: int = 2000
+
+    @classmethod
+    def names(cls) -> list:
+        return [field.name for field in fields(cls)]
+
+def new_id(rng: random.Random) -> str:
+    # A uuid4 like the models' default ids, but drawn from the document's seed
+    return str(uuid.UUID(int=rng.getrandbits(128), version=4))
+
+def chance(rng: random.Random, probability: float) -> bool:
+    return rng.random() < probability
+
+class Generator:
+    """Builds document n (counting from 1) of each collection through the server models.
+
+    Documents are spread over the history window in number order, so numbers
+    rise with dates as they do in the app, and each refers only to customers
+    that already existed, favouring older ones: long-standing customers and
+    landlords account for most of the work.
+    """
+
+    def __init__(self, server, volumes: Volumes, created_by: str, seed: int = 1,
+                 start: datetime = EPOCH, days: int = HISTORY_DAYS):
+        self.server = server
+        self.volumes = volumes
+        self.created_by = created_by
+        self.seed = seed
+        self.start = start
+        self.days = days
+        self.end = start + timedelta(days=days)
+        self.services = [self.service(n) for n in range(1, volumes.services + 1)]
+        self.service_weights = list(accumulate(SERVICES[(n - 1) % len(SERVICES)][2] for n in range(1, volumes.services + 1)))
+        # Each estimate m that is converted becomes invoice m * step
+        self.step = volumes.invoices // volumes.estimates if volumes.estimates else 0
+
+    def rng(self, collection: str, n: int) -> random.Random:
+        return random.Random(f"{self.seed}:{collection}:{n}")
+
+    def date(self, rng: random.Random, n: int, count: int) -> datetime:
+        return self.start + timedelta(days=self.days * (n - 1 + rng.random()) / count)
+
+    def pick_customer(self, rng: random.Random, n: int, count: int) -> dict:
+        existing = max(1, math.ceil(self.volumes.customers * n / count))
+        return self.customer(1 + int(existing * rng.random() ** 2))
+
+    def address(self, rng: random.Random) -> tuple:
+        town, district, dialling_code = rng.choice(TOWNS)
+        postcode = f"{district} {rng.randint(1, 9)}{rng.choice(POSTCODE_LETTERS)}{rng.choice(POSTCODE_LETTERS)}"
+        return f"{rng.randint(1, 120)} {rng.choice(STREETS)}, {town}, {postcode}", dialling_code
+
+    def batch(self, collection: str, start: int, stop: int) -> list:
+        """Documents start to stop - 1 of collection."""
+        build = getattr(self, collection[:-1])
+        return [build(n) for n in range(start, stop)]
+
+    def customer(self, n: int) -> dict:
+        rng = self.rng("customers", n)
+        first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+        agent = chance(rng, 0.1)
+        address, dialling_code = self.address(rng)
+        mobile = chance(rng, 0.4)
+        return self.server.Customer(
+            id=new_id(rng),
+            customer_number=f"C{str(n).zfill(5)}",
+            name=f"{last} {rng.choice(LETTING_AGENTS)}" if agent else f"{first} {last}",
+            address=address,
+            phone=f"07{rng.randint(100, 999)} {rng.randint(100000, 999999)}" if mobile else f"{dialling_code} {rng.randint(100000, 999999)}",
+            email=f"{first.lower()}.{last.lower()}{n}@{rng.choice(EMAIL_DOMAINS)}" if agent or chance(rng, 0.75) else None,
+            created_at=self.date(rng, n, self.volumes.customers),
+        ).model_dump()
+
+    def service(self, n: int) -> dict:
+        rng = self.rng("services", n)
+        name, price, _ = SERVICES[(n - 1) % len(SERVICES)]
+        band = (n - 1) // len(SERVICES)
+        return self.server.Service(
+            id=new_id(rng),
+            name=f"{name} - band {band + 1}" if band else name,
+            price=round(price * (1 + 0.1 * band) * rng.uniform(0.95, 1.05)),
+            created_at=self.start,
+        ).model_dump()
+
+    def items(self, rng: random.Random) -> list:
+        items = []
+        count = rng.choices([1, 2, 3, 4, 5], weights=[40, 30, 15, 10, 5])[0]
+        for service in rng.choices(self.services, cum_weights=self.service_weights, k=count):
+            quantity = 1 if chance(rng, 0.8) else rng.randint(2, 4)
+            items.append({
+                "service_id": service["id"],
+                "service_name": service["name"],
+                "description": "Parts and labour" if chance(rng, 0.1) else None,
+                "quantity": quantity,
+                "price": service["price"],
+                "total": quantity * service["price"],
+            })
+        return items
+
+    def sale(self, rng: random.Random, customer: dict, issue_date: datetime) -> dict:
+        """The fields invoices and estimates share, totalled as the API does."""
+        items = self.items(rng)
+        # Energy-saving installations are zero-rated at 5%
+        vat_rate = 5.0 if chance(rng, 0.03) else 20.0
+        subtotal = sum(item["total"] for item in items)
+        vat_amount = subtotal * (vat_rate / 100)
+        return {
+            "customer_id": customer["id"],
+            "customer_name": customer["name"],
+            "customer_address": customer["address"],
+            "customer_phone": customer["phone"],
+            "customer_email": customer["email"],
+            "items": items,
+            "subtotal": subtotal,
+            "vat_rate": vat_rate,
+            "vat_amount": vat_amount,
+            "total": subtotal + vat_amount,
+            "issue_date": issue_date,
+            "notes": rng.choice(SALE_NOTES) if chance(rng, 0.15) else None,
+            "created_by": self.created_by,
+        }
+
+    def converts(self, m: int) -> bool:
+        return self.step > 0 and m % 10 in CONVERTED_DIGITS
+
+    def converted_from(self, n: int) -> int:
+        """The estimate invoice n was converted from, or 0."""
+        if self.step and n % self.step == 0 and self.converts(n // self.step) and n // self.step <= self.volumes.estimates:
+            return n // self.step
+        return 0
+
+    def invoice(self, n: int) -> dict:
+        rng = self.rng("invoices", n)
+        invoice_id = new_id(rng)
+        estimate_number = self.converted_from(n)
+        if estimate_number:
+            # A copy of the estimate, as POST /estimates/{id}/convert makes
+            estimate = self.estimate(estimate_number)
+            sale = {field: estimate[field] for field in SALE_FIELDS}
+            sale["issue_date"] = estimate["issue_date"] + timedelta(days=rng.randint(1, 21))
+            sale["estimate_id"] = estimate["id"]
+        else:
+            issue_date = self.date(rng, n, self.volumes.invoices)
+            sale = self.sale(rng, self.pick_customer(rng, n, self.volumes.invoices), issue_date)
+        # Almost everything older than a quarter has been paid
+        age = (self.end - sale["issue_date"]).days
+        paid = chance(rng, 0.98 if age > 90 else 0.85 if age > 30 else 0.4)
+        return self.server.Invoice(
+            id=invoice_id,
+            invoice_number=f"INV{str(n).zfill(5)}",
+            status="paid" if paid else "unpaid",
+            due_date=sale["issue_date"] + timedelta(days=rng.choice([14, 30, 30, 30])),
+            created_at=sale["issue_date"],
+            **sale
+        ).model_dump()
+
+    def estimate(self, n: int) -> dict:
+        rng = self.rng("estimates", n)
+        estimate_id = new_id(rng)
+        issue_date = self.date(rng, n, self.volumes.estimates)
+        sale = self.sale(rng, self.pick_customer(rng, n, self.volumes.estimates), issue_date)
+        if self.converts(n):
+            status = "converted"
+        elif (self.end - issue_date).days < 30:
+            status = "pending"
+        else:
+            status = rng.choices(["accepted", "rejected", "pending"], weights=[2, 5, 1])[0]
+        return self.server.Estimate(
+            id=estimate_id,
+            estimate_number=f"EST{str(n).zfill(5)}",
+            status=status,
+            valid_until=issue_date + timedelta(days=30),
+            created_at=issue_date,
+            **sale
+        ).model_dump()
+
+    def certificate_type(self, n: int) -> tuple:
+        """The type of certificate n and its sequence number within that type."""
+        cycle, slot = divmod(n - 1, len(CERTIFICATE_CYCLE))
+        cert_type = CERTIFICATE_CYCLE[slot]
+        return cert_type, cycle * CERTIFICATE_MIX[cert_type] + CERTIFICATE_CYCLE[:slot].count(cert_type) + 1
+
+    def certificate(self, n: int) -> dict:
+        rng = self.rng("certificates", n)
+        certificate_id = new_id(rng)
+        cert_type, seq = self.certificate_type(n)
+        customer = self.pick_customer(rng, n, self.volumes.certificates)
+        inspection_date = self.date(rng, n, self.volumes.certificates)
+        engineer, gas_safe_number, oftec_number = rng.choice(ENGINEERS)
+        oil = cert_type in OIL_CERTIFICATES
+        # Landlords mostly have their tenanted properties inspected
+        tenanted = cert_type == "CP12" and chance(rng, 0.7)
+        certificate = self.server.CERTIFICATE_MODELS[cert_type](
+            id=certificate_id,
+            certificate_type=cert_type,
+            certificate_number=f"{self.server.certificate_prefix(cert_type)}-{str(seq).zfill(5)}",
+            landlord_customer_name=customer["name"],
+            landlord_customer_address=customer["address"],
+            landlord_customer_phone=customer["phone"],
+            landlord_customer_email=customer["email"],
+            inspection_address=self.address(rng)[0] if tenanted else customer["address"],
+            inspection_date=inspection_date,
+            next_inspection_due=None if cert_type == "GWN" else inspection_date + timedelta(days=365),
+            engineer_name=engineer,
+            gas_safe_number=None if oil else gas_safe_number,
+            oftec_number=(oftec_number or "C100000") if oil else None,
+            notes=rng.choice(SALE_NOTES[:4]) if chance(rng, 0.1) else None,
+            created_by=self.created_by,
+            created_at=inspection_date,
+            **getattr(self, f"{cert_type.lower()}_fields")(rng, inspection_date)
+        )
+        return certificate.model_dump(exclude_none=True)
+
+    def appliance(self, rng: random.Random, appliance_type: str) -> dict:
+        makes, areas, flues = APPLIANCES[appliance_type]
+        flue_type = rng.choice(flues)
+        defect = rng.choice(APPLIANCE_DEFECTS) if chance(rng, 0.04) else None
+        flued = flue_type != "Flueless"
+        return {
+            "appliance_type": appliance_type,
+            "make_model": rng.choice(makes),
+            "installation_area": rng.choice(areas),
+            "flue_type": flue_type,
+            "operating_pressure": f"{rng.uniform(18, 22):.1f} mb",
+            "safety_devices_ok": defect is None or chance(rng, 0.5),
+            "ventilation_satisfactory": defect != "Inadequate ventilation",
+            "flue_condition_satisfactory": defect is None or not flued,
+            "flue_operation_ok": defect != "Spillage test failed",
+            "co_reading": f"{rng.uniform(0.0001, 0.0040):07.4f}" if appliance_type == "Boiler" else None,
+            "co2_reading": f"{rng.uniform(8.5, 10.5):07.4f}" if appliance_type == "Boiler" else None,
+            "fan_pressure_reading": f"-{rng.uniform(0.5, 2.5):05.1f} mb" if flue_type == "Fan assisted" else None,
+            "defects": defect,
+        }
+
+    def warning_fields(self, rng: random.Random, defect: str) -> dict:
+        risk = rng.choice(["AR", "ID"])
+        return {
+            "risk_classification": risk,
+            "defect_description": defect,
+            "action_taken": "Appliance turned off and isolated" if risk == "ID" else "Customer advised not to use the appliance",
+            "warning_label_attached": True,
+            "appliance_isolated": risk == "ID",
+        }
+
+    def cp12_fields(self, rng: random.Random, inspection_date: datetime) -> dict:
+        others = rng.choices(["Gas fire", "Cooker", "Hob", "Water heater"], k=rng.choices([0, 1, 2, 3], weights=[45, 35, 15, 5])[0])
+        appliances = [self.appliance(rng, appliance_type) for appliance_type in ["Boiler"] + others]
+        defects = [appliance["defects"] for appliance in appliances if appliance["defects"]]
+        fields = {
+            "let_by_tightness_test": chance(rng, 0.99),
+            "equipotential_bonding": chance(rng, 0.95),
+            "ecv_accessible": chance(rng, 0.97),
+            "pipework_visual_inspection": chance(rng, 0.98),
+            "co_alarm_working": chance(rng, 0.9),
+            "smoke_alarm_working": chance(rng, 0.92),
+            "appliances": appliances,
+            "compliance_statement": "Defects found, see warning notice" if defects else "All appliances inspected are safe to use",
+        }
+        if defects:
+            fields.update(self.warning_fields(rng, "; ".join(defects)))
+        return fields
+
+    def gwn_fields(self, rng: random.Random, inspection_date: datetime) -> dict:
+        return self.warning_fields(rng, rng.choice(APPLIANCE_DEFECTS))
+
+    def cd11_fields(self, rng: random.Random, inspection_date: datetime) -> dict:
+        net_efficiency = rng.uniform(88, 95)
+        return {
+            "oil_service_work": "Annual service",
+            "smoke_number": str(rng.choice([0, 0, 0, 1])),
+            "co_ppm": str(rng.randint(5, 60)),
+            "excess_air_percent": f"{rng.uniform(15, 30):.0f}",
+            "co2_percent": f"{rng.uniform(11, 12.5):.1f}",
+            "oil_flow_rate": f"{rng.uniform(1.8, 3.2):.2f} kg/h",
+            "flue_gas_temp": f"{rng.randint(160, 230)} °C",
+            "appliance_make_model": rng.choice(OIL_BOILERS),
+            "burner_type": rng.choice(OIL_BURNERS),
+            "burner_cleaned": True,
+            "nozzle_replaced": chance(rng, 0.8),
+            "filter_checked": True,
+            "controls_tested": True,
+            "safety_devices_tested": True,
+            "flue_inspected": chance(rng, 0.97),
+            "pump_pressure": f"{rng.randint(100, 150)} psi",
+            "nozzle_size": rng.choice(["0.50", "0.55", "0.60", "0.65", "0.75"]),
+            "nozzle_angle": rng.choice(["60°", "70°", "80°"]),
+            "nozzle_pattern": rng.choice(["S", "H", "W"]),
+            "co_co2_ratio": f"{rng.uniform(0.0002, 0.0006):.4f}",
+            "net_efficiency": f"{net_efficiency:.1f}",
+            "gross_efficiency": f"{net_efficiency - 6:.1f}",
+            "parts_replaced": rng.choice([None, "Nozzle", "Nozzle, filter", "Photocell", "Oil hose"]),
+        }
+
+    def tank_fields(self, rng: random.Random) -> dict:
+        return {
+            "tank_type": rng.choice(["Bunded", "Bunded", "Single skin"]),
+            "tank_capacity": f"{rng.choice([1000, 1225, 1800, 2500])} litres",
+            "tank_material": rng.choice(["Plastic", "Plastic", "Steel"]),
+        }
+
+    def cd10_fields(self, rng: random.Random, inspection_date: datetime) -> dict:
+        return {
+            **self.cd11_fields(rng, inspection_date),
+            **self.tank_fields(rng),
+            "oil_service_work": "Commissioning",
+            "base_support_type": rng.choice(["Concrete base", "Paving slabs"]),
+            "pipework_material": rng.choice(["Copper", "Plastic coated copper"]),
+            "fire_valve_fitted": True,
+            "building_control_notified": True,
+            "installation_date": inspection_date,
+            "work_type": rng.choice(["Boiler replacement", "New installation", "Tank replacement"]),
+            "appliance_serial_number": f"{rng.randint(10**9, 10**10 - 1)}",
+            "output_rating": f"{rng.choice([15, 18, 21, 26, 35])} kW",
+            "fuel_type": "Kerosene (C2)",
+            "tank_pressure_tested": True,
+            "pressure_test_result": "Pass",
+            "complies_with_standards": True,
+        }
+
+    def ti133d_fields(self, rng: random.Random, inspection_date: datetime) -> dict:
+        tank = self.tank_fields(rng)
+        risk = rng.choices(["Low", "Medium", "High"], weights=[70, 22, 8])[0]
+        return {
+            **tank,
+            "tank_construction": "Bunded" if tank["tank_type"] == "Bunded" else "Single wall",
+            "spillage_risk_level": risk,
+            "fire_risk_level": rng.choices(["Low", "Medium", "High"], weights=[80, 15, 5])[0],
+            "distance_to_building": f"{rng.uniform(0.5, 5):.1f} m",
+            "secondary_containment_adequate": tank["tank_type"] == "Bunded",
+            "tank_age": f"{rng.randint(1, 30)} years",
+            "tank_location": rng.choice(["Rear garden", "Side of property", "Driveway", "Outbuilding"]),
+            "tank_condition_good": risk != "High",
+            "tank_positioned_correctly": chance(rng, 0.9),
+            "adequate_ventilation": True,
+            "fire_valve_present": chance(rng, 0.95),
+            "distance_adequate": chance(rng, 0.85),
+            "away_from_ignition_sources": chance(rng, 0.95),
+            "away_from_drains": chance(rng, 0.9),
+            "pipework_secure": chance(rng, 0.95),
+            "no_visible_leaks": risk != "High",
+            "vent_pipe_correct": chance(rng, 0.97),
+            "fill_line_correct": chance(rng, 0.97),
+            "environmental_hazards": rng.choice(["Watercourse within 10 m", "Open drain within 50 m"]) if risk != "Low" else None,
+            "actions_required": "Replace tank with a bunded tank" if risk == "High" else None,
+            "urgent_attention_needed": risk == "High",
+        }
+
+    def benchmark_fields(self, rng: random.Random, inspection_date: datetime) -> dict:
+        make, model = rng.choice(GAS_BOILERS).split(" ", 1)
+        return {
+            "boiler_make": make,
+            "boiler_model": model,
+            "boiler_serial_number": f"{rng.randint(10**11, 10**12 - 1)}",
+            "boiler_type": rng.choice(["Combi", "Combi", "System", "Regular"]),
+            "gas_rate": f"{rng.uniform(2.5, 3.5):.2f} m³/h",
+            "gas_inlet_pressure_max": f"{rng.uniform(19, 21):.1f} mb",
+            "burner_pressure_na": True,
+            "co_max_rate": f"{rng.randint(50, 150)} ppm",
+            "co_min_rate": f"{rng.randint(10, 40)} ppm",
+            "co2_max_rate": f"{rng.uniform(8.8, 9.8):.1f}%",
+            "co2_min_rate": f"{rng.uniform(8.2, 9.0):.1f}%",
+            "co_co2_ratio_max": f"{rng.uniform(0.0005, 0.0015):.4f}",
+            "co_co2_ratio_min": f"{rng.uniform(0.0002, 0.0008):.4f}",
+            "flue_integrity_checked": True,
+            "gas_tightness_tested": True,
+            "spillage_test_passed": True,
+            "cold_water_inlet_temp": f"{rng.randint(8, 14)} °C",
+            "hot_water_outlets_tested": True,
+            "heating_controls_tested": True,
+            "hot_water_controls_tested": True,
+            "interlock_tested": True,
+            "condensate_installed_correctly": True,
+            "condensate_termination": rng.choice(["Internal drain", "Soakaway", "External gully"]),
+            "condensate_disposal_method": rng.choice(["Gravity", "Pump"]),
+            "complies_with_manufacturer_instructions": True,
+            "clearances_met": True,
+            "gas_supply_purged": True,
+            "operation_demonstrated": True,
+            "literature_provided": True,
+            "benchmark_explained": True,
+            "notification_method": rng.choice(["Gas Safe Register", "Building control"]),
+            "compliance_certificate_issued": True,
+            "building_control_notified": True,
+        }
+
+async def seed(server, volumes: Volumes, created_by: str, seed: int = 1) -> dict:
+    """Insert the requested volumes and return their ids by collection.
+
+    The counters and report rollups are brought in line afterwards.
+    """
+    generator = Generator(server, volumes, created_by, seed)
+    ids = {f"certificates:{cert_type}": [] for cert_type in CERTIFICATE_TYPES}
+    for collection in Volumes.names():
+        ids[collection] = []
+        count = getattr(volumes, collection)
+        for start in range(1, count + 1, BATCH_SIZE):
+            docs = generator.batch(collection, start, min(start + BATCH_SIZE, count + 1))
+            await server.db[collection].insert_many(docs)
+            if collection == "invoices":
+                await server.update_rollups(added=docs)
+            ids[collection] += [doc["id"] for doc in docs]
+            if collection == "certificates":
+                for doc in docs:
+                    ids[f"certificates:{doc['certificate_type']}"].append(doc["id"])
+    await server.seed_counters()
+
+    # Spare pools come off the end of each list: keep the estimates that can
+    # still be converted there
+    ids["estimates"] = [id_ for m, id_ in enumerate(ids["estimates"], 1) if generator.converts(m)] + \
+                       [id_ for m, id_ in enumerate(ids["estimates"], 1) if not generator.converts(m)]
+    return ids
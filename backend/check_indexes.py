@@ -0,0 +1,66 @@
+"""Assert that the hot API queries are served by an index (IXSCAN), not a collection scan.
+
+Run against the database configured in backend/.env:
+
+    python check_indexes.py
+"""
+import asyncio
+import sys
+
+from server import REMINDER_LEAD_DAYS, client, db, due_query, ensure_indexes
+
+# (description, collection, filter, sort) for every query issued on a hot path
+HOT_QUERIES = [
+    ("users by id (get_current_user)", "users", {"id": "x"}, None),
+    ("users by email (login/register)", "users", {"email": "x@example.com"}, None),
+    ("customers by id", "customers", {"id": "x"}, None),
+    ("services by id", "services", {"id": "x"}, None),
+    ("invoices by id", "invoices", {"id": "x"}, None),
+    ("estimates by id", "estimates", {"id": "x"}, None),
+    ("certificates by id", "certificates", {"id": "x"}, None),
+    ("company settings", "company_settings", {"id": "company_settings"}, None),
+    ("customer list", "customers", {}, [("seq", 1), ("customer_number", 1)]),
+    ("service list", "services", {}, [("created_at", 1), ("id", 1)]),
+    ("invoice list", "invoices", {}, [("seq", -1), ("invoice_number", -1)]),
+    ("estimate list", "estimates", {}, [("seq", -1), ("estimate_number", -1)]),
+    ("certificate list", "certificates", {}, [("certificate_type", -1), ("seq", -1), ("certificate_number", -1)]),
+    ("last certificate of type", "certificates", {"certificate_type": "CP12"}, [("certificate_number", -1)]),
+    ("certificates due", "certificates", due_query(REMINDER_LEAD_DAYS), [("next_inspection_due", 1), ("id", 1)]),
+    ("queued reminders", "reminders", {"status": "queued"}, [("due_date", 1)]),
+    ("customer search", "customers", {"$text": {"$search": "NR19"}}, None),
+    ("invoice search", "invoices", {"$text": {"$search": "INV00001"}}, None),
+    ("certificate search", "certificates", {"$text": {"$search": "NR19"}}, None),
+]
+
+def plan_stages(plan: dict) -> set:
+    stages = {plan.get("stage")}
+    for key in ("inputStage", "queryPlan"):
+        if key in plan:
+            stages |= plan_stages(plan[key])
+    for child in plan.get("inputStages", []):
+        stages |= plan_stages(child)
+    return stages
+
+async def check_hot_queries() -> bool:
+    await ensure_indexes()
+    ok = True
+    for description, collection, query, sort in HOT_QUERIES:
+        cursor = db[collection].find(query).limit(1)
+        if sort:
+            cursor = cursor.sort(sort)
+        explain = await cursor.explain()
+        stages = plan_stages(explain["queryPlanner"]["winningPlan"])
+        uses_index = "IXSCAN" in stages
+        ok = ok and uses_index
+        print(f"{'✅' if uses_index else '❌'} {description}: {', '.join(sorted(s for s in stages if s))}")
+    return ok
+
+def main():
+    try:
+        ok = asyncio.run(check_hot_queries())
+    finally:
+        client.close()
+    return 0 if ok else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,302 @@
+"""Per-process request and MongoDB command metrics in Prometheus text format.
+
+MetricsMiddleware times every HTTP request and labels it with the route
+template (/api/customers/{customer_id}) rather than the raw path, so label
+cardinality stays bounded. CommandMetrics is a pymongo command listener that
+times every command per collection and command name. Both only bump counters
+on the hot path; text is built when /metrics is scraped. SlowQueryListener
+hands commands over a latency threshold to the event loop, for server.py to
+explain and log with their values redacted.
+
+Counters live in the worker process, so run one scrape target per worker.
+"""
+import asyncio
+import bisect
+import hashlib
+import json
+import threading
+import time
+from collections import defaultdict
+
+from pymongo import monitoring
+
+EXPOSITION_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Upper bounds in seconds; requests and commands share them
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Requests that never reached a route (404s, CORS preflights, idempotent replays)
+UNMATCHED_ROUTE = "unmatched"
+
+class Histogram:
+    __slots__ = ("buckets", "counts", "sum")
+
+    def __init__(self, buckets: tuple = LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # last slot is +Inf
+        self.sum = 0.0
+
+    def observe(self, value: float):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+
+    def lines(self, name: str, labels: str) -> list:
+        lines = []
+        total = 0
+        for bound, count in zip(self.buckets, self.counts):
+            total += count
+            lines.append(f'{name}_bucket{{{labels},le="{bound}"}} {total}')
+        total += self.counts[-1]
+        lines.append(f'{name}_bucket{{{labels},le="+Inf"}} {total}')
+        lines.append(f"{name}_sum{{{labels}}} {self.sum}")
+        lines.append(f"{name}_count{{{labels}}} {total}")
+        return lines
+
+def label_value(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def format_labels(**labels) -> str:
+    return ",".join(f'{name}="{label_value(value)}"' for name, value in labels.items())
+
+def metric_header(name: str, kind: str, help_text: str) -> list:
+    return [f"# HELP {name} {help_text}", f"# TYPE {name} {kind}"]
+
+class RequestMetrics:
+    """HTTP request counters, only touched from the event loop thread."""
+
+    def __init__(self, buckets: tuple = LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.durations = {}  # (method, route) -> Histogram
+        self.responses = defaultdict(int)  # (method, route, status) -> count
+        self.in_progress = defaultdict(int)  # method -> count
+
+    def observe(self, method: str, route: str, status_code: int, seconds: float):
+        key = (method, route)
+        histogram = self.durations.get(key)
+        if histogram is None:
+            histogram = self.durations[key] = Histogram(self.buckets)
+        histogram.observe(seconds)
+        self.responses[(method, route, status_code)] += 1
+
+    def lines(self) -> list:
+        lines = metric_header("http_requests_total", "counter", "HTTP responses by route template and status code.")
+        for (method, route, status_code), count in sorted(self.responses.items()):
+            lines.append(f"http_requests_total{{{format_labels(method=method, route=route, status=status_code)}}} {count}")
+        lines += metric_header("http_requests_in_progress", "gauge", "HTTP requests currently being handled.")
+        for method, count in sorted(self.in_progress.items()):
+            lines.append(f"http_requests_in_progress{{{format_labels(method=method)}}} {count}")
+        lines += metric_header("http_request_duration_seconds", "histogram", "HTTP request latency by route template.")
+        for (method, route), histogram in sorted(self.durations.items()):
+            lines += histogram.lines("http_request_duration_seconds", format_labels(method=method, route=route))
+        return lines
+
+class MetricsMiddleware:
+    """Record count, status and latency for every HTTP request.
+
+    The route template is read from scope["route"], which FastAPI sets when it
+    matches a route, so no extra routing work is done here. Latency covers the
+    whole response, including streamed bodies.
+    """
+
+    def __init__(self, app, metrics: RequestMetrics):
+        self.app = app
+        self.metrics = metrics
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        method = scope["method"]
+        status_code = 500
+
+        async def status_send(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        in_progress = self.metrics.in_progress
+        in_progress[method] += 1
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, status_send)
+        finally:
+            elapsed = time.perf_counter() - start
+            in_progress[method] -= 1
+            route = scope.get("route")
+            self.metrics.observe(method, route.path if route is not None else UNMATCHED_ROUTE, status_code, elapsed)
+
+class CommandMetrics(monitoring.CommandListener):
+    """Time MongoDB commands per collection and command name.
+
+    Motor runs pymongo on a thread pool, so events arrive on worker threads
+    and the counters are guarded by a lock.
+    """
+
+    def __init__(self, buckets: tuple = LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.lock = threading.Lock()
+        self.pending = {}  # (connection_id, request_id) -> collection
+        self.durations = {}  # (collection, command) -> Histogram
+        self.failures = defaultdict(int)  # (collection, command) -> count
+
+    @staticmethod
+    def collection(event) -> str:
+        if event.command_name == "getMore":
+            return event.command.get("collection", "")
+        target = event.command.get(event.command_name)
+        return target if isinstance(target, str) else ""
+
+    def started(self, event):
+        self.pending[(event.connection_id, event.request_id)] = self.collection(event)
+
+    def succeeded(self, event):
+        self.record(event, failed=False)
+
+    def failed(self, event):
+        self.record(event, failed=True)
+
+    def record(self, event, failed: bool):
+        collection = self.pending.pop((event.connection_id, event.request_id), "")
+        key = (collection, event.command_name)
+        with self.lock:
+            histogram = self.durations.get(key)
+            if histogram is None:
+                histogram = self.durations[key] = Histogram(self.buckets)
+            histogram.observe(event.duration_micros / 1e6)
+            if failed:
+                self.failures[key] += 1
+
+    def lines(self) -> list:
+        with self.lock:
+            durations = {key: (list(histogram.counts), histogram.sum) for key, histogram in self.durations.items()}
+            failures = dict(self.failures)
+        lines = metric_header("mongodb_command_duration_seconds", "histogram", "MongoDB command latency by collection and command.")
+        for (collection, command), (counts, total) in sorted(durations.items()):
+            snapshot = Histogram(self.buckets)
+            snapshot.counts, snapshot.sum = counts, total
+            lines += snapshot.lines("mongodb_command_duration_seconds", format_labels(collection=collection, command=command))
+        lines += metric_header("mongodb_command_failures_total", "counter", "Failed MongoDB commands by collection and command.")
+        for (collection, command), count in sorted(failures.items()):
+            lines.append(f"mongodb_command_failures_total{{{format_labels(collection=collection, command=command)}}} {count}")
+        return lines
+
+def exposition(*sources) -> str:
+    """Render metric sources (anything with lines()) as one scrape body."""
+    return "\n".join(line for source in sources for line in source.lines()) + "\n"
+
+# Commands whose filter can be shaped and re-run under explain
+EXPLAINABLE_COMMANDS = {"find", "aggregate", "count", "distinct", "findAndModify", "update", "delete"}
+
+def redact(value):
+    """Replace every value in a filter with "?", keeping field names and operators."""
+    if isinstance(value, dict):
+        return {key: redact(item) for key, item in value.items()}
+    if isinstance(value, list) and any(isinstance(item, dict) for item in value):
+        return [redact(item) for item in value]  # $and / $or / $nor clauses
+    return "?"
+
+def redact_stage(stage: dict) -> dict:
+    # Sort directions are not data, so $sort stages are kept as written
+    return {name: body if name == "$sort" else redact(body) for name, body in stage.items()}
+
+def command_shape(command_name: str, command: dict) -> dict:
+    """The redacted filter/sort/pipeline of a command, without any literal values."""
+    shape = {}
+    if command_name == "find":
+        shape["filter"] = redact(command.get("filter", {}))
+        shape["sort"] = command.get("sort")
+    elif command_name == "aggregate":
+        shape["pipeline"] = [redact_stage(stage) for stage in command.get("pipeline", [])]
+    elif command_name == "count":
+        shape["filter"] = redact(command.get("query", {}))
+    elif command_name == "distinct":
+        shape["filter"] = redact(command.get("query", {}))
+        shape["key"] = command.get("key")
+    elif command_name == "findAndModify":
+        shape["filter"] = redact(command.get("query", {}))
+        shape["sort"] = command.get("sort")
+    elif command_name in ("update", "delete"):
+        statements = command.get(f"{command_name}s") or [{}]
+        shape["filter"] = redact(statements[0].get("q", {}))
+    return {key: value for key, value in shape.items() if value is not None}
+
+def shape_id(collection: str, command_name: str, shape: dict) -> str:
+    key = json.dumps([collection, command_name, shape], default=str)
+    return hashlib.sha1(key.encode()).hexdigest()[:16]
+
+def explain_target(command_name: str, command: dict) -> dict:
+    """The command as it can be re-run under explain.
+
+    Session, transaction and write concern fields are not accepted inside an
+    explain, and a multi-statement write is explained by its first statement.
+    """
+    target = {
+        key: value for key, value in command.items()
+        if not key.startswith("$") and key not in ("lsid", "txnNumber", "autocommit", "startTransaction", "writeConcern")
+    }
+    if command_name in ("update", "delete"):
+        field = f"{command_name}s"
+        target[field] = target.get(field, [])[:1]
+    return target
+
+class SlowQueryListener(monitoring.CommandListener):
+    """Hand commands slower than a threshold to an asyncio queue.
+
+    Only EXPLAINABLE_COMMANDS are watched. Motor calls the listener on its
+    worker threads, so entries cross to the event loop with
+    call_soon_threadsafe; entries are dropped, and counted, while the queue
+    is full rather than slowing the commands down.
+    """
+
+    def __init__(self, threshold_ms: float, ignored_collections: tuple = ()):
+        self.threshold_micros = threshold_ms * 1000
+        self.ignored_collections = set(ignored_collections)
+        self.loop = None
+        self.queue = None
+        self.pending = {}  # (connection_id, request_id) -> (database, command)
+        self.dropped = 0
+
+    def attach(self, loop: asyncio.AbstractEventLoop, queue: asyncio.Queue):
+        self.loop = loop
+        self.queue = queue
+
+    def started(self, event):
+        if self.loop is None or event.command_name not in EXPLAINABLE_COMMANDS:
+            return
+        if event.command.get(event.command_name) in self.ignored_collections:
+            return
+        self.pending[(event.connection_id, event.request_id)] = (event.database_name, event.command)
+
+    def succeeded(self, event):
+        self.finish(event)
+
+    def failed(self, event):
+        self.finish(event)
+
+    def finish(self, event):
+        watched = self.pending.pop((event.connection_id, event.request_id), None)
+        if watched is None or event.duration_micros < self.threshold_micros:
+            return
+        database_name, command = watched
+        entry = {
+            "database": database_name,
+            "collection": command.get(event.command_name),
+            "command_name": event.command_name,
+            "command": command,
+            "duration_ms": event.duration_micros / 1000,
+        }
+        try:
+            self.loop.call_soon_threadsafe(self.enqueue, entry)
+        except RuntimeError:
+            pass  # event loop already closed at shutdown
+
+    def enqueue(self, entry: dict):
+        try:
+            self.queue.put_nowait(entry)
+        except asyncio.QueueFull:
+            self.dropped += 1
+
+    def lines(self) -> list:
+        lines = metric_header("mongodb_slow_queries_dropped_total", "counter", "Slow commands not logged because the queue was full.")
+        lines.append(f"mongodb_slow_queries_dropped_total {self.dropped}")
+        return lines
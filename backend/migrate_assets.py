@@ -0,0 +1,53 @@
+"""One-off migration: move base64 logo and signature data URLs into GridFS.
+
+Rewrites company_settings.logo and the certificate signature fields in place
+with /api/assets/{id} URLs. Safe to re-run; values that are not data URLs are
+left alone.
+
+    python migrate_assets.py
+"""
+import asyncio
+import sys
+
+from server import SIGNATURE_FIELDS, client, db, externalize_data_url
+
+DATA_URL_PATTERN = {"$regex": "^data:"}
+
+async def migrate_settings() -> int:
+    settings = await db.company_settings.find_one({"id": "company_settings", "logo": DATA_URL_PATTERN})
+    if not settings:
+        return 0
+    logo_url = await externalize_data_url(settings["logo"])
+    await db.company_settings.update_one({"id": "company_settings"}, {"$set": {"logo": logo_url}})
+    return 1
+
+async def migrate_certificates() -> int:
+    query = {"$or": [{field: DATA_URL_PATTERN} for field in SIGNATURE_FIELDS]}
+    projection = {"_id": 0, "id": 1, **{field: 1 for field in SIGNATURE_FIELDS}}
+    migrated = 0
+    async for cert in db.certificates.find(query, projection):
+        update = {}
+        for field in SIGNATURE_FIELDS:
+            value = cert.get(field)
+            new_value = await externalize_data_url(value)
+            if new_value != value:
+                update[field] = new_value
+        if update:
+            await db.certificates.update_one({"id": cert["id"]}, {"$set": update})
+            migrated += 1
+    return migrated
+
+async def migrate() -> None:
+    settings = await migrate_settings()
+    certificates = await migrate_certificates()
+    print(f"Migrated {settings} logo(s) and {certificates} certificate(s) to GridFS assets")
+
+def main():
+    try:
+        asyncio.run(migrate())
+    finally:
+        client.close()
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,75 @@
+"""One-off migration: convert ISO-8601 string dates into native BSON datetimes.
+
+Earlier versions stored every date with .isoformat(). The API now writes and
+queries native dates, so existing string values are rewritten in place.
+Safe to re-run; fields that are already dates are skipped.
+
+    python migrate_dates.py
+"""
+import asyncio
+import sys
+from datetime import datetime, timezone
+
+from pymongo import UpdateOne
+
+from server import client, db
+
+BATCH_SIZE = 1000
+
+DATE_FIELDS = {
+    "users": ["created_at"],
+    "customers": ["created_at"],
+    "services": ["created_at"],
+    "invoices": ["created_at", "issue_date", "due_date"],
+    "estimates": ["created_at", "issue_date", "valid_until"],
+    "certificates": ["created_at", "inspection_date", "next_inspection_due", "installation_date"],
+    "company_settings": ["updated_at"],
+}
+
+def parse_date(value: str) -> datetime:
+    parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    # Naive strings were written from UTC timestamps
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
+
+async def migrate_collection(name: str, fields: list) -> int:
+    collection = db[name]
+    query = {"$or": [{field: {"$type": "string"}} for field in fields]}
+    projection = {field: 1 for field in fields}
+    migrated = 0
+    operations = []
+
+    async for doc in collection.find(query, projection):
+        update = {}
+        for field in fields:
+            value = doc.get(field)
+            if isinstance(value, str):
+                try:
+                    update[field] = parse_date(value) if value else None
+                except ValueError:
+                    print(f"⚠️  {name} {doc['_id']}: could not parse {field}={value!r}")
+        if update:
+            operations.append(UpdateOne({"_id": doc["_id"]}, {"$set": update}))
+        if len(operations) >= BATCH_SIZE:
+            await collection.bulk_write(operations, ordered=False)
+            migrated += len(operations)
+            operations = []
+
+    if operations:
+        await collection.bulk_write(operations, ordered=False)
+        migrated += len(operations)
+    return migrated
+
+async def migrate() -> None:
+    for name, fields in DATE_FIELDS.items():
+        migrated = await migrate_collection(name, fields)
+        print(f"{name}: converted dates on {migrated} document(s)")
+
+def main():
+    try:
+        asyncio.run(migrate())
+    finally:
+        client.close()
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
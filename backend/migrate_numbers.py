@@ -0,0 +1,29 @@
+"""One-off migration: store the numeric seq behind every document number.
+
+List endpoints sort on seq, because the zero-padded numbers stop sorting as
+strings past 99999 (INV100000 < INV99999). New documents get seq when they
+are created, and the server backfills older ones in the background on
+startup; run this to do it up front. Safe to re-run; documents that already
+have a seq are skipped.
+
+    python migrate_numbers.py
+"""
+import asyncio
+import sys
+
+from server import backfill_seq, client, ensure_indexes
+
+async def migrate() -> None:
+    await ensure_indexes()
+    for name, migrated in (await backfill_seq()).items():
+        print(f"{name}: set seq on {migrated} document(s)")
+
+def main():
+    try:
+        asyncio.run(migrate())
+    finally:
+        client.close()
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,222 @@
+"""PDF layouts for invoices, estimates and certificates.
+
+Rendering is CPU bound, so server.py runs render_document in a process pool.
+This module deliberately imports nothing from server.py: workers only need
+fpdf2 and the plain dicts they are handed.
+"""
+import io
+from datetime import datetime
+
+from fpdf import FPDF
+
+CERTIFICATE_TITLES = {
+    "CP12": "Landlord Gas Safety Record (CP12)",
+    "GWN": "Gas Warning Notice",
+    "CD11": "Oil Firing Service / Commissioning Report (CD11)",
+    "CD10": "Oil Installation Completion Report (CD10)",
+    "TI133D": "Oil Storage Tank Risk Assessment (TI133D)",
+    "BENCHMARK": "Benchmark Commissioning Checklist",
+}
+
+# Certificate fields laid out in the header blocks rather than the details table
+CERTIFICATE_HEADER_FIELDS = {
+    "id", "certificate_type", "certificate_number", "created_by", "created_at",
+    "landlord_customer_name", "landlord_customer_address", "landlord_customer_phone",
+    "landlord_customer_email", "inspection_address", "inspection_date", "next_inspection_due",
+    "engineer_name", "gas_safe_number", "oftec_number", "appliances", "notes",
+}
+
+SIGNATURE_LABELS = {
+    "engineer_signature": "Engineer",
+    "responsible_person_signature": "Responsible person",
+    "customer_signature": "Customer",
+}
+
+APPLIANCE_COLUMNS = [
+    ("appliance_type", "Type", 28),
+    ("make_model", "Make / model", 38),
+    ("installation_area", "Location", 28),
+    ("flue_type", "Flue", 22),
+    ("co_reading", "CO", 18),
+    ("co2_reading", "CO2", 18),
+    ("defects", "Defects", 38),
+]
+
+def text(value) -> str:
+    """Format a value for the latin-1 core fonts."""
+    if value is None:
+        return ""
+    if isinstance(value, bool):
+        return "Yes" if value else "No"
+    if isinstance(value, datetime):
+        return value.strftime("%d/%m/%Y")
+    return str(value).encode("latin-1", "replace").decode("latin-1")
+
+def money(value) -> str:
+    return f"\xa3{value:,.2f}"
+
+def label(field: str) -> str:
+    return field.replace("_", " ").capitalize()
+
+class DocumentPDF(FPDF):
+    def __init__(self, settings: dict, logo: bytes = None):
+        super().__init__(format="A4")
+        self.settings = settings
+        self.logo = logo
+        self.set_auto_page_break(auto=True, margin=20)
+        self.set_margins(15, 15, 15)
+
+    def header(self):
+        if self.logo:
+            self.image(io.BytesIO(self.logo), x=15, y=12, h=18)
+        self.set_font("Helvetica", "B", 14)
+        self.cell(0, 7, text(self.settings.get("company_name")), align="R", new_x="LMARGIN", new_y="NEXT")
+        self.set_font("Helvetica", "", 8)
+        for line in [self.settings.get("address"), self.settings.get("phone"), self.settings.get("email")]:
+            if line:
+                self.cell(0, 4, text(line).replace("\n", ", "), align="R", new_x="LMARGIN", new_y="NEXT")
+        self.ln(6)
+
+    def footer(self):
+        self.set_y(-15)
+        self.set_font("Helvetica", "", 7)
+        details = []
+        if self.settings.get("registration_number"):
+            details.append(f"Company no. {self.settings['registration_number']}")
+        if self.settings.get("vat_number"):
+            details.append(f"VAT no. {self.settings['vat_number']}")
+        details.append(f"Page {self.page_no()}/{{nb}}")
+        self.cell(0, 5, text("  |  ".join(details)), align="C")
+
+    def title_block(self, title: str, number: str, dates: list):
+        self.set_font("Helvetica", "B", 16)
+        self.cell(0, 9, text(title), new_x="LMARGIN", new_y="NEXT")
+        self.set_font("Helvetica", "", 9)
+        self.cell(0, 5, text(number), new_x="LMARGIN", new_y="NEXT")
+        for name, value in dates:
+            if value:
+                self.cell(0, 5, f"{name}: {text(value)}", new_x="LMARGIN", new_y="NEXT")
+        self.ln(4)
+
+    def address_block(self, heading: str, lines: list):
+        self.set_font("Helvetica", "B", 10)
+        self.cell(0, 6, heading, new_x="LMARGIN", new_y="NEXT")
+        self.set_font("Helvetica", "", 9)
+        for line in lines:
+            if line:
+                self.multi_cell(0, 4.5, text(line), new_x="LMARGIN", new_y="NEXT")
+        self.ln(3)
+
+    def section(self, heading: str):
+        self.ln(2)
+        self.set_font("Helvetica", "B", 11)
+        self.cell(0, 7, heading, new_x="LMARGIN", new_y="NEXT")
+        self.set_font("Helvetica", "", 9)
+
+    def key_values(self, rows: list):
+        with self.table(col_widths=(60, 120), first_row_as_headings=False, line_height=5) as table:
+            for key, value in rows:
+                table.row([key, text(value)])
+
+def render_items(pdf: DocumentPDF, doc: dict):
+    pdf.section("Items")
+    with pdf.table(col_widths=(90, 20, 35, 35), text_align=("LEFT", "RIGHT", "RIGHT", "RIGHT"), line_height=5) as table:
+        table.row(["Description", "Qty", "Unit price", "Total"])
+        for item in doc["items"]:
+            description = item["service_name"]
+            if item.get("description"):
+                description += f"\n{item['description']}"
+            table.row([text(description), f"{item['quantity']:g}", money(item["price"]), money(item["total"])])
+
+    pdf.ln(3)
+    pdf.set_font("Helvetica", "", 10)
+    for name, value in [("Subtotal", doc["subtotal"]), (f"VAT ({doc['vat_rate']:g}%)", doc["vat_amount"])]:
+        pdf.cell(145, 6, name, align="R")
+        pdf.cell(35, 6, money(value), align="R", new_x="LMARGIN", new_y="NEXT")
+    pdf.set_font("Helvetica", "B", 11)
+    pdf.cell(145, 7, "Total", align="R")
+    pdf.cell(35, 7, money(doc["total"]), align="R", new_x="LMARGIN", new_y="NEXT")
+
+def render_sale(pdf: DocumentPDF, kind: str, doc: dict):
+    if kind == "invoices":
+        pdf.title_block("INVOICE", doc["invoice_number"], [("Issued", doc["issue_date"]), ("Due", doc.get("due_date"))])
+    else:
+        pdf.title_block("ESTIMATE", doc["estimate_number"], [("Issued", doc["issue_date"]), ("Valid until", doc.get("valid_until"))])
+    pdf.address_block("Bill to", [doc["customer_name"], doc["customer_address"], doc["customer_phone"], doc.get("customer_email")])
+    render_items(pdf, doc)
+
+    if doc.get("notes"):
+        pdf.section("Notes")
+        pdf.multi_cell(0, 4.5, text(doc["notes"]), new_x="LMARGIN", new_y="NEXT")
+
+    settings = pdf.settings
+    if kind == "invoices" and settings.get("account_number"):
+        pdf.section("Payment details")
+        pdf.key_values([
+            ("Bank", settings.get("bank_name")),
+            ("Sort code", settings.get("sort_code")),
+            ("Account number", settings.get("account_number")),
+            ("Reference", doc["invoice_number"]),
+        ])
+
+def render_certificate(pdf: DocumentPDF, doc: dict, signatures: dict):
+    title = CERTIFICATE_TITLES.get(doc.get("certificate_type"), "Certificate")
+    pdf.title_block(title, doc["certificate_number"], [
+        ("Inspection date", doc.get("inspection_date")),
+        ("Next inspection due", doc.get("next_inspection_due")),
+    ])
+    pdf.address_block("Landlord / customer", [
+        doc.get("landlord_customer_name"), doc.get("landlord_customer_address"),
+        doc.get("landlord_customer_phone"), doc.get("landlord_customer_email"),
+    ])
+    pdf.address_block("Inspection address", [doc.get("inspection_address")])
+
+    details = [
+        (label(field), value) for field, value in doc.items()
+        if field not in CERTIFICATE_HEADER_FIELDS and field not in SIGNATURE_LABELS and value is not None
+    ]
+    if details:
+        pdf.section("Details")
+        pdf.key_values(details)
+
+    if doc.get("appliances"):
+        pdf.section("Appliances")
+        pdf.set_font("Helvetica", "", 8)
+        with pdf.table(col_widths=tuple(width for _, _, width in APPLIANCE_COLUMNS), line_height=4.5) as table:
+            table.row([heading for _, heading, _ in APPLIANCE_COLUMNS])
+            for appliance in doc["appliances"]:
+                table.row([text(appliance.get(field)) for field, _, _ in APPLIANCE_COLUMNS])
+        pdf.set_font("Helvetica", "", 9)
+
+    if doc.get("notes"):
+        pdf.section("Notes")
+        pdf.multi_cell(0, 4.5, text(doc["notes"]), new_x="LMARGIN", new_y="NEXT")
+
+    pdf.section("Engineer")
+    pdf.key_values([
+        ("Name", doc.get("engineer_name")),
+        ("Gas Safe number", doc.get("gas_safe_number")),
+        ("OFTEC number", doc.get("oftec_number")),
+    ])
+    for field, image in signatures.items():
+        pdf.ln(2)
+        pdf.cell(0, 5, f"{SIGNATURE_LABELS[field]} signature:", new_x="LMARGIN", new_y="NEXT")
+        pdf.image(io.BytesIO(image), h=15)
+
+def render_document(kind: str, doc: dict, settings: dict, images: dict) -> bytes:
+    """Render one invoice, estimate or certificate to PDF bytes.
+
+    images maps "logo" and any certificate signature field to raw image bytes.
+    """
+    pdf = DocumentPDF(settings, images.get("logo"))
+    pdf.set_title(text(doc.get("invoice_number") or doc.get("estimate_number") or doc.get("certificate_number")))
+    pdf.set_author(text(settings.get("company_name")))
+    pdf.add_page()
+
+    if kind == "certificates":
+        signatures = {field: images[field] for field in SIGNATURE_LABELS if images.get(field)}
+        render_certificate(pdf, doc, signatures)
+    else:
+        render_sale(pdf, kind, doc)
+
+    return bytes(pdf.output())
@@ -0,0 +1,31 @@
+"""Rebuild the report rollup collections from the invoices collection.
+
+The API keeps the rollups up to date as invoices are written; run this after
+restoring a backup, after editing invoices directly in the database, or if a
+crash between an invoice write and its rollup update is suspected. Safe to
+re-run; each rollup is replaced as a whole. Invoice writes made while it runs
+may be missed, so run it when the app is quiet.
+
+    python rebuild_reports.py
+"""
+import asyncio
+import sys
+
+from server import ROLLUP_PIPELINES, client, db, ensure_indexes, rebuild_rollups
+
+async def rebuild() -> None:
+    await rebuild_rollups()
+    # $out keeps the target's indexes, but a first run creates the collections
+    await ensure_indexes()
+    for collection in ROLLUP_PIPELINES:
+        print(f"{collection}: {await db[collection].count_documents({})} document(s)")
+
+def main():
+    try:
+        asyncio.run(rebuild())
+    finally:
+        client.close()
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,25 +1,67 @@
-from fastapi import FastAPI, APIRouter, HTTPException, Depends, status, UploadFile, File
+from fastapi import FastAPI, APIRouter, HTTPException, Depends, status, UploadFile, File, Query, Request, Response
+from fastapi.responses import FileResponse, JSONResponse, StreamingResponse
+from fastapi.encoders import jsonable_encoder
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from dotenv import load_dotenv
 from starlette.middleware.cors import CORSMiddleware
-from motor.motor_asyncio import AsyncIOMotorClient
+from starlette.datastructures import Headers
+from motor.motor_asyncio import AsyncIOMotorClient, AsyncIOMotorGridFSBucket
+from gridfs.errors import NoFile
+from bson import json_util
+from pymongo import ASCENDING, DESCENDING, TEXT, IndexModel, ReplaceOne, ReturnDocument, UpdateOne
+from pymongo.errors import BulkWriteError, CollectionInvalid, DuplicateKeyError, OperationFailure
 import os
 import logging
 from pathlib import Path
-from pydantic import BaseModel, Field, ConfigDict, EmailStr
-from typing import List, Optional
+from pydantic import BaseModel, Field, ConfigDict, EmailStr, ValidationError, create_model, model_validator, Discriminator, Tag, TypeAdapter
+from typing import Annotated, ClassVar, List, Literal, Optional, Union
 import uuid
-from datetime import datetime, timezone
+import re
+from datetime import datetime, timedelta, timezone
 from passlib.context import CryptContext
 import jwt
 import base64
+import json
+import csv
+import io
+import codecs
+import zipfile
+import bisect
+import heapq
+import smtplib
+from email.message import EmailMessage
+from urllib.parse import parse_qs
+import hashlib
+import gzip
+import time
+import asyncio
+from collections import OrderedDict, defaultdict
+import multiprocessing
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from functools import lru_cache
+
+from metrics import (
+    EXPOSITION_CONTENT_TYPE, CommandMetrics, MetricsMiddleware, RequestMetrics, SlowQueryListener,
+    command_shape, explain_target, exposition, shape_id,
+)
+from pdf_render import CERTIFICATE_TITLES, render_document
+from pyinstrument import Profiler
+from pyinstrument.renderers import SpeedscopeRenderer
 
 ROOT_DIR = Path(__file__).parent
 load_dotenv(ROOT_DIR / '.env')
 
+# Request and MongoDB command metrics, served on /metrics
+request_metrics = RequestMetrics()
+command_metrics = CommandMetrics()
+# Commands slower than this are explained and logged to perf_slow_queries; 0 disables
+SLOW_QUERY_MS = float(os.environ.get("SLOW_QUERY_MS", "100"))
+slow_query_listener = SlowQueryListener(SLOW_QUERY_MS, ignored_collections=("perf_slow_queries",))
+
 # MongoDB connection
 mongo_url = os.environ['MONGO_URL']
-client = AsyncIOMotorClient(mongo_url)
+# Dates are stored as native BSON datetimes and read back as aware UTC datetimes
+client = AsyncIOMotorClient(mongo_url, tz_aware=True, tzinfo=timezone.utc, event_listeners=[command_metrics, slow_query_listener])
 db = client[os.environ['DB_NAME']]
 
 # Create the main app without a prefix
@@ -33,6 +75,79 @@ pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 security = HTTPBearer()
 SECRET_KEY = os.environ.get("JWT_SECRET_KEY", "breckland-heating-secret-key-2025")
 ALGORITHM = "HS256"
+# Tokens carry an exp claim, which bounds how long trusted claims can go stale
+ACCESS_TOKEN_EXPIRE_HOURS = float(os.environ.get("ACCESS_TOKEN_EXPIRE_HOURS", "24"))
+# Authenticated users are cached in-process; a TTL of 0 disables the cache.
+# The API never modifies a user record, so entries only ever expire by TTL.
+USER_CACHE_TTL_SECONDS = float(os.environ.get("USER_CACHE_TTL_SECONDS", "60"))
+USER_CACHE_SIZE = int(os.environ.get("USER_CACHE_SIZE", "1024"))
+# bcrypt runs on a bounded thread pool so it never blocks the event loop
+PASSWORD_HASH_WORKERS = int(os.environ.get("PASSWORD_HASH_WORKERS", "4"))
+# Company settings are cached per process; the TTL bounds staleness across workers
+SETTINGS_CACHE_TTL_SECONDS = float(os.environ.get("SETTINGS_CACHE_TTL_SECONDS", "30"))
+# Typeahead indexes are kept per process and fully reloaded after this TTL
+SUGGEST_INDEX_TTL_SECONDS = float(os.environ.get("SUGGEST_INDEX_TTL_SECONDS", "300"))
+DEFAULT_SUGGEST_LIMIT = 10
+MAX_SUGGEST_LIMIT = 50
+# Let read-only routes authorise from the signed token claims without a DB lookup;
+# a role change then takes effect when the token expires (ACCESS_TOKEN_EXPIRE_HOURS)
+TRUST_TOKEN_CLAIMS = os.environ.get("TRUST_TOKEN_CLAIMS", "false").lower() == "true"
+
+# Pagination
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+# POST requests carrying an Idempotency-Key are answered once and replayed on retry
+IDEMPOTENCY_HEADER = "Idempotency-Key"
+IDEMPOTENCY_REPLAYED_HEADER = "Idempotent-Replayed"
+IDEMPOTENCY_TTL_SECONDS = int(os.environ.get("IDEMPOTENCY_TTL_SECONDS", "86400"))
+# How long a reservation holds a key; a retry after that takes it over
+IDEMPOTENCY_LOCK_SECONDS = int(os.environ.get("IDEMPOTENCY_LOCK_SECONDS", "60"))
+IDEMPOTENCY_MAX_RESPONSE_BYTES = 1024 * 1024
+
+# Binary assets (logo, signatures) live in GridFS and are referenced by URL
+ASSET_URL_PREFIX = "/api/assets/"
+SIGNATURE_FIELDS = ["customer_signature", "responsible_person_signature", "engineer_signature"]
+
+# Exports stream from the cursor in batches of this many documents
+EXPORT_BATCH_SIZE = int(os.environ.get("EXPORT_BATCH_SIZE", "500"))
+# Imports validate and insert_many this many rows at a time
+IMPORT_BATCH_SIZE = int(os.environ.get("IMPORT_BATCH_SIZE", "1000"))
+
+# PDFs render in worker processes and are cached on disk per document version
+PDF_RENDER_WORKERS = int(os.environ.get("PDF_RENDER_WORKERS", str(os.cpu_count() or 1)))
+PDF_CACHE_DIR = Path(os.environ.get("PDF_CACHE_DIR", ROOT_DIR / "pdf_cache"))
+# Batch jobs render this many documents at a time and hold a lease while running
+PDF_BATCH_SIZE = int(os.environ.get("PDF_BATCH_SIZE", str(PDF_RENDER_WORKERS * 4)))
+JOB_LEASE_SECONDS = int(os.environ.get("JOB_LEASE_SECONDS", "60"))
+
+# Inspection reminders are queued once a day for certificates due within the lead time
+REMINDER_LEAD_DAYS = int(os.environ.get("REMINDER_LEAD_DAYS", "30"))
+REMINDER_RUN_HOUR = int(os.environ.get("REMINDER_RUN_HOUR", "6"))  # UTC
+REMINDER_BATCH_SIZE = int(os.environ.get("REMINDER_BATCH_SIZE", "500"))
+REMINDER_POLL_SECONDS = int(os.environ.get("REMINDER_POLL_SECONDS", "300"))
+# A batch claimed for sending longer ago than this belongs to a run that died; it is queued again
+REMINDER_CLAIM_SECONDS = int(os.environ.get("REMINDER_CLAIM_SECONDS", "3600"))
+# Reminders are only delivered when an SMTP server is configured, e.g. a local
+# stand-in: python -m aiosmtpd -n -l localhost:1025
+SMTP_HOST = os.environ.get("SMTP_HOST")
+SMTP_PORT = int(os.environ.get("SMTP_PORT", "25"))
+SMTP_FROM = os.environ.get("SMTP_FROM")
+
+# The slow query log is a capped collection, so the oldest entries are dropped
+# first. Each query shape is re-run under explain at most once per interval.
+SLOW_QUERY_LOG_BYTES = int(os.environ.get("SLOW_QUERY_LOG_BYTES", str(16 * 1024 * 1024)))
+SLOW_QUERY_EXPLAIN_INTERVAL_SECONDS = int(os.environ.get("SLOW_QUERY_EXPLAIN_INTERVAL_SECONDS", "300"))
+SLOW_QUERY_QUEUE_SIZE = 1000
+
+# Admins can profile a single request with ?profile=1 or an X-Profile: 1 header;
+# the speedscope profile is stored and its id returned in X-Profile-Id
+PROFILE_HEADER = "X-Profile"
+PROFILE_ID_HEADER = "X-Profile-Id"
+PROFILE_INTERVAL_SECONDS = float(os.environ.get("PROFILE_INTERVAL_SECONDS", "0.001"))
+PROFILE_TTL_SECONDS = int(os.environ.get("PROFILE_TTL_SECONDS", str(7 * 86400)))
+PROFILE_MAX_BYTES = 15 * 1024 * 1024  # compressed, under the 16 MB document limit
 
 # Models
 class User(BaseModel):
@@ -43,6 +158,12 @@ class User(BaseModel):
     role: str  # admin or staff
     created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
 
+class TokenUser(BaseModel):
+    # Identity carried in the signed JWT claims
+    id: str
+    email: EmailStr
+    role: str
+
 class UserCreate(BaseModel):
     email: EmailStr
     password: str
@@ -53,10 +174,28 @@ class UserLogin(BaseModel):
     email: EmailStr
     password: str
 
-class Customer(BaseModel):
+def number_seq(number: Optional[str]) -> Optional[int]:
+    """The counter value a document number was issued from, e.g. 100000 for INV100000."""
+    match = re.search(r"\d+$", number or "")
+    return int(match.group()) if match else None
+
+class Numbered(BaseModel):
+    # Numbers are zero-padded to five digits, so past 99999 they stop sorting
+    # as strings (INV100000 < INV99999); lists sort on the numeric seq instead
+    number_field: ClassVar[str]
+
+    @model_validator(mode="after")
+    def fill_seq(self):
+        if self.seq is None:
+            self.seq = number_seq(getattr(self, self.number_field))
+        return self
+
+class Customer(Numbered):
     model_config = ConfigDict(extra="ignore")
+    number_field: ClassVar[str] = "customer_number"
     id: str = Field(default_factory=lambda: str(uuid.uuid4()))
     customer_number: str
+    seq: Optional[int] = None
     name: str
     address: str
     phone: str
@@ -90,10 +229,12 @@ class InvoiceItem(BaseModel):
     price: float
     total: float
 
-class Invoice(BaseModel):
+class Invoice(Numbered):
     model_config = ConfigDict(extra="ignore")
+    number_field: ClassVar[str] = "invoice_number"
     id: str = Field(default_factory=lambda: str(uuid.uuid4()))
     invoice_number: str
+    seq: Optional[int] = None
     customer_id: str
     customer_name: str
     customer_address: str
@@ -108,6 +249,7 @@ class Invoice(BaseModel):
     issue_date: datetime
     due_date: Optional[datetime] = None
     notes: Optional[str] = None
+    estimate_id: Optional[str] = None  # set when converted from an estimate
     created_by: str
     created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
 
@@ -119,10 +261,16 @@ class InvoiceCreate(BaseModel):
     notes: Optional[str] = None
     vat_rate: float = 20.0
 
-class Estimate(BaseModel):
+class InvoiceImport(InvoiceCreate):
+    # Historical invoices may already be settled
+    status: str = "unpaid"
+
+class Estimate(Numbered):
     model_config = ConfigDict(extra="ignore")
+    number_field: ClassVar[str] = "estimate_number"
     id: str = Field(default_factory=lambda: str(uuid.uuid4()))
     estimate_number: str
+    seq: Optional[int] = None
     customer_id: str
     customer_name: str
     customer_address: str
@@ -160,7 +308,7 @@ class CompanySettings(BaseModel):
     bank_name: str = ""
     account_number: str = ""
     sort_code: str = ""
-    logo: Optional[str] = None  # base64 encoded image
+    logo: Optional[str] = None  # asset URL, /api/assets/{id}
     updated_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
 
 class CompanySettingsUpdate(BaseModel):
@@ -174,6 +322,69 @@ class CompanySettingsUpdate(BaseModel):
     account_number: Optional[str] = None
     sort_code: Optional[str] = None
 
+class DashboardStats(BaseModel):
+    total_customers: int = 0
+    total_invoices: int = 0
+    total_estimates: int = 0
+    unpaid_invoices: int = 0
+    pending_estimates: int = 0
+    total_revenue: float = 0.0
+    recent_invoices: List[Invoice] = []
+
+class MonthlyRevenue(BaseModel):
+    month: str  # YYYY-MM, by issue date
+    invoiced: float = 0.0
+    paid: float = 0.0
+    vat_amount: float = 0.0
+    count: int = 0
+
+class QuarterlyVat(BaseModel):
+    quarter: str  # YYYY-Qn, by issue date
+    subtotal: float = 0.0
+    vat_amount: float = 0.0
+    total: float = 0.0
+    count: int = 0
+
+class AgedDebtorBucket(BaseModel):
+    bucket: str  # not_due, 0-30, 31-60, 61-90, 90+
+    amount: float = 0.0
+    count: int = 0
+
+class AgedDebtors(BaseModel):
+    as_of: datetime
+    total: float = 0.0
+    buckets: List[AgedDebtorBucket]
+
+class SearchHit(BaseModel):
+    type: str  # customer, invoice, certificate
+    id: str
+    title: str
+    subtitle: Optional[str] = None
+    score: float  # relative to the best hit of the same type, so 1.0 is that type's top match
+
+class SlowQueryShape(BaseModel):
+    shape_id: str
+    collection: str
+    command: str
+    shape: dict  # filter / sort / pipeline with every value replaced by "?"
+    count: int
+    total_ms: float
+    max_ms: float
+    avg_ms: float
+    last_seen: datetime
+    explain: Optional[dict] = None  # summary of the most recent explain
+
+class RequestProfile(BaseModel):
+    model_config = ConfigDict(extra="ignore")
+    id: str
+    method: str
+    path: str
+    status_code: int
+    duration_ms: float
+    sample_count: int
+    user_id: str
+    created_at: datetime
+
 class ApplianceCheck(BaseModel):
     appliance_type: str
     make_model: str
@@ -190,11 +401,11 @@ class ApplianceCheck(BaseModel):
     fan_pressure_reading: Optional[str] = None  # -XXX.X mb
     defects: Optional[str] = None
 
-class GasSafetyCertificate(BaseModel):
-    model_config = ConfigDict(extra="ignore")
-    id: str = Field(default_factory=lambda: str(uuid.uuid4()))
-    certificate_type: str  # CP12, CD11, CD10, TI133D, BENCHMARK
-    certificate_number: str
+# Certificates are stored and validated per type: each certificate_type has its
+# own model built from the field groups below, discriminated on certificate_type.
+# Pydantic orders inherited fields from the last base first, so bases are listed
+# in reverse of the order the fields should appear in.
+class CertificateDetails(BaseModel):
     # Landlord/Customer details
     landlord_customer_name: str
     landlord_customer_address: str
@@ -202,7 +413,17 @@ class GasSafetyCertificate(BaseModel):
     landlord_customer_email: Optional[str] = None
     # Work/Inspection address
     inspection_address: str
-    
+    # Common bottom section
+    inspection_date: datetime
+    next_inspection_due: Optional[datetime] = None
+    engineer_name: str
+    gas_safe_number: Optional[str] = None
+    oftec_number: Optional[str] = None
+    responsible_person_signature: Optional[str] = None
+    engineer_signature: Optional[str] = None
+    notes: Optional[str] = None
+
+class CP12Fields(BaseModel):
     # CP12 - Landlord Gas Safety Certificate fields
     let_by_tightness_test: Optional[bool] = None
     equipotential_bonding: Optional[bool] = None
@@ -212,7 +433,8 @@ class GasSafetyCertificate(BaseModel):
     smoke_alarm_working: Optional[bool] = None
     appliances: Optional[List[ApplianceCheck]] = None
     compliance_statement: Optional[str] = None
-    
+
+class CD11Fields(BaseModel):
     # CD11 - OFTEC Oil Service Certificate fields
     oil_service_work: Optional[str] = None
     smoke_number: Optional[str] = None
@@ -237,18 +459,23 @@ class GasSafetyCertificate(BaseModel):
     net_efficiency: Optional[str] = None
     gross_efficiency: Optional[str] = None
     parts_replaced: Optional[str] = None
-    
+
+class GWNFields(BaseModel):
     # GWN - Gas Warning Notice fields
     risk_classification: Optional[str] = None  # ID or AR
     defect_description: Optional[str] = None
     action_taken: Optional[str] = None
     warning_label_attached: Optional[bool] = None
     appliance_isolated: Optional[bool] = None
-    
-    # CD10 - Oil Installation Certificate fields
+
+class TankFields(BaseModel):
+    # Tank details shared by CD10 and TI133D
     tank_type: Optional[str] = None
     tank_capacity: Optional[str] = None
     tank_material: Optional[str] = None
+
+class CD10Fields(BaseModel):
+    # CD10 - Oil Installation Certificate fields
     base_support_type: Optional[str] = None
     pipework_material: Optional[str] = None
     fire_valve_fitted: Optional[bool] = None
@@ -262,7 +489,8 @@ class GasSafetyCertificate(BaseModel):
     pressure_test_result: Optional[str] = None
     complies_with_standards: Optional[bool] = None
     customer_signature: Optional[str] = None
-    
+
+class TI133DFields(BaseModel):
     # TI133D - Oil Tank Risk Assessment fields
     tank_construction: Optional[str] = None  # Single wall or Bunded
     spillage_risk_level: Optional[str] = None
@@ -285,7 +513,8 @@ class GasSafetyCertificate(BaseModel):
     environmental_hazards: Optional[str] = None
     actions_required: Optional[str] = None
     urgent_attention_needed: Optional[bool] = None
-    
+
+class BenchmarkFields(BaseModel):
     # BENCHMARK - Gas Boiler Commissioning Certificate fields
     boiler_make: Optional[str] = None
     boiler_model: Optional[str] = None
@@ -320,230 +549,777 @@ class GasSafetyCertificate(BaseModel):
     benchmark_explained: Optional[bool] = None
     notification_method: Optional[str] = None
     compliance_certificate_issued: Optional[bool] = None
-    
-    # Common bottom section
-    inspection_date: datetime
-    next_inspection_due: Optional[datetime] = None
-    engineer_name: str
-    gas_safe_number: Optional[str] = None
-    oftec_number: Optional[str] = None
-    responsible_person_signature: Optional[str] = None
-    engineer_signature: Optional[str] = None
-    notes: Optional[str] = None
+
+class CP12CertificateCreate(GWNFields, CP12Fields, CertificateDetails):
+    certificate_type: Literal["CP12"]
+
+class GWNCertificateCreate(GWNFields, CertificateDetails):
+    certificate_type: Literal["GWN"]
+
+class CD11CertificateCreate(CD11Fields, CertificateDetails):
+    certificate_type: Literal["CD11"]
+
+class CD10CertificateCreate(CD11Fields, TankFields, CD10Fields, CertificateDetails):
+    # CD10 commissioning records the CD11 combustion readings
+    certificate_type: Literal["CD10"]
+
+class TI133DCertificateCreate(TankFields, TI133DFields, CertificateDetails):
+    certificate_type: Literal["TI133D"]
+
+class BenchmarkCertificateCreate(BenchmarkFields, CertificateDetails):
+    certificate_type: Literal["BENCHMARK"]
+    customer_signature: Optional[str] = None
+    building_control_notified: Optional[bool] = None
+
+class CertificateRecord(Numbered):
+    number_field: ClassVar[str] = "certificate_number"
+    id: str = Field(default_factory=lambda: str(uuid.uuid4()))
+    certificate_number: str
+    seq: Optional[int] = None  # per certificate_type, like the number
     created_by: str
     created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
 
-class CertificateCreate(BaseModel):
+class CP12Certificate(CP12CertificateCreate, CertificateRecord):
+    pass
+
+class GWNCertificate(GWNCertificateCreate, CertificateRecord):
+    pass
+
+class CD11Certificate(CD11CertificateCreate, CertificateRecord):
+    pass
+
+class CD10Certificate(CD10CertificateCreate, CertificateRecord):
+    pass
+
+class TI133DCertificate(TI133DCertificateCreate, CertificateRecord):
+    pass
+
+class BenchmarkCertificate(BenchmarkCertificateCreate, CertificateRecord):
+    pass
+
+class LegacyCertificate(BenchmarkFields, TI133DFields, TankFields, CD10Fields, GWNFields,
+                        CD11Fields, CP12Fields, CertificateDetails, CertificateRecord):
+    """The original flat certificate carrying every field of every type.
+
+    Used to read documents whose certificate_type has no dedicated model, and as
+    the superset of certificate fields for projections and exports.
+    """
+    certificate_type: str
+
+# certificate_type -> stored model
+CERTIFICATE_MODELS = {
+    "CP12": CP12Certificate,
+    "GWN": GWNCertificate,
+    "CD11": CD11Certificate,
+    "CD10": CD10Certificate,
+    "TI133D": TI133DCertificate,
+    "BENCHMARK": BenchmarkCertificate,
+}
+
+def certificate_tag(value) -> str:
+    cert_type = value.get("certificate_type") if isinstance(value, dict) else getattr(value, "certificate_type", None)
+    return cert_type if cert_type in CERTIFICATE_MODELS else "legacy"
+
+CertificateCreate = Annotated[
+    Union[
+        CP12CertificateCreate,
+        GWNCertificateCreate,
+        CD11CertificateCreate,
+        CD10CertificateCreate,
+        TI133DCertificateCreate,
+        BenchmarkCertificateCreate,
+    ],
+    Field(discriminator="certificate_type")
+]
+
+GasSafetyCertificate = Annotated[
+    Union[
+        Annotated[CP12Certificate, Tag("CP12")],
+        Annotated[GWNCertificate, Tag("GWN")],
+        Annotated[CD11Certificate, Tag("CD11")],
+        Annotated[CD10Certificate, Tag("CD10")],
+        Annotated[TI133DCertificate, Tag("TI133D")],
+        Annotated[BenchmarkCertificate, Tag("BENCHMARK")],
+        Annotated[LegacyCertificate, Tag("legacy")],
+    ],
+    Discriminator(certificate_tag)
+]
+
+certificate_adapter = TypeAdapter(GasSafetyCertificate)
+
+class Reminder(BaseModel):
+    model_config = ConfigDict(extra="ignore")
+    id: str = Field(default_factory=lambda: str(uuid.uuid4()))
+    certificate_id: str
+    certificate_number: str
     certificate_type: str
     landlord_customer_name: str
-    landlord_customer_address: str
-    landlord_customer_phone: str
-    landlord_customer_email: Optional[str] = None
+    recipient: Optional[str] = None
     inspection_address: str
-    
-    # CP12 fields
-    let_by_tightness_test: Optional[bool] = None
-    equipotential_bonding: Optional[bool] = None
-    ecv_accessible: Optional[bool] = None
-    pipework_visual_inspection: Optional[bool] = None
-    co_alarm_working: Optional[bool] = None
-    smoke_alarm_working: Optional[bool] = None
-    appliances: Optional[List[ApplianceCheck]] = None
-    compliance_statement: Optional[str] = None
-    
-    # CD11 fields
-    oil_service_work: Optional[str] = None
-    smoke_number: Optional[str] = None
-    co_ppm: Optional[str] = None
-    excess_air_percent: Optional[str] = None
-    co2_percent: Optional[str] = None
-    oil_flow_rate: Optional[str] = None
-    flue_gas_temp: Optional[str] = None
-    appliance_make_model: Optional[str] = None
-    burner_type: Optional[str] = None
-    burner_cleaned: Optional[bool] = None
-    nozzle_replaced: Optional[bool] = None
-    filter_checked: Optional[bool] = None
-    controls_tested: Optional[bool] = None
-    safety_devices_tested: Optional[bool] = None
-    flue_inspected: Optional[bool] = None
-    pump_pressure: Optional[str] = None
-    nozzle_size: Optional[str] = None
-    nozzle_angle: Optional[str] = None
-    nozzle_pattern: Optional[str] = None
-    co_co2_ratio: Optional[str] = None
-    net_efficiency: Optional[str] = None
-    gross_efficiency: Optional[str] = None
-    parts_replaced: Optional[str] = None
-    
-    # GWN fields
-    risk_classification: Optional[str] = None
-    defect_description: Optional[str] = None
-    action_taken: Optional[str] = None
-    warning_label_attached: Optional[bool] = None
-    appliance_isolated: Optional[bool] = None
-    
-    # CD10 fields
-    tank_type: Optional[str] = None
-    tank_capacity: Optional[str] = None
-    tank_material: Optional[str] = None
-    base_support_type: Optional[str] = None
-    pipework_material: Optional[str] = None
-    fire_valve_fitted: Optional[bool] = None
-    building_control_notified: Optional[bool] = None
-    installation_date: Optional[datetime] = None
-    work_type: Optional[str] = None
-    appliance_serial_number: Optional[str] = None
-    output_rating: Optional[str] = None
-    fuel_type: Optional[str] = None
-    tank_pressure_tested: Optional[bool] = None
-    pressure_test_result: Optional[str] = None
-    complies_with_standards: Optional[bool] = None
-    customer_signature: Optional[str] = None
-    
-    # TI133D fields
-    tank_construction: Optional[str] = None
-    spillage_risk_level: Optional[str] = None
-    fire_risk_level: Optional[str] = None
-    distance_to_building: Optional[str] = None
-    secondary_containment_adequate: Optional[bool] = None
-    tank_age: Optional[str] = None
-    tank_location: Optional[str] = None
-    tank_condition_good: Optional[bool] = None
-    tank_positioned_correctly: Optional[bool] = None
-    adequate_ventilation: Optional[bool] = None
-    fire_valve_present: Optional[bool] = None
-    distance_adequate: Optional[bool] = None
-    away_from_ignition_sources: Optional[bool] = None
-    away_from_drains: Optional[bool] = None
-    pipework_secure: Optional[bool] = None
-    no_visible_leaks: Optional[bool] = None
-    vent_pipe_correct: Optional[bool] = None
-    fill_line_correct: Optional[bool] = None
-    environmental_hazards: Optional[str] = None
-    actions_required: Optional[str] = None
-    urgent_attention_needed: Optional[bool] = None
-    
-    # BENCHMARK fields
-    boiler_make: Optional[str] = None
-    boiler_model: Optional[str] = None
-    boiler_serial_number: Optional[str] = None
-    boiler_type: Optional[str] = None
-    gas_rate: Optional[str] = None
-    gas_inlet_pressure_max: Optional[str] = None
-    burner_gas_pressure: Optional[str] = None
-    burner_pressure_na: Optional[bool] = None
-    co_max_rate: Optional[str] = None
-    co_min_rate: Optional[str] = None
-    co2_max_rate: Optional[str] = None
-    co2_min_rate: Optional[str] = None
-    co_co2_ratio_max: Optional[str] = None
-    co_co2_ratio_min: Optional[str] = None
-    flue_integrity_checked: Optional[bool] = None
-    gas_tightness_tested: Optional[bool] = None
-    spillage_test_passed: Optional[bool] = None
-    cold_water_inlet_temp: Optional[str] = None
-    hot_water_outlets_tested: Optional[bool] = None
-    heating_controls_tested: Optional[bool] = None
-    hot_water_controls_tested: Optional[bool] = None
-    interlock_tested: Optional[bool] = None
-    condensate_installed_correctly: Optional[bool] = None
-    condensate_termination: Optional[str] = None
-    condensate_disposal_method: Optional[str] = None
-    complies_with_manufacturer_instructions: Optional[bool] = None
-    clearances_met: Optional[bool] = None
-    gas_supply_purged: Optional[bool] = None
-    operation_demonstrated: Optional[bool] = None
-    literature_provided: Optional[bool] = None
-    benchmark_explained: Optional[bool] = None
-    notification_method: Optional[str] = None
-    compliance_certificate_issued: Optional[bool] = None
-    
-    # Common fields
-    inspection_date: datetime
-    next_inspection_due: Optional[datetime] = None
-    engineer_name: str
-    gas_safe_number: Optional[str] = None
-    oftec_number: Optional[str] = None
-    responsible_person_signature: Optional[str] = None
-    engineer_signature: Optional[str] = None
-    notes: Optional[str] = None
+    due_date: datetime
+    status: str = "queued"  # queued, sending (claimed by a run), sent, failed, skipped (no email on file)
+    error: Optional[str] = None
+    created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+    sent_at: Optional[datetime] = None
+
+class PdfBatchCreate(BaseModel):
+    collections: List[Literal["invoices", "estimates", "certificates"]] = ["invoices", "certificates"]
+    # Invoices and estimates by issue date, certificates by next inspection due
+    date_from: Optional[datetime] = None
+    date_to: Optional[datetime] = None
+    invoice_status: Optional[str] = None
+    certificate_type: Optional[str] = None
+
+class PdfBatchJob(BaseModel):
+    model_config = ConfigDict(extra="ignore")
+    id: str = Field(default_factory=lambda: str(uuid.uuid4()))
+    status: str = "queued"  # queued, running, completed, failed
+    filters: PdfBatchCreate
+    total: int = 0
+    completed: int = 0
+    failed: int = 0
+    error: Optional[str] = None
+    created_by: str
+    created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+    updated_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+    finished_at: Optional[datetime] = None
+
+# Predefined sparse fieldsets for list tables, selectable with ?fields=<view>
+LIST_VIEWS = {
+    "invoices": {
+        "summary": ["invoice_number", "customer_name", "total", "status", "issue_date", "due_date"],
+    },
+    "estimates": {
+        "summary": ["estimate_number", "customer_name", "total", "status", "issue_date", "valid_until"],
+    },
+    "certificates": {
+        "summary": [
+            "certificate_type", "certificate_number", "landlord_customer_name", "inspection_address",
+            "inspection_date", "next_inspection_due", "engineer_name",
+        ],
+    },
+}
+
+# Fields matched by the ?q= search box on each list screen
+LIST_SEARCH_FIELDS = {
+    "customers": ["name", "email", "phone", "customer_number"],
+    "services": ["name", "description"],
+    "invoices": ["invoice_number", "customer_name"],
+    "estimates": ["estimate_number", "customer_name"],
+    "certificates": ["certificate_number", "landlord_customer_name", "inspection_address", "engineer_name"],
+}
+
+def list_query(collection: str, q: Optional[str] = None, **filters) -> dict:
+    """Filter for a list route: a case-insensitive substring match of q plus exact-match filters."""
+    query = {key: value for key, value in filters.items() if value is not None}
+    term = (q or "").strip()
+    if term:
+        pattern = {"$regex": re.escape(term), "$options": "i"}
+        query["$or"] = [{name: pattern} for name in LIST_SEARCH_FIELDS[collection]]
+    return query
 
 # Helper functions
-def hash_password(password: str) -> str:
-    return pwd_context.hash(password)
+password_executor = ThreadPoolExecutor(max_workers=PASSWORD_HASH_WORKERS, thread_name_prefix="bcrypt")
+password_tasks_in_flight = 0
 
-def verify_password(plain_password: str, hashed_password: str) -> bool:
-    return pwd_context.verify(plain_password, hashed_password)
+async def run_password_task(func, *args):
+    global password_tasks_in_flight
+    password_tasks_in_flight += 1
+    try:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(password_executor, func, *args)
+    finally:
+        password_tasks_in_flight -= 1
+
+# Workers are spawned rather than forked so they inherit no Motor client or event loop
+pdf_executor = ProcessPoolExecutor(max_workers=PDF_RENDER_WORKERS, mp_context=multiprocessing.get_context("spawn"))
+
+def password_pool_stats() -> dict:
+    return {
+        "workers": PASSWORD_HASH_WORKERS,
+        "in_flight": password_tasks_in_flight,
+        "queue_depth": max(0, password_tasks_in_flight - PASSWORD_HASH_WORKERS)
+    }
 
-def create_access_token(data: dict) -> str:
-    return jwt.encode(data, SECRET_KEY, algorithm=ALGORITHM)
+async def hash_password(password: str) -> str:
+    return await run_password_task(pwd_context.hash, password)
 
-async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security)):
+async def verify_password(plain_password: str, hashed_password: str) -> bool:
+    return await run_password_task(pwd_context.verify, plain_password, hashed_password)
+
+def create_access_token(data: dict) -> str:
+    expires_at = datetime.now(timezone.utc) + timedelta(hours=ACCESS_TOKEN_EXPIRE_HOURS)
+    return jwt.encode({**data, "exp": expires_at}, SECRET_KEY, algorithm=ALGORITHM)
+
+class UserCache:
+    """In-process TTL + LRU cache of authenticated users keyed by user_id."""
+
+    def __init__(self, ttl: float, max_size: int):
+        self.ttl = ttl
+        self.max_size = max_size
+        self._entries = OrderedDict()
+
+    def get(self, user_id: str) -> Optional[User]:
+        entry = self._entries.get(user_id)
+        if entry is None:
+            return None
+        expires_at, user = entry
+        if expires_at < time.monotonic():
+            del self._entries[user_id]
+            return None
+        self._entries.move_to_end(user_id)
+        return user
+
+    def set(self, user_id: str, user: User):
+        if self.ttl <= 0 or self.max_size <= 0:
+            return
+        self._entries[user_id] = (time.monotonic() + self.ttl, user)
+        self._entries.move_to_end(user_id)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+user_cache = UserCache(USER_CACHE_TTL_SECONDS, USER_CACHE_SIZE)
+
+class SettingsCache:
+    """Process-level cache of the company settings document and its ETag."""
+
+    def __init__(self, ttl: float):
+        self.ttl = ttl
+        self.settings: Optional[CompanySettings] = None
+        self.etag: Optional[str] = None
+        self.expires_at = 0.0
+
+    def get(self) -> Optional[CompanySettings]:
+        if self.settings is None or self.expires_at < time.monotonic():
+            return None
+        return self.settings
+
+    def set(self, settings: CompanySettings):
+        self.settings = settings
+        self.etag = f'"{hashlib.sha256(settings.model_dump_json().encode()).hexdigest()}"'
+        self.expires_at = time.monotonic() + self.ttl
+
+    def invalidate(self):
+        self.settings = None
+        self.etag = None
+
+settings_cache = SettingsCache(SETTINGS_CACHE_TTL_SECONDS)
+
+class PrefixIndex:
+    """Process-level typeahead index over one collection.
+
+    Every word of the indexed fields (and the whole field value) is kept as a
+    lower-cased key in a sorted list of (key, id) pairs, so a prefix lookup is a
+    bisect followed by a short scan. Writes in this process update the index
+    in place; the TTL bounds staleness from writes made by other workers.
+    Only the first lookup waits for a load: once the TTL lapses, the stale
+    index keeps serving while a fresh one is built in the background and
+    swapped in.
+    """
+
+    # Entries sorted per run while streaming, then merged a run at a time
+    # so a rebuild never holds the event loop for one big sort
+    RUN_SIZE = 5000
+
+    def __init__(self, collection: str, fields: List[str], ttl: float):
+        self.collection = collection
+        self.fields = fields
+        self.ttl = ttl
+        self.entries: List[tuple] = []
+        self.docs: dict = {}
+        self.loaded = False
+        self.expires_at = 0.0
+        self.lock = asyncio.Lock()
+        self.refresh: Optional[asyncio.Task] = None
+        # Writes made while a rebuild runs, replayed onto the new index
+        self.pending: Optional[list] = None
+
+    @staticmethod
+    def normalize(value: str) -> str:
+        return " ".join(value.casefold().split())
+
+    def keys(self, doc: dict) -> set:
+        keys = set()
+        for field in self.fields:
+            value = self.normalize(str(doc.get(field) or ""))
+            words = value.split(" ")
+            # The value from each word onwards, so "smith" and "john smith" both match "John Smith"
+            keys.update(" ".join(words[i:]) for i in range(len(words)) if words[i])
+        return keys
+
+    async def ensure_loaded(self):
+        if self.expires_at >= time.monotonic():
+            return
+        if self.loaded:
+            if self.refresh is None or self.refresh.done():
+                # Writes are recorded from now, before the task first runs
+                self.pending = []
+                self.refresh = start_background_task(self.rebuild())
+            return
+        async with self.lock:
+            if not self.loaded:
+                self.pending = []
+                await self.rebuild()
+
+    async def rebuild(self):
+        try:
+            docs = {}
+            runs = []
+            run = []
+            async for doc in db[self.collection].find({}, {"_id": 0}):
+                docs[doc["id"]] = doc
+                run.extend((key, doc["id"]) for key in self.keys(doc))
+                if len(run) >= self.RUN_SIZE:
+                    run.sort()
+                    runs.append(run)
+                    run = []
+                    await asyncio.sleep(0)
+            run.sort()
+            runs.append(run)
+            entries = []
+            for entry in heapq.merge(*runs):
+                entries.append(entry)
+                if len(entries) % self.RUN_SIZE == 0:
+                    await asyncio.sleep(0)
+        except Exception as e:
+            if not self.loaded:
+                raise
+            # Keep serving the stale index; the next lookup tries again
+            logger.error(f"Could not rebuild the {self.collection} suggest index: {e}")
+            return
+        finally:
+            pending, self.pending = self.pending, None
+
+        self.docs, self.entries = docs, entries
+        self.loaded = True
+        self.expires_at = time.monotonic() + self.ttl
+        for doc_id, doc in pending:
+            if doc is None:
+                self.remove(doc_id)
+            else:
+                self.add(doc)
+
+    def add(self, doc: dict):
+        if self.pending is not None:
+            self.pending.append((doc["id"], doc))
+        if not self.loaded:
+            return  # not loaded yet; the first lookup loads everything
+        self.unindex(doc["id"])
+        self.docs[doc["id"]] = doc
+        for key in self.keys(doc):
+            bisect.insort(self.entries, (key, doc["id"]))
+
+    def remove(self, doc_id: str):
+        if self.pending is not None:
+            self.pending.append((doc_id, None))
+        self.unindex(doc_id)
+
+    def unindex(self, doc_id: str):
+        doc = self.docs.pop(doc_id, None)
+        if doc is None:
+            return
+        for key in self.keys(doc):
+            i = bisect.bisect_left(self.entries, (key, doc_id))
+            if i < len(self.entries) and self.entries[i] == (key, doc_id):
+                del self.entries[i]
+
+    def invalidate(self):
+        # Rebuilt on the next lookup, which keeps being served meanwhile
+        self.expires_at = 0.0
+
+    def search(self, prefix: str, limit: int) -> List[dict]:
+        prefix = self.normalize(prefix)
+        matches = []
+        seen = set()
+        i = bisect.bisect_left(self.entries, (prefix,))
+        while i < len(self.entries) and len(matches) < limit:
+            key, doc_id = self.entries[i]
+            if not key.startswith(prefix):
+                break
+            i += 1
+            if doc_id not in seen:
+                seen.add(doc_id)
+                matches.append(self.docs[doc_id])
+        return matches
+
+customer_index = PrefixIndex("customers", ["name", "customer_number", "phone"], SUGGEST_INDEX_TTL_SECONDS)
+service_index = PrefixIndex("services", ["name"], SUGGEST_INDEX_TTL_SECONDS)
+SUGGEST_INDEXES = {"customers": customer_index, "services": service_index}
+
+def decode_token(token: str) -> dict:
     try:
-        token = credentials.credentials
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        user_id = payload.get("user_id")
-        if user_id is None:
-            raise HTTPException(status_code=401, detail="Invalid token")
-        
-        user = await db.users.find_one({"id": user_id}, {"_id": 0})
-        if user is None:
-            raise HTTPException(status_code=401, detail="User not found")
-        
-        if isinstance(user['created_at'], str):
-            user['created_at'] = datetime.fromisoformat(user['created_at'])
-        
-        return User(**user)
     except jwt.PyJWTError:
         raise HTTPException(status_code=401, detail="Invalid token")
+    if payload.get("user_id") is None:
+        raise HTTPException(status_code=401, detail="Invalid token")
+    return payload
+
+async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security)):
+    user_id = decode_token(credentials.credentials)["user_id"]
+
+    cached_user = user_cache.get(user_id)
+    if cached_user is not None:
+        return cached_user
+
+    user = await db.users.find_one({"id": user_id}, {"_id": 0})
+    if user is None:
+        raise HTTPException(status_code=401, detail="User not found")
+
+    user_obj = User(**user)
+    user_cache.set(user_id, user_obj)
+    return user_obj
+
+async def get_read_user(credentials: HTTPAuthorizationCredentials = Depends(security)):
+    """Authorise a read-only route, from the token claims alone when TRUST_TOKEN_CLAIMS is set."""
+    if not TRUST_TOKEN_CLAIMS:
+        return await get_current_user(credentials)
+
+    payload = decode_token(credentials.credentials)
+    if payload.get("email") is None or payload.get("role") is None or payload.get("exp") is None:
+        # Token predates the role/email claims or expiry; fall back to the user record
+        return await get_current_user(credentials)
+    return TokenUser(id=payload["user_id"], email=payload["email"], role=payload["role"])
+
+def assets_bucket() -> AsyncIOMotorGridFSBucket:
+    return AsyncIOMotorGridFSBucket(db, bucket_name="assets")
+
+async def store_asset(data: bytes, content_type: str, filename: str = "", public: bool = False) -> str:
+    """Store binary data in GridFS and return the URL it is served from.
+
+    Only public assets (the company logo) may be kept by shared caches;
+    everything else, e.g. certificate signatures, is served as private.
+    """
+    asset_id = str(uuid.uuid4())
+    await assets_bucket().upload_from_stream_with_id(
+        asset_id,
+        filename or asset_id,
+        data,
+        metadata={"content_type": content_type, "sha256": hashlib.sha256(data).hexdigest(), "public": public}
+    )
+    return f"{ASSET_URL_PREFIX}{asset_id}"
+
+async def delete_asset(url: Optional[str]):
+    if not url or not url.startswith(ASSET_URL_PREFIX):
+        return
+    try:
+        await assets_bucket().delete(url[len(ASSET_URL_PREFIX):])
+    except NoFile:
+        pass
+
+async def externalize_data_url(value: Optional[str]) -> Optional[str]:
+    """Move an inline base64 data URL into GridFS; any other value is returned unchanged."""
+    if not value or not value.startswith("data:") or ";base64," not in value:
+        return value
+    header, encoded = value.split(",", 1)
+    content_type = header[len("data:"):].split(";")[0] or "application/octet-stream"
+    return await store_asset(base64.b64decode(encoded), content_type)
+
+async def read_asset(value: Optional[str]) -> Optional[bytes]:
+    """Load the bytes behind an asset URL (or a not yet migrated data URL)."""
+    if not value:
+        return None
+    if value.startswith("data:") and ";base64," in value:
+        return base64.b64decode(value.split(",", 1)[1])
+    if not value.startswith(ASSET_URL_PREFIX):
+        return None
+    try:
+        grid_out = await assets_bucket().open_download_stream(value[len(ASSET_URL_PREFIX):])
+    except NoFile:
+        return None
+    return await grid_out.read()
+
+def etag_matches(request: Request, etag: str) -> bool:
+    if_none_match = request.headers.get("if-none-match")
+    if not if_none_match:
+        return False
+    candidates = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+    return etag in candidates or "*" in candidates
+
+def encode_cursor(doc: dict, sort_keys: list) -> str:
+    values = [doc.get(key) for key, _ in sort_keys]
+    # json_util round-trips datetimes used as sort keys
+    return base64.urlsafe_b64encode(json_util.dumps(values).encode()).decode()
+
+def decode_cursor(cursor: str, sort_keys: list) -> list:
+    try:
+        values = json_util.loads(base64.urlsafe_b64decode(cursor.encode()))
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    if not isinstance(values, list) or len(values) != len(sort_keys):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return values
+
+async def paginate(collection, sort_keys: list, limit: int, cursor: Optional[str] = None,
+                   query: Optional[dict] = None, projection: Optional[dict] = None):
+    """Keyset pagination: returns one page of documents plus the cursor for the next page.
+
+    sort_keys is a list of (field, direction) pairs that together are unique,
+    e.g. [("seq", -1), ("invoice_number", -1)] or [("created_at", 1), ("id", 1)].
+    """
+    query = dict(query or {})
+    if cursor:
+        values = decode_cursor(cursor, sort_keys)
+        # (k1, k2, ...) > (v1, v2, ...) expanded into an $or of prefix matches
+        branches = []
+        for i, (key, direction) in enumerate(sort_keys):
+            branch = {prev_key: values[j] for j, (prev_key, _) in enumerate(sort_keys[:i])}
+            branch[key] = {"$lt" if direction < 0 else "$gt": values[i]}
+            branches.append(branch)
+        query = {"$and": [query, {"$or": branches}]} if query else {"$or": branches}
+
+    docs = await collection.find(query, projection or {"_id": 0}).sort(sort_keys).limit(limit + 1).to_list(limit + 1)
+
+    next_cursor = None
+    if len(docs) > limit:
+        docs = docs[:limit]
+        next_cursor = encode_cursor(docs[-1], sort_keys)
+    return docs, next_cursor
+
+# Map certificate types to number prefixes
+CERTIFICATE_PREFIXES = {
+    "CP12": "CP12",
+    "CD11": "CD11",
+    "GWN": "GWN",
+    "CD10": "CD10",
+    "TI133D": "TI133D"
+}
+
+def certificate_prefix(cert_type: str) -> str:
+    return CERTIFICATE_PREFIXES.get(cert_type, "CERT")
+
+async def allocate_numbers(counter: str, count: int = 1) -> int:
+    """Atomically reserve `count` sequence numbers and return the last one."""
+    doc = await db.counters.find_one_and_update(
+        {"_id": counter},
+        {"$inc": {"seq": count}},
+        upsert=True,
+        return_document=ReturnDocument.AFTER
+    )
+    return doc["seq"]
+
+def resolve_fields(model, fields: Optional[str], views: Optional[dict] = None) -> Optional[List[str]]:
+    """Turn a ?fields= value (a view name or a comma separated list) into model field names."""
+    if not fields:
+        return None
+    if views and fields in views:
+        names = list(views[fields])
+    else:
+        names = [name.strip() for name in fields.split(",") if name.strip()]
+    unknown = [name for name in names if name not in model.model_fields]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown fields: {', '.join(unknown)}")
+    if "id" not in names:
+        names.insert(0, "id")
+    return names
+
+def field_projection(names: Optional[List[str]], sort_keys: list) -> dict:
+    if not names:
+        return {"_id": 0}
+    # Sort keys are always fetched so the next cursor can be encoded
+    return {"_id": 0, **{name: 1 for name in names}, **{key: 1 for key, _ in sort_keys}}
+
+@lru_cache(maxsize=128)
+def partial_model(model, names: tuple):
+    return create_model(
+        f"{model.__name__}Fields",
+        __config__=ConfigDict(extra="ignore"),
+        **{name: (Optional[model.model_fields[name].annotation], None) for name in names}
+    )
+
+def sparse_response(model, names: List[str], docs: List[dict], next_cursor: Optional[str]) -> JSONResponse:
+    trimmed = partial_model(model, tuple(names))
+    headers = {NEXT_CURSOR_HEADER: next_cursor} if next_cursor else None
+    return JSONResponse(jsonable_encoder([trimmed(**doc) for doc in docs]), headers=headers)
 
 async def get_next_customer_number() -> str:
-    last_customer = await db.customers.find_one(sort=[("customer_number", -1)])
-    if last_customer:
-        last_num = int(last_customer["customer_number"].replace("C", ""))
-        return f"C{str(last_num + 1).zfill(5)}"
-    return "C00001"
+    seq = await allocate_numbers("customer")
+    return f"C{str(seq).zfill(5)}"
 
 async def get_next_invoice_number() -> str:
-    last_invoice = await db.invoices.find_one(sort=[("invoice_number", -1)])
-    if last_invoice:
-        last_num = int(last_invoice["invoice_number"].replace("INV", ""))
-        return f"INV{str(last_num + 1).zfill(5)}"
-    return "INV00001"
+    seq = await allocate_numbers("invoice")
+    return f"INV{str(seq).zfill(5)}"
 
 async def get_next_estimate_number() -> str:
-    last_estimate = await db.estimates.find_one(sort=[("estimate_number", -1)])
-    if last_estimate:
-        last_num = int(last_estimate["estimate_number"].replace("EST", ""))
-        return f"EST{str(last_num + 1).zfill(5)}"
-    return "EST00001"
+    seq = await allocate_numbers("estimate")
+    return f"EST{str(seq).zfill(5)}"
 
 async def get_next_certificate_number(cert_type: str) -> str:
-    # Map certificate types to prefixes
-    prefix_map = {
-        "CP12": "CP12",
-        "CD11": "CD11",
-        "GWN": "GWN",
-        "CD10": "CD10",
-        "TI133D": "TI133D"
-    }
-    
-    prefix = prefix_map.get(cert_type, "CERT")
-    
-    # Find last certificate of this type
-    last_cert = await db.certificates.find_one(
-        {"certificate_type": cert_type},
-        sort=[("certificate_number", -1)]
-    )
-    
-    if last_cert:
-        # Extract number from certificate number
-        cert_num = last_cert["certificate_number"].replace(prefix + "-", "")
-        last_num = int(cert_num)
-        return f"{prefix}-{str(last_num + 1).zfill(5)}"
-    
-    return f"{prefix}-00001"
+    prefix = certificate_prefix(cert_type)
+    seq = await allocate_numbers(f"certificate:{cert_type}")
+    return f"{prefix}-{str(seq).zfill(5)}"
+
+# Indexes backing every lookup (find_one by id/email) and every list sort
+INDEXES = {
+    "users": [
+        IndexModel([("id", ASCENDING)], unique=True),
+        IndexModel([("email", ASCENDING)], unique=True),
+    ],
+    "customers": [
+        IndexModel([("id", ASCENDING)], unique=True),
+        IndexModel([("customer_number", ASCENDING)], unique=True),
+        IndexModel([("seq", ASCENDING), ("customer_number", ASCENDING)]),
+        # The "search" text indexes share one weight scale so /api/search can
+        # merge their textScores: 10 for a record's number or name, 5 otherwise
+        IndexModel(
+            [("name", TEXT), ("address", TEXT), ("phone", TEXT)],
+            name="search", weights={"name": 10, "address": 5, "phone": 5}, default_language="none"
+        ),
+    ],
+    "services": [
+        IndexModel([("id", ASCENDING)], unique=True),
+        IndexModel([("created_at", ASCENDING), ("id", ASCENDING)]),
+    ],
+    "invoices": [
+        IndexModel([("id", ASCENDING)], unique=True),
+        IndexModel([("invoice_number", DESCENDING)], unique=True),
+        IndexModel([("seq", DESCENDING), ("invoice_number", DESCENDING)]),
+        IndexModel(
+            [("estimate_id", ASCENDING)],
+            unique=True, partialFilterExpression={"estimate_id": {"$type": "string"}}
+        ),
+        IndexModel(
+            [("invoice_number", TEXT), ("customer_name", TEXT)],
+            name="search", weights={"invoice_number": 10, "customer_name": 5}, default_language="none"
+        ),
+    ],
+    "estimates": [
+        IndexModel([("id", ASCENDING)], unique=True),
+        IndexModel([("estimate_number", DESCENDING)], unique=True),
+        IndexModel([("seq", DESCENDING), ("estimate_number", DESCENDING)]),
+    ],
+    "certificates": [
+        IndexModel([("id", ASCENDING)], unique=True),
+        IndexModel([("certificate_number", DESCENDING)], unique=True),
+        IndexModel([("certificate_type", ASCENDING), ("certificate_number", DESCENDING)]),
+        IndexModel([("certificate_type", DESCENDING), ("seq", DESCENDING), ("certificate_number", DESCENDING)]),
+        IndexModel([("next_inspection_due", ASCENDING), ("id", ASCENDING)]),
+        IndexModel(
+            [("boiler_serial_number", TEXT), ("appliance_serial_number", TEXT), ("inspection_address", TEXT)],
+            name="search",
+            weights={"boiler_serial_number": 10, "appliance_serial_number": 10, "inspection_address": 5},
+            default_language="none"
+        ),
+    ],
+    "company_settings": [
+        IndexModel([("id", ASCENDING)], unique=True),
+    ],
+    "jobs": [
+        IndexModel([("id", ASCENDING)], unique=True),
+        IndexModel([("status", ASCENDING), ("lease_until", ASCENDING)]),
+        # One unfinished batch per user: active_user is set until the job finishes
+        IndexModel(
+            [("active_user", ASCENDING)],
+            unique=True, partialFilterExpression={"active_user": {"$type": "string"}}
+        ),
+    ],
+    "reminders": [
+        IndexModel([("id", ASCENDING)], unique=True),
+        # One reminder per certificate per due date, however often the queue is rebuilt
+        IndexModel([("certificate_id", ASCENDING), ("due_date", ASCENDING)], unique=True),
+        IndexModel([("status", ASCENDING), ("due_date", ASCENDING)]),
+        IndexModel([("run_id", ASCENDING)], sparse=True),
+    ],
+    "idempotency_keys": [
+        IndexModel([("id", ASCENDING)], unique=True),
+        IndexModel([("created_at", ASCENDING)], expireAfterSeconds=IDEMPOTENCY_TTL_SECONDS),
+    ],
+    "scheduler": [
+        IndexModel([("id", ASCENDING)], unique=True),
+    ],
+    "perf_profiles": [
+        IndexModel([("id", ASCENDING)], unique=True),
+        IndexModel([("created_at", DESCENDING), ("id", DESCENDING)]),
+        IndexModel([("created_at", ASCENDING)], expireAfterSeconds=PROFILE_TTL_SECONDS),
+    ],
+    "report_revenue_monthly": [
+        IndexModel([("id", ASCENDING)], unique=True),
+    ],
+    "report_vat_quarterly": [
+        IndexModel([("id", ASCENDING)], unique=True),
+    ],
+    "report_unpaid_by_due_date": [
+        IndexModel([("id", ASCENDING)], unique=True),
+    ],
+    "pdf_job_items": [
+        IndexModel([("job_id", ASCENDING), ("filename", ASCENDING)], unique=True),
+    ],
+}
+
+async def ensure_indexes():
+    for collection_name, indexes in INDEXES.items():
+        try:
+            await db[collection_name].create_indexes(indexes)
+        except OperationFailure as e:
+            # Typically duplicate values blocking a unique index; keep serving
+            logger.error(f"Could not create indexes on {collection_name}: {e}")
+
+async def seed_counter(counter: str, collection, field: str, prefix: str, query: Optional[dict] = None):
+    # The highest number is found numerically: past 99999 the zero-padded
+    # strings stop sorting (INV100000 < INV99999). Numbers that are not the
+    # prefix and digits are skipped and logged rather than failing startup.
+    query = query or {}
+    number = re.compile(f"^{re.escape(prefix)}[0-9]+$")
+    rows = await collection.aggregate([
+        {"$match": {**query, field: number}},
+        {"$group": {"_id": None, "seq": {"$max": {"$toLong": {"$substrCP": [f"${field}", len(prefix), 32]}}}}}
+    ]).to_list(1)
+
+    malformed = await collection.count_documents({**query, field: {"$not": number}})
+    if malformed:
+        example = await collection.find_one({**query, field: {"$not": number}}, {"_id": 0, "id": 1, field: 1})
+        logger.warning(f"Counter {counter}: skipped {malformed} document(s) with a malformed {field}, e.g. {example}")
+
+    if rows and rows[0]["seq"] is not None:
+        # $max keeps this idempotent: a counter is only ever moved forward
+        await db.counters.update_one({"_id": counter}, {"$max": {"seq": rows[0]["seq"]}}, upsert=True)
+
+async def seed_counters():
+    """Bring the counters collection in line with the highest numbers already issued."""
+    await seed_counter("customer", db.customers, "customer_number", "C")
+    await seed_counter("invoice", db.invoices, "invoice_number", "INV")
+    await seed_counter("estimate", db.estimates, "estimate_number", "EST")
+    for cert_type in await db.certificates.distinct("certificate_type"):
+        await seed_counter(
+            f"certificate:{cert_type}",
+            db.certificates,
+            "certificate_number",
+            certificate_prefix(cert_type) + "-",
+            {"certificate_type": cert_type}
+        )
+
+# collection -> number field, for documents written before seq was stored
+NUMBER_FIELDS = {
+    "customers": "customer_number",
+    "invoices": "invoice_number",
+    "estimates": "estimate_number",
+    "certificates": "certificate_number",
+}
+
+async def backfill_seq(batch_size: int = 1000) -> dict:
+    """Set seq from the number on documents that lack it; returns how many per collection.
+
+    Until then they sort after every numbered document, and a cursor past the
+    last numbered one cannot reach them.
+    """
+    migrated = {}
+    for name, field in NUMBER_FIELDS.items():
+        migrated[name] = 0
+        operations = []
+        async for doc in db[name].find({"seq": None}, {field: 1}):
+            seq = number_seq(doc.get(field))
+            if seq is None:
+                logger.warning(f"{name} {doc['_id']}: no number in {field}={doc.get(field)!r}")
+                continue
+            operations.append(UpdateOne({"_id": doc["_id"]}, {"$set": {"seq": seq}}))
+            if len(operations) >= batch_size:
+                await db[name].bulk_write(operations, ordered=False)
+                migrated[name] += len(operations)
+                operations = []
+        if operations:
+            await db[name].bulk_write(operations, ordered=False)
+            migrated[name] += len(operations)
+    return migrated
 
 # Routes
 @api_router.get("/")
@@ -566,8 +1342,7 @@ async def register(user_data: UserCreate):
     )
     
     doc = user.model_dump()
-    doc["password"] = hash_password(user_data.password)
-    doc["created_at"] = doc["created_at"].isoformat()
+    doc["password"] = await hash_password(user_data.password)
     
     await db.users.insert_one(doc)
     
@@ -577,12 +1352,9 @@ async def register(user_data: UserCreate):
 @api_router.post("/auth/login")
 async def login(credentials: UserLogin):
     user = await db.users.find_one({"email": credentials.email})
-    if not user or not verify_password(credentials.password, user["password"]):
+    if not user or not await verify_password(credentials.password, user["password"]):
         raise HTTPException(status_code=401, detail="Invalid email or password")
     
-    if isinstance(user['created_at'], str):
-        user['created_at'] = datetime.fromisoformat(user['created_at'])
-    
     user_obj = User(**{k: v for k, v in user.items() if k != "password"})
     token = create_access_token({"user_id": user_obj.id, "email": user_obj.email, "role": user_obj.role})
     
@@ -592,6 +1364,171 @@ async def login(credentials: UserLogin):
 async def get_me(current_user: User = Depends(get_current_user)):
     return current_user
 
+@api_router.get("/auth/password-pool")
+async def get_password_pool(current_user: User = Depends(get_current_user)):
+    if current_user.role != "admin":
+        raise HTTPException(status_code=403, detail="Only admins can view password pool stats")
+
+    return password_pool_stats()
+
+# Dashboard Routes
+@api_router.get("/dashboard/stats", response_model=DashboardStats)
+async def get_dashboard_stats(current_user: TokenUser = Depends(get_read_user)):
+    # One pass over customers, invoices and estimates for the counters; each
+    # branch projects only the fields the $group reads, so no whole documents
+    # are streamed through the pipeline
+    pipeline = [
+        {"$project": {"_id": 0, "kind": {"$literal": "customer"}}},
+        {"$unionWith": {
+            "coll": "invoices",
+            "pipeline": [{"$project": {"_id": 0, "kind": {"$literal": "invoice"}, "status": 1, "total": 1}}]
+        }},
+        {"$unionWith": {
+            "coll": "estimates",
+            "pipeline": [{"$project": {"_id": 0, "kind": {"$literal": "estimate"}, "status": 1}}]
+        }},
+        {"$group": {
+            "_id": "$kind",
+            "total": {"$sum": 1},
+            "unpaid": {"$sum": {"$cond": [{"$eq": ["$status", "unpaid"]}, 1, 0]}},
+            "pending": {"$sum": {"$cond": [{"$eq": ["$status", "pending"]}, 1, 0]}},
+            "revenue": {"$sum": {"$cond": [{"$eq": ["$status", "paid"]}, "$total", 0]}}
+        }}
+    ]
+
+    # The recent list walks the (seq, invoice_number) index and stops after five
+    counts_task = db.customers.aggregate(pipeline).to_list(None)
+    recent_task = db.invoices.find({}, {"_id": 0}).sort([("seq", -1), ("invoice_number", -1)]).limit(5).to_list(5)
+    rows, recent_invoices = await asyncio.gather(counts_task, recent_task)
+    counts = {row["_id"]: row for row in rows}
+
+    invoices = counts.get("invoice", {})
+    estimates = counts.get("estimate", {})
+
+    return DashboardStats(
+        total_customers=counts.get("customer", {}).get("total", 0),
+        total_invoices=invoices.get("total", 0),
+        total_estimates=estimates.get("total", 0),
+        unpaid_invoices=invoices.get("unpaid", 0),
+        pending_estimates=estimates.get("pending", 0),
+        total_revenue=invoices.get("revenue", 0),
+        recent_invoices=recent_invoices
+    )
+
+# Report Routes
+AGED_DEBTOR_BUCKETS = [("not_due", None), ("0-30", 30), ("31-60", 60), ("61-90", 90), ("90+", None)]
+
+def aged_bucket(days_overdue: int) -> str:
+    if days_overdue < 0:
+        return "not_due"
+    for bucket, max_days in AGED_DEBTOR_BUCKETS[1:-1]:
+        if days_overdue <= max_days:
+            return bucket
+    return "90+"
+
+def year_filter(year: Optional[int]) -> dict:
+    return {"id": {"$regex": f"^{year}-"}} if year else {}
+
+@api_router.get("/reports/revenue", response_model=List[MonthlyRevenue])
+async def get_revenue_report(year: Optional[int] = None, current_user: TokenUser = Depends(get_read_user)):
+    rows = await db.report_revenue_monthly.find(year_filter(year), {"_id": 0}).sort("id", 1).to_list(None)
+    return [
+        MonthlyRevenue(
+            month=row["id"],
+            invoiced=round(row.get("invoiced", 0), 2),
+            paid=round(row.get("paid", 0), 2),
+            vat_amount=round(row.get("vat_amount", 0), 2),
+            count=row.get("count", 0)
+        )
+        for row in rows if row.get("count")
+    ]
+
+@api_router.get("/reports/vat", response_model=List[QuarterlyVat])
+async def get_vat_report(year: Optional[int] = None, current_user: TokenUser = Depends(get_read_user)):
+    rows = await db.report_vat_quarterly.find(year_filter(year), {"_id": 0}).sort("id", 1).to_list(None)
+    return [
+        QuarterlyVat(
+            quarter=row["id"],
+            subtotal=round(row.get("subtotal", 0), 2),
+            vat_amount=round(row.get("vat_amount", 0), 2),
+            total=round(row.get("total", 0), 2),
+            count=row.get("count", 0)
+        )
+        for row in rows if row.get("count")
+    ]
+
+@api_router.get("/reports/aged-debtors", response_model=AgedDebtors)
+async def get_aged_debtors_report(current_user: TokenUser = Depends(get_read_user)):
+    """Unpaid invoice totals bucketed by days past their due date.
+
+    The rollup holds one document per due date, so ageing is recomputed for
+    today on every request without touching the invoices.
+    """
+    now = datetime.now(timezone.utc)
+    buckets = {bucket: AgedDebtorBucket(bucket=bucket) for bucket, _ in AGED_DEBTOR_BUCKETS}
+    async for row in db.report_unpaid_by_due_date.find({"count": {"$gt": 0}}, {"_id": 0}):
+        bucket = buckets[aged_bucket((now - row["due_date"]).days)]
+        bucket.amount += row["amount"]
+        bucket.count += row["count"]
+    
+    for bucket in buckets.values():
+        bucket.amount = round(bucket.amount, 2)
+    return AgedDebtors(
+        as_of=now,
+        total=round(sum(bucket.amount for bucket in buckets.values()), 2),
+        buckets=list(buckets.values())
+    )
+
+# Search Routes
+# type -> (collection, title field, subtitle field)
+SEARCH_SOURCES = {
+    "customer": ("customers", "name", "address"),
+    "invoice": ("invoices", "invoice_number", "customer_name"),
+    "certificate": ("certificates", "certificate_number", "inspection_address"),
+}
+SEARCH_CURSOR_KEYS = [("offset", 1)]
+
+async def search_collection(hit_type: str, q: str, limit: int) -> List[SearchHit]:
+    collection, title_field, subtitle_field = SEARCH_SOURCES[hit_type]
+    projection = {"_id": 0, "id": 1, title_field: 1, subtitle_field: 1, "score": {"$meta": "textScore"}}
+    docs = await db[collection].find({"$text": {"$search": q}}, projection).sort(
+        [("score", {"$meta": "textScore"})]
+    ).limit(limit).to_list(limit)
+    return [
+        SearchHit(type=hit_type, id=doc["id"], title=doc[title_field], subtitle=doc.get(subtitle_field),
+                  score=doc["score"])
+        for doc in docs
+    ]
+
+@api_router.get("/search", response_model=List[SearchHit])
+async def search(
+    response: Response,
+    q: str = Query(..., min_length=1, max_length=200),
+    limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = None,
+    current_user: TokenUser = Depends(get_read_user)
+):
+    """Ranked text search over customers, invoices and certificates.
+
+    Each collection is queried for its best offset + limit + 1 hits via its
+    text index and the results are merged by textScore. The "search" indexes
+    share one weighting scale (10 for a record's number or name, 5 for
+    secondary fields), so scores from different collections are comparable.
+    """
+    offset = decode_cursor(cursor, SEARCH_CURSOR_KEYS)[0] if cursor else 0
+    # Every page re-ranks the hits before it, so depth is bounded
+    if not isinstance(offset, int) or not 0 <= offset <= MAX_PAGE_SIZE:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    window = offset + limit + 1
+    results = await asyncio.gather(*[search_collection(hit_type, q, window) for hit_type in SEARCH_SOURCES])
+    # Ties are broken by type and id so pages stay stable
+    hits = sorted((hit for hits in results for hit in hits), key=lambda hit: (-hit.score, hit.type, hit.id))
+    
+    page = hits[offset:offset + limit]
+    if len(hits) > offset + limit:
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor({"offset": offset + limit}, SEARCH_CURSOR_KEYS)
+    return page
+
 # Customer Routes
 @api_router.post("/customers", response_model=Customer)
 async def create_customer(customer_data: CustomerCreate, current_user: User = Depends(get_current_user)):
@@ -602,30 +1539,45 @@ async def create_customer(customer_data: CustomerCreate, current_user: User = De
     )
     
     doc = customer.model_dump()
-    doc["created_at"] = doc["created_at"].isoformat()
     
     await db.customers.insert_one(doc)
+    customer_index.add(customer.model_dump())
     return customer
 
 @api_router.get("/customers", response_model=List[Customer])
-async def get_customers(current_user: User = Depends(get_current_user)):
-    customers = await db.customers.find({}, {"_id": 0}).to_list(1000)
-    
-    for customer in customers:
-        if isinstance(customer['created_at'], str):
-            customer['created_at'] = datetime.fromisoformat(customer['created_at'])
+async def get_customers(
+    response: Response,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    fields: Optional[str] = None,
+    q: Optional[str] = Query(None, max_length=100),
+    current_user: TokenUser = Depends(get_read_user)
+):
+    sort_keys = [("seq", 1), ("customer_number", 1)]
+    names = resolve_fields(Customer, fields)
+    customers, next_cursor = await paginate(db.customers, sort_keys, limit, cursor, query=list_query("customers", q), projection=field_projection(names, sort_keys))
+    if names:
+        return sparse_response(Customer, names, customers, next_cursor)
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
     
     return customers
 
+@api_router.get("/customers/suggest", response_model=List[Customer])
+async def suggest_customers(
+    prefix: str = Query(..., min_length=1),
+    limit: int = Query(DEFAULT_SUGGEST_LIMIT, ge=1, le=MAX_SUGGEST_LIMIT),
+    current_user: TokenUser = Depends(get_read_user)
+):
+    await customer_index.ensure_loaded()
+    return customer_index.search(prefix, limit)
+
 @api_router.get("/customers/{customer_id}", response_model=Customer)
-async def get_customer(customer_id: str, current_user: User = Depends(get_current_user)):
+async def get_customer(customer_id: str, current_user: TokenUser = Depends(get_read_user)):
     customer = await db.customers.find_one({"id": customer_id}, {"_id": 0})
     if not customer:
         raise HTTPException(status_code=404, detail="Customer not found")
     
-    if isinstance(customer['created_at'], str):
-        customer['created_at'] = datetime.fromisoformat(customer['created_at'])
-    
     return Customer(**customer)
 
 @api_router.put("/customers/{customer_id}", response_model=Customer)
@@ -638,8 +1590,7 @@ async def update_customer(customer_id: str, customer_data: CustomerCreate, curre
     await db.customers.update_one({"id": customer_id}, {"$set": update_data})
     
     updated_customer = await db.customers.find_one({"id": customer_id}, {"_id": 0})
-    if isinstance(updated_customer['created_at'], str):
-        updated_customer['created_at'] = datetime.fromisoformat(updated_customer['created_at'])
+    customer_index.add(updated_customer)
     
     return Customer(**updated_customer)
 
@@ -652,6 +1603,7 @@ async def delete_customer(customer_id: str, current_user: User = Depends(get_cur
     if result.deleted_count == 0:
         raise HTTPException(status_code=404, detail="Customer not found")
     
+    customer_index.remove(customer_id)
     return {"message": "Customer deleted successfully"}
 
 # Service Routes
@@ -660,30 +1612,45 @@ async def create_service(service_data: ServiceCreate, current_user: User = Depen
     service = Service(**service_data.model_dump())
     
     doc = service.model_dump()
-    doc["created_at"] = doc["created_at"].isoformat()
     
     await db.services.insert_one(doc)
+    service_index.add(service.model_dump())
     return service
 
 @api_router.get("/services", response_model=List[Service])
-async def get_services(current_user: User = Depends(get_current_user)):
-    services = await db.services.find({}, {"_id": 0}).to_list(1000)
-    
-    for service in services:
-        if isinstance(service['created_at'], str):
-            service['created_at'] = datetime.fromisoformat(service['created_at'])
+async def get_services(
+    response: Response,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    fields: Optional[str] = None,
+    q: Optional[str] = Query(None, max_length=100),
+    current_user: TokenUser = Depends(get_read_user)
+):
+    sort_keys = [("created_at", 1), ("id", 1)]
+    names = resolve_fields(Service, fields)
+    services, next_cursor = await paginate(db.services, sort_keys, limit, cursor, query=list_query("services", q), projection=field_projection(names, sort_keys))
+    if names:
+        return sparse_response(Service, names, services, next_cursor)
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
     
     return services
 
+@api_router.get("/services/suggest", response_model=List[Service])
+async def suggest_services(
+    prefix: str = Query(..., min_length=1),
+    limit: int = Query(DEFAULT_SUGGEST_LIMIT, ge=1, le=MAX_SUGGEST_LIMIT),
+    current_user: TokenUser = Depends(get_read_user)
+):
+    await service_index.ensure_loaded()
+    return service_index.search(prefix, limit)
+
 @api_router.get("/services/{service_id}", response_model=Service)
-async def get_service(service_id: str, current_user: User = Depends(get_current_user)):
+async def get_service(service_id: str, current_user: TokenUser = Depends(get_read_user)):
     service = await db.services.find_one({"id": service_id}, {"_id": 0})
     if not service:
         raise HTTPException(status_code=404, detail="Service not found")
     
-    if isinstance(service['created_at'], str):
-        service['created_at'] = datetime.fromisoformat(service['created_at'])
-    
     return Service(**service)
 
 @api_router.put("/services/{service_id}", response_model=Service)
@@ -696,8 +1663,7 @@ async def update_service(service_id: str, service_data: ServiceCreate, current_u
     await db.services.update_one({"id": service_id}, {"$set": update_data})
     
     updated_service = await db.services.find_one({"id": service_id}, {"_id": 0})
-    if isinstance(updated_service['created_at'], str):
-        updated_service['created_at'] = datetime.fromisoformat(updated_service['created_at'])
+    service_index.add(updated_service)
     
     return Service(**updated_service)
 
@@ -710,24 +1676,123 @@ async def delete_service(service_id: str, current_user: User = Depends(get_curre
     if result.deleted_count == 0:
         raise HTTPException(status_code=404, detail="Service not found")
     
+    service_index.remove(service_id)
     return {"message": "Service deleted successfully"}
 
+# Report rollups
+# Invoice totals are pre-aggregated into these collections as invoices are
+# written, so reports read a handful of documents. rebuild_rollups() recomputes
+# them from scratch (see rebuild_reports.py).
+def quarter_key(value: datetime) -> str:
+    return f"{value.year}-Q{(value.month - 1) // 3 + 1}"
+
+def as_utc(value: datetime) -> datetime:
+    # Naive datetimes are stored as UTC, so they are read as UTC too
+    return value.replace(tzinfo=timezone.utc) if value.tzinfo is None else value.astimezone(timezone.utc)
+
+def invoice_rollup_increments(invoice: dict, sign: int) -> List[tuple]:
+    """(collection, key, $inc) triples that add (sign=1) or remove (sign=-1) one invoice.
+
+    Dates are bucketed in UTC, as Mongo returns them and as ROLLUP_PIPELINES
+    groups them, whatever offset the request was sent with.
+    """
+    issue_date = as_utc(invoice["issue_date"])
+    paid = invoice.get("status") == "paid"
+    increments = [
+        ("report_revenue_monthly", f"{issue_date:%Y-%m}", {
+            "invoiced": sign * invoice["total"],
+            "paid": sign * invoice["total"] if paid else 0,
+            "vat_amount": sign * invoice["vat_amount"],
+            "count": sign,
+        }),
+        ("report_vat_quarterly", quarter_key(issue_date), {
+            "subtotal": sign * invoice["subtotal"],
+            "vat_amount": sign * invoice["vat_amount"],
+            "total": sign * invoice["total"],
+            "count": sign,
+        }),
+    ]
+    if not paid:
+        # Invoices without a due date are due on issue
+        due_date = as_utc(invoice.get("due_date") or issue_date)
+        increments.append(("report_unpaid_by_due_date", f"{due_date:%Y-%m-%d}", {
+            "amount": sign * invoice["total"],
+            "count": sign,
+        }))
+    return increments
+
+async def update_rollups(added: List[dict] = (), removed: List[dict] = ()):
+    # Sum the increments per rollup document first so a batch is one write per document
+    totals = defaultdict(lambda: defaultdict(float))
+    for invoices, sign in [(added, 1), (removed, -1)]:
+        for invoice in invoices:
+            for collection, key, increments in invoice_rollup_increments(invoice, sign):
+                for field, value in increments.items():
+                    totals[(collection, key)][field] += value
+    
+    operations = defaultdict(list)
+    for (collection, key), increments in totals.items():
+        increments["count"] = int(increments["count"])
+        update = {"$inc": dict(increments)}
+        if collection == "report_unpaid_by_due_date":
+            update["$setOnInsert"] = {"due_date": datetime.strptime(key, "%Y-%m-%d").replace(tzinfo=timezone.utc)}
+        operations[collection].append(UpdateOne({"id": key}, update, upsert=True))
+    await asyncio.gather(*[
+        db[collection].bulk_write(ops, ordered=False) for collection, ops in operations.items()
+    ])
+
+ROLLUP_PIPELINES = {
+    "report_revenue_monthly": [
+        {"$group": {
+            "_id": {"$dateToString": {"format": "%Y-%m", "date": "$issue_date"}},
+            "invoiced": {"$sum": "$total"},
+            "paid": {"$sum": {"$cond": [{"$eq": ["$status", "paid"]}, "$total", 0]}},
+            "vat_amount": {"$sum": "$vat_amount"},
+            "count": {"$sum": 1},
+        }},
+    ],
+    "report_vat_quarterly": [
+        {"$group": {
+            "_id": {"$concat": [
+                {"$toString": {"$year": "$issue_date"}},
+                "-Q",
+                {"$toString": {"$toInt": {"$ceil": {"$divide": [{"$month": "$issue_date"}, 3]}}}},
+            ]},
+            "subtotal": {"$sum": "$subtotal"},
+            "vat_amount": {"$sum": "$vat_amount"},
+            "total": {"$sum": "$total"},
+            "count": {"$sum": 1},
+        }},
+    ],
+    "report_unpaid_by_due_date": [
+        {"$match": {"status": {"$ne": "paid"}}},
+        {"$group": {
+            "_id": {"$dateToString": {"format": "%Y-%m-%d", "date": {"$ifNull": ["$due_date", "$issue_date"]}}},
+            "amount": {"$sum": "$total"},
+            "count": {"$sum": 1},
+        }},
+        {"$addFields": {"due_date": {"$dateFromString": {"dateString": "$_id"}}}},
+    ],
+}
+
+async def rebuild_rollups():
+    """Recompute every rollup from the invoices collection; $out swaps each one in atomically."""
+    for collection, pipeline in ROLLUP_PIPELINES.items():
+        stages = pipeline + [
+            {"$addFields": {"id": "$_id"}},
+            {"$project": {"_id": 0}},
+            {"$out": collection},
+        ]
+        await db.invoices.aggregate(stages).to_list(None)
+
 # Invoice Routes
-@api_router.post("/invoices", response_model=Invoice)
-async def create_invoice(invoice_data: InvoiceCreate, current_user: User = Depends(get_current_user)):
-    # Get customer
-    customer = await db.customers.find_one({"id": invoice_data.customer_id}, {"_id": 0})
-    if not customer:
-        raise HTTPException(status_code=404, detail="Customer not found")
-    
+def build_invoice(invoice_data: InvoiceCreate, customer: dict, invoice_number: str, created_by: str, **extra) -> Invoice:
     # Calculate totals
     subtotal = sum(item.total for item in invoice_data.items)
     vat_amount = subtotal * (invoice_data.vat_rate / 100)
     total = subtotal + vat_amount
     
-    invoice_number = await get_next_invoice_number()
-    
-    invoice = Invoice(
+    return Invoice(
         invoice_number=invoice_number,
         customer_id=invoice_data.customer_id,
         customer_name=customer["name"],
@@ -742,45 +1807,53 @@ async def create_invoice(invoice_data: InvoiceCreate, current_user: User = Depen
         issue_date=invoice_data.issue_date,
         due_date=invoice_data.due_date,
         notes=invoice_data.notes,
-        created_by=current_user.id
+        created_by=created_by,
+        **extra
     )
+
+def invoice_to_doc(invoice: Invoice) -> dict:
+    return invoice.model_dump()
+
+@api_router.post("/invoices", response_model=Invoice)
+async def create_invoice(invoice_data: InvoiceCreate, current_user: User = Depends(get_current_user)):
+    # Get customer
+    customer = await db.customers.find_one({"id": invoice_data.customer_id}, {"_id": 0})
+    if not customer:
+        raise HTTPException(status_code=404, detail="Customer not found")
     
-    doc = invoice.model_dump()
-    doc["created_at"] = doc["created_at"].isoformat()
-    doc["issue_date"] = doc["issue_date"].isoformat()
-    if doc["due_date"]:
-        doc["due_date"] = doc["due_date"].isoformat()
+    invoice_number = await get_next_invoice_number()
+    invoice = build_invoice(invoice_data, customer, invoice_number, current_user.id)
     
+    doc = invoice_to_doc(invoice)
     await db.invoices.insert_one(doc)
+    await update_rollups(added=[doc])
     return invoice
 
 @api_router.get("/invoices", response_model=List[Invoice])
-async def get_invoices(current_user: User = Depends(get_current_user)):
-    invoices = await db.invoices.find({}, {"_id": 0}).sort("invoice_number", -1).to_list(1000)
-    
-    for invoice in invoices:
-        if isinstance(invoice['created_at'], str):
-            invoice['created_at'] = datetime.fromisoformat(invoice['created_at'])
-        if isinstance(invoice['issue_date'], str):
-            invoice['issue_date'] = datetime.fromisoformat(invoice['issue_date'])
-        if invoice.get('due_date') and isinstance(invoice['due_date'], str):
-            invoice['due_date'] = datetime.fromisoformat(invoice['due_date'])
+async def get_invoices(
+    response: Response,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    fields: Optional[str] = None,
+    q: Optional[str] = Query(None, max_length=100),
+    current_user: TokenUser = Depends(get_read_user)
+):
+    sort_keys = [("seq", -1), ("invoice_number", -1)]
+    names = resolve_fields(Invoice, fields, LIST_VIEWS["invoices"])
+    invoices, next_cursor = await paginate(db.invoices, sort_keys, limit, cursor, query=list_query("invoices", q), projection=field_projection(names, sort_keys))
+    if names:
+        return sparse_response(Invoice, names, invoices, next_cursor)
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
     
     return invoices
 
 @api_router.get("/invoices/{invoice_id}", response_model=Invoice)
-async def get_invoice(invoice_id: str, current_user: User = Depends(get_current_user)):
+async def get_invoice(invoice_id: str, current_user: TokenUser = Depends(get_read_user)):
     invoice = await db.invoices.find_one({"id": invoice_id}, {"_id": 0})
     if not invoice:
         raise HTTPException(status_code=404, detail="Invoice not found")
     
-    if isinstance(invoice['created_at'], str):
-        invoice['created_at'] = datetime.fromisoformat(invoice['created_at'])
-    if isinstance(invoice['issue_date'], str):
-        invoice['issue_date'] = datetime.fromisoformat(invoice['issue_date'])
-    if invoice.get('due_date') and isinstance(invoice['due_date'], str):
-        invoice['due_date'] = datetime.fromisoformat(invoice['due_date'])
-    
     return Invoice(**invoice)
 
 @api_router.patch("/invoices/{invoice_id}/status")
@@ -788,10 +1861,17 @@ async def update_invoice_status(invoice_id: str, status: str, current_user: User
     if status not in ["paid", "unpaid"]:
         raise HTTPException(status_code=400, detail="Invalid status")
     
-    result = await db.invoices.update_one({"id": invoice_id}, {"$set": {"status": status}})
-    if result.matched_count == 0:
+    previous = await db.invoices.find_one_and_update(
+        {"id": invoice_id},
+        {"$set": {"status": status}},
+        projection={"_id": 0},
+        return_document=ReturnDocument.BEFORE
+    )
+    if previous is None:
         raise HTTPException(status_code=404, detail="Invoice not found")
     
+    if previous.get("status") != status:
+        await update_rollups(added=[dict(previous, status=status)], removed=[previous])
     return {"message": "Invoice status updated successfully"}
 
 @api_router.delete("/invoices/{invoice_id}")
@@ -799,10 +1879,12 @@ async def delete_invoice(invoice_id: str, current_user: User = Depends(get_curre
     if current_user.role != "admin":
         raise HTTPException(status_code=403, detail="Only admins can delete invoices")
     
-    result = await db.invoices.delete_one({"id": invoice_id})
-    if result.deleted_count == 0:
+    deleted = await db.invoices.find_one_and_delete({"id": invoice_id}, projection={"_id": 0})
+    if deleted is None:
         raise HTTPException(status_code=404, detail="Invoice not found")
     
+    await update_rollups(removed=[deleted])
+    await asyncio.to_thread(discard_pdfs, "invoices", invoice_id)
     return {"message": "Invoice deleted successfully"}
 
 # Estimate Routes
@@ -839,84 +1921,94 @@ async def create_estimate(estimate_data: EstimateCreate, current_user: User = De
     )
     
     doc = estimate.model_dump()
-    doc["created_at"] = doc["created_at"].isoformat()
-    doc["issue_date"] = doc["issue_date"].isoformat()
-    if doc["valid_until"]:
-        doc["valid_until"] = doc["valid_until"].isoformat()
     
     await db.estimates.insert_one(doc)
     return estimate
 
 @api_router.get("/estimates", response_model=List[Estimate])
-async def get_estimates(current_user: User = Depends(get_current_user)):
-    estimates = await db.estimates.find({}, {"_id": 0}).sort("estimate_number", -1).to_list(1000)
-    
-    for estimate in estimates:
-        if isinstance(estimate['created_at'], str):
-            estimate['created_at'] = datetime.fromisoformat(estimate['created_at'])
-        if isinstance(estimate['issue_date'], str):
-            estimate['issue_date'] = datetime.fromisoformat(estimate['issue_date'])
-        if estimate.get('valid_until') and isinstance(estimate['valid_until'], str):
-            estimate['valid_until'] = datetime.fromisoformat(estimate['valid_until'])
+async def get_estimates(
+    response: Response,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    fields: Optional[str] = None,
+    q: Optional[str] = Query(None, max_length=100),
+    current_user: TokenUser = Depends(get_read_user)
+):
+    sort_keys = [("seq", -1), ("estimate_number", -1)]
+    names = resolve_fields(Estimate, fields, LIST_VIEWS["estimates"])
+    estimates, next_cursor = await paginate(db.estimates, sort_keys, limit, cursor, query=list_query("estimates", q), projection=field_projection(names, sort_keys))
+    if names:
+        return sparse_response(Estimate, names, estimates, next_cursor)
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
     
     return estimates
 
 @api_router.get("/estimates/{estimate_id}", response_model=Estimate)
-async def get_estimate(estimate_id: str, current_user: User = Depends(get_current_user)):
+async def get_estimate(estimate_id: str, current_user: TokenUser = Depends(get_read_user)):
     estimate = await db.estimates.find_one({"id": estimate_id}, {"_id": 0})
     if not estimate:
         raise HTTPException(status_code=404, detail="Estimate not found")
     
-    if isinstance(estimate['created_at'], str):
-        estimate['created_at'] = datetime.fromisoformat(estimate['created_at'])
-    if isinstance(estimate['issue_date'], str):
-        estimate['issue_date'] = datetime.fromisoformat(estimate['issue_date'])
-    if estimate.get('valid_until') and isinstance(estimate['valid_until'], str):
-        estimate['valid_until'] = datetime.fromisoformat(estimate['valid_until'])
-    
     return Estimate(**estimate)
 
 @api_router.post("/estimates/{estimate_id}/convert", response_model=Invoice)
 async def convert_estimate_to_invoice(estimate_id: str, current_user: User = Depends(get_current_user)):
-    # Get estimate
-    estimate = await db.estimates.find_one({"id": estimate_id}, {"_id": 0})
-    if not estimate:
-        raise HTTPException(status_code=404, detail="Estimate not found")
-    
-    if estimate["status"] == "converted":
-        raise HTTPException(status_code=400, detail="Estimate already converted")
-    
-    # Create invoice from estimate
-    invoice_number = await get_next_invoice_number()
-    
-    invoice = Invoice(
-        invoice_number=invoice_number,
-        customer_id=estimate["customer_id"],
-        customer_name=estimate["customer_name"],
-        customer_address=estimate["customer_address"],
-        customer_phone=estimate["customer_phone"],
-        customer_email=estimate.get("customer_email"),
-        items=[InvoiceItem(**item) for item in estimate["items"]],
-        subtotal=estimate["subtotal"],
-        vat_rate=estimate["vat_rate"],
-        vat_amount=estimate["vat_amount"],
-        total=estimate["total"],
-        issue_date=datetime.now(timezone.utc),
-        notes=estimate.get("notes"),
-        created_by=current_user.id
+    # Claim the estimate first: of any concurrent conversions only one sees it unconverted.
+    # converting_at stays set until the invoice is written.
+    estimate = await db.estimates.find_one_and_update(
+        {"id": estimate_id, "status": {"$ne": "converted"}},
+        {"$set": {"status": "converted", "converting_at": datetime.now(timezone.utc)}},
+        projection={"_id": 0},
+        return_document=ReturnDocument.BEFORE
     )
+    if estimate is None:
+        estimate = await db.estimates.find_one({"id": estimate_id}, {"_id": 0})
+        if not estimate:
+            raise HTTPException(status_code=404, detail="Estimate not found")
+        # Finish a conversion that stopped before writing its invoice
+        interrupted = estimate.get("converting_at") and not await db.invoices.find_one({"estimate_id": estimate_id}, {"_id": 1})
+        if not interrupted:
+            raise HTTPException(status_code=400, detail="Estimate already converted")
     
-    doc = invoice.model_dump()
-    doc["created_at"] = doc["created_at"].isoformat()
-    doc["issue_date"] = doc["issue_date"].isoformat()
-    if doc.get("due_date"):
-        doc["due_date"] = doc["due_date"].isoformat()
-    
-    await db.invoices.insert_one(doc)
-    
-    # Update estimate status
-    await db.estimates.update_one({"id": estimate_id}, {"$set": {"status": "converted"}})
-    
+    try:
+        invoice_number = await get_next_invoice_number()
+        
+        invoice = Invoice(
+            invoice_number=invoice_number,
+            customer_id=estimate["customer_id"],
+            customer_name=estimate["customer_name"],
+            customer_address=estimate["customer_address"],
+            customer_phone=estimate["customer_phone"],
+            customer_email=estimate.get("customer_email"),
+            items=[InvoiceItem(**item) for item in estimate["items"]],
+            subtotal=estimate["subtotal"],
+            vat_rate=estimate["vat_rate"],
+            vat_amount=estimate["vat_amount"],
+            total=estimate["total"],
+            issue_date=datetime.now(timezone.utc),
+            notes=estimate.get("notes"),
+            estimate_id=estimate_id,
+            created_by=current_user.id
+        )
+        
+        doc = invoice.model_dump()
+        
+        # The unique estimate_id index stops two recoveries both inserting
+        await db.invoices.insert_one(doc)
+    except Exception as e:
+        # A duplicate estimate_id means another recovery wrote the invoice; keep its claim
+        if isinstance(e, DuplicateKeyError) and "estimate_id" in (e.details or {}).get("keyPattern", {}):
+            raise HTTPException(status_code=400, detail="Estimate already converted")
+        # Any other failure, including other duplicate keys, releases our claim
+        if estimate["status"] != "converted":
+            await db.estimates.update_one(
+                {"id": estimate_id}, {"$set": {"status": estimate["status"]}, "$unset": {"converting_at": ""}}
+            )
+        raise
+    
+    await db.estimates.update_one({"id": estimate_id}, {"$unset": {"converting_at": ""}})
+    await update_rollups(added=[doc])
     return invoice
 
 @api_router.delete("/estimates/{estimate_id}")
@@ -928,6 +2020,7 @@ async def delete_estimate(estimate_id: str, current_user: User = Depends(get_cur
     if result.deleted_count == 0:
         raise HTTPException(status_code=404, detail="Estimate not found")
     
+    await asyncio.to_thread(discard_pdfs, "estimates", estimate_id)
     return {"message": "Estimate deleted successfully"}
 
 # Gas Safety Certificate Routes
@@ -935,50 +2028,85 @@ async def delete_estimate(estimate_id: str, current_user: User = Depends(get_cur
 async def create_certificate(cert_data: CertificateCreate, current_user: User = Depends(get_current_user)):
     certificate_number = await get_next_certificate_number(cert_data.certificate_type)
     
-    certificate = GasSafetyCertificate(
-        certificate_type=cert_data.certificate_type,
+    certificate_model = CERTIFICATE_MODELS[cert_data.certificate_type]
+    certificate = certificate_model(
+        **cert_data.model_dump(),
         certificate_number=certificate_number,
-        **cert_data.model_dump(exclude={'certificate_type'}),
         created_by=current_user.id
     )
     
-    doc = certificate.model_dump()
-    doc["created_at"] = doc["created_at"].isoformat()
-    doc["inspection_date"] = doc["inspection_date"].isoformat()
-    if doc.get("next_inspection_due"):
-        doc["next_inspection_due"] = doc["next_inspection_due"].isoformat()
+    for field in SIGNATURE_FIELDS:
+        if field in certificate_model.model_fields:
+            setattr(certificate, field, await externalize_data_url(getattr(certificate, field)))
+    
+    # Only the fields that were filled in are stored
+    doc = certificate.model_dump(exclude_none=True)
     
     await db.certificates.insert_one(doc)
     return certificate
 
 @api_router.get("/certificates", response_model=List[GasSafetyCertificate])
-async def get_certificates(current_user: User = Depends(get_current_user)):
-    certificates = await db.certificates.find({}, {"_id": 0}).sort("certificate_number", -1).to_list(1000)
+async def get_certificates(
+    response: Response,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    fields: Optional[str] = None,
+    q: Optional[str] = Query(None, max_length=100),
+    certificate_type: Optional[str] = None,
+    current_user: TokenUser = Depends(get_read_user)
+):
+    # Grouped by type as before: each type is numbered on its own counter
+    sort_keys = [("certificate_type", -1), ("seq", -1), ("certificate_number", -1)]
+    names = resolve_fields(LegacyCertificate, fields, LIST_VIEWS["certificates"])
+    certificates, next_cursor = await paginate(db.certificates, sort_keys, limit, cursor, query=list_query("certificates", q, certificate_type=certificate_type), projection=field_projection(names, sort_keys))
+    if names:
+        return sparse_response(LegacyCertificate, names, certificates, next_cursor)
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
     
-    for cert in certificates:
-        if isinstance(cert['created_at'], str):
-            cert['created_at'] = datetime.fromisoformat(cert['created_at'])
-        if isinstance(cert['inspection_date'], str):
-            cert['inspection_date'] = datetime.fromisoformat(cert['inspection_date'])
-        if isinstance(cert['next_inspection_due'], str):
-            cert['next_inspection_due'] = datetime.fromisoformat(cert['next_inspection_due'])
+    return certificates
+
+def due_query(within_days: int, include_overdue: bool = False) -> dict:
+    now = datetime.now(timezone.utc)
+    bounds = {"$lte": now + timedelta(days=within_days)}
+    if not include_overdue:
+        bounds["$gte"] = now
+    return {"next_inspection_due": bounds}
+
+@api_router.get("/certificates/due", response_model=List[GasSafetyCertificate])
+async def get_due_certificates(
+    response: Response,
+    within_days: int = Query(REMINDER_LEAD_DAYS, ge=0, le=366),
+    include_overdue: bool = False,
+    certificate_type: Optional[str] = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    fields: Optional[str] = None,
+    current_user: TokenUser = Depends(get_read_user)
+):
+    """Certificates whose next inspection falls within the window, soonest first."""
+    query = due_query(within_days, include_overdue)
+    if certificate_type:
+        query["certificate_type"] = certificate_type
+    sort_keys = [("next_inspection_due", 1), ("id", 1)]
+    names = resolve_fields(LegacyCertificate, fields, LIST_VIEWS["certificates"])
+    certificates, next_cursor = await paginate(
+        db.certificates, sort_keys, limit, cursor, query=query, projection=field_projection(names, sort_keys)
+    )
+    if names:
+        return sparse_response(LegacyCertificate, names, certificates, next_cursor)
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
     
     return certificates
 
 @api_router.get("/certificates/{certificate_id}", response_model=GasSafetyCertificate)
-async def get_certificate(certificate_id: str, current_user: User = Depends(get_current_user)):
+async def get_certificate(certificate_id: str, current_user: TokenUser = Depends(get_read_user)):
     certificate = await db.certificates.find_one({"id": certificate_id}, {"_id": 0})
     if not certificate:
         raise HTTPException(status_code=404, detail="Certificate not found")
     
-    if isinstance(certificate['created_at'], str):
-        certificate['created_at'] = datetime.fromisoformat(certificate['created_at'])
-    if isinstance(certificate['inspection_date'], str):
-        certificate['inspection_date'] = datetime.fromisoformat(certificate['inspection_date'])
-    if isinstance(certificate['next_inspection_due'], str):
-        certificate['next_inspection_due'] = datetime.fromisoformat(certificate['next_inspection_due'])
-    
-    return GasSafetyCertificate(**certificate)
+    return certificate_adapter.validate_python(certificate)
 
 @api_router.put("/certificates/{certificate_id}", response_model=GasSafetyCertificate)
 async def update_certificate(certificate_id: str, cert_data: CertificateCreate, current_user: User = Depends(get_current_user)):
@@ -986,54 +2114,82 @@ async def update_certificate(certificate_id: str, cert_data: CertificateCreate,
     if not certificate:
         raise HTTPException(status_code=404, detail="Certificate not found")
     
-    update_data = cert_data.model_dump(exclude_unset=True)
-    update_data["inspection_date"] = cert_data.inspection_date.isoformat()
-    if cert_data.next_inspection_due:
-        update_data["next_inspection_due"] = cert_data.next_inspection_due.isoformat()
-    
-    if cert_data.appliances:
-        update_data["appliances"] = [app.model_dump() for app in cert_data.appliances]
+    # PUT replaces the certificate's fields: any the body leaves out or sets to
+    # null are removed rather than kept from before or stored as nulls
+    update_data = cert_data.model_dump(exclude_none=True)
+    cleared = {field: "" for field in type(cert_data).model_fields if field not in update_data}
+    if update_data["certificate_type"] != certificate.get("certificate_type"):
+        # Fields only the old type has would otherwise linger in the document
+        model_fields = CERTIFICATE_MODELS[update_data["certificate_type"]].model_fields
+        cleared.update({field: "" for field in certificate if field != "_id" and field not in model_fields})
+    
+    for field in SIGNATURE_FIELDS:
+        if update_data.get(field):
+            update_data[field] = await externalize_data_url(update_data[field])
+    
+    update = {"$set": update_data}
+    if cleared:
+        update["$unset"] = cleared
+    previous = await db.certificates.find_one_and_update(
+        {"id": certificate_id}, update, projection={field: 1 for field in SIGNATURE_FIELDS}
+    )
     
-    await db.certificates.update_one({"id": certificate_id}, {"$set": update_data})
+    # Signatures that were replaced or cleared leave their GridFS files behind
+    for field in SIGNATURE_FIELDS:
+        if previous and (field in update_data or field in cleared) and previous.get(field) != update_data.get(field):
+            await delete_asset(previous.get(field))
     
     updated_cert = await db.certificates.find_one({"id": certificate_id}, {"_id": 0})
-    if isinstance(updated_cert['created_at'], str):
-        updated_cert['created_at'] = datetime.fromisoformat(updated_cert['created_at'])
-    if isinstance(updated_cert['inspection_date'], str):
-        updated_cert['inspection_date'] = datetime.fromisoformat(updated_cert['inspection_date'])
-    if updated_cert.get('next_inspection_due') and isinstance(updated_cert['next_inspection_due'], str):
-        updated_cert['next_inspection_due'] = datetime.fromisoformat(updated_cert['next_inspection_due'])
     
-    return GasSafetyCertificate(**updated_cert)
+    return certificate_adapter.validate_python(updated_cert)
 
 @api_router.delete("/certificates/{certificate_id}")
 async def delete_certificate(certificate_id: str, current_user: User = Depends(get_current_user)):
     if current_user.role != "admin":
         raise HTTPException(status_code=403, detail="Only admins can delete certificates")
     
-    result = await db.certificates.delete_one({"id": certificate_id})
-    if result.deleted_count == 0:
+    certificate = await db.certificates.find_one_and_delete(
+        {"id": certificate_id}, projection={field: 1 for field in SIGNATURE_FIELDS}
+    )
+    if not certificate:
         raise HTTPException(status_code=404, detail="Certificate not found")
     
+    for field in SIGNATURE_FIELDS:
+        await delete_asset(certificate.get(field))
+    await asyncio.to_thread(discard_pdfs, "certificates", certificate_id)
     return {"message": "Certificate deleted successfully"}
 
 # Company Settings Routes
-@api_router.get("/settings", response_model=CompanySettings)
-async def get_settings(current_user: User = Depends(get_current_user)):
+async def load_settings() -> CompanySettings:
+    cached_settings = settings_cache.get()
+    if cached_settings is not None:
+        return cached_settings
+    
     settings = await db.company_settings.find_one({"id": "company_settings"}, {"_id": 0})
     
     if not settings:
         # Create default settings
         default_settings = CompanySettings()
         doc = default_settings.model_dump()
-        doc["updated_at"] = doc["updated_at"].isoformat()
         await db.company_settings.insert_one(doc)
+        settings_cache.set(default_settings)
         return default_settings
     
-    if isinstance(settings['updated_at'], str):
-        settings['updated_at'] = datetime.fromisoformat(settings['updated_at'])
+    settings_obj = CompanySettings(**settings)
+    settings_cache.set(settings_obj)
+    return settings_obj
+
+@api_router.get("/settings", response_model=CompanySettings)
+async def get_settings(request: Request, response: Response, current_user: TokenUser = Depends(get_read_user)):
+    settings = await load_settings()
     
-    return CompanySettings(**settings)
+    # Authenticated response: cacheable by the browser only, and always revalidated
+    headers = {"ETag": settings_cache.etag, "Cache-Control": "private, no-cache"}
+    if etag_matches(request, settings_cache.etag):
+        return Response(status_code=304, headers=headers)
+    
+    response.headers.update(headers)
+    return settings
 
 @api_router.put("/settings", response_model=CompanySettings)
 async def update_settings(settings_data: CompanySettingsUpdate, current_user: User = Depends(get_current_user)):
@@ -1041,17 +2197,16 @@ async def update_settings(settings_data: CompanySettingsUpdate, current_user: Us
         raise HTTPException(status_code=403, detail="Only admins can update settings")
     
     update_data = settings_data.model_dump(exclude_unset=True)
-    update_data["updated_at"] = datetime.now(timezone.utc).isoformat()
+    update_data["updated_at"] = datetime.now(timezone.utc)
     
     await db.company_settings.update_one(
         {"id": "company_settings"},
         {"$set": update_data},
         upsert=True
     )
+    settings_cache.invalidate()
     
     settings = await db.company_settings.find_one({"id": "company_settings"}, {"_id": 0})
-    if isinstance(settings['updated_at'], str):
-        settings['updated_at'] = datetime.fromisoformat(settings['updated_at'])
     
     return CompanySettings(**settings)
 
@@ -1060,31 +2215,1249 @@ async def upload_logo(file: UploadFile = File(...), current_user: User = Depends
     if current_user.role != "admin":
         raise HTTPException(status_code=403, detail="Only admins can upload logo")
     
-    # Read file and encode to base64
+    # Store the file in GridFS; settings only keep its URL
     contents = await file.read()
-    base64_encoded = base64.b64encode(contents).decode('utf-8')
-    logo_data = f"data:{file.content_type};base64,{base64_encoded}"
+    logo_url = await store_asset(contents, file.content_type or "application/octet-stream", file.filename or "", public=True)
     
     # Update settings
-    await db.company_settings.update_one(
+    previous = await db.company_settings.find_one_and_update(
         {"id": "company_settings"},
-        {"$set": {"logo": logo_data, "updated_at": datetime.now(timezone.utc).isoformat()}},
+        {"$set": {"logo": logo_url, "updated_at": datetime.now(timezone.utc)}},
         upsert=True
     )
+    settings_cache.invalidate()
+    if previous:
+        await delete_asset(previous.get("logo"))
+    
+    return {"message": "Logo uploaded successfully", "logo": logo_url}
+
+# Asset Routes
+# Served without auth so <img src> can load them; ids are random UUIDs
+@api_router.get("/assets/{asset_id}")
+async def get_asset(asset_id: str, request: Request):
+    try:
+        grid_out = await assets_bucket().open_download_stream(asset_id)
+    except NoFile:
+        raise HTTPException(status_code=404, detail="Asset not found")
+    
+    metadata = grid_out.metadata or {}
+    etag = f'"{metadata.get("sha256", asset_id)}"'
+    # An asset id is never reused for different content; signatures must not
+    # be kept by shared caches, so only public assets are marked public
+    scope = "public" if metadata.get("public") else "private"
+    headers = {"ETag": etag, "Cache-Control": f"{scope}, max-age=31536000, immutable"}
+    if etag_matches(request, etag):
+        return Response(status_code=304, headers=headers)
+    
+    async def stream_chunks():
+        while True:
+            chunk = await grid_out.readchunk()
+            if not chunk:
+                break
+            yield chunk
+    
+    headers["Content-Length"] = str(grid_out.length)
+    return StreamingResponse(
+        stream_chunks(),
+        media_type=metadata.get("content_type", "application/octet-stream"),
+        headers=headers
+    )
+
+# PDF Routes
+# collection -> validator for the stored document
+PDF_DOCUMENTS = {
+    "invoices": TypeAdapter(Invoice),
+    "estimates": TypeAdapter(Estimate),
+    "certificates": certificate_adapter,
+}
+pdf_renders_in_flight = {}
+
+def pdf_cache_key(doc: dict, settings_etag: str) -> str:
+    """Identify a rendering of one version of a document under one version of the settings."""
+    content_hash = hashlib.sha256(json_util.dumps(doc, sort_keys=True).encode()).hexdigest()
+    settings_version = settings_etag.strip('"')
+    return f"{doc['id']}.{content_hash[:16]}.{settings_version[:16]}"
+
+def write_pdf(path: Path, data: bytes):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    partial = path.with_suffix(f".{uuid.uuid4().hex}.tmp")
+    partial.write_bytes(data)
+    partial.replace(path)
+    # Older renderings of the same document are never served again
+    doc_id = path.name.split(".")[0]
+    for stale in path.parent.glob(f"{doc_id}.*.pdf"):
+        if stale != path:
+            stale.unlink(missing_ok=True)
+
+def discard_pdfs(collection: str, doc_id: str):
+    for cached in (PDF_CACHE_DIR / collection).glob(f"{doc_id}.*.pdf"):
+        cached.unlink(missing_ok=True)
+
+async def render_pdf_file(collection: str, doc: dict, settings: CompanySettings, key: str) -> Path:
+    validated = PDF_DOCUMENTS[collection].validate_python(doc)
+    data = PDF_DOCUMENTS[collection].dump_python(validated)
+    images = {"logo": await read_asset(settings.logo)}
+    for field in SIGNATURE_FIELDS:
+        images[field] = await read_asset(data.get(field))
+    
+    loop = asyncio.get_running_loop()
+    pdf = await loop.run_in_executor(pdf_executor, render_document, collection, data, settings.model_dump(), images)
+    path = PDF_CACHE_DIR / collection / f"{key}.pdf"
+    await asyncio.to_thread(write_pdf, path, pdf)
+    return path
+
+async def get_pdf_file(collection: str, doc: dict, settings: CompanySettings, key: str) -> Path:
+    """Return the cached PDF for this key, rendering it once however many requests ask."""
+    path = PDF_CACHE_DIR / collection / f"{key}.pdf"
+    if path.exists():
+        return path
+    
+    render = pdf_renders_in_flight.get(key)
+    if render is None:
+        render = asyncio.ensure_future(render_pdf_file(collection, doc, settings, key))
+        pdf_renders_in_flight[key] = render
+        render.add_done_callback(lambda _: pdf_renders_in_flight.pop(key, None))
+    return await asyncio.shield(render)
+
+@api_router.get("/{collection}/{document_id}/pdf")
+async def get_document_pdf(
+    collection: str,
+    document_id: str,
+    request: Request,
+    current_user: TokenUser = Depends(get_read_user)
+):
+    if collection not in PDF_DOCUMENTS:
+        raise HTTPException(status_code=404, detail="Not Found")
+    
+    doc = await db[collection].find_one({"id": document_id}, {"_id": 0})
+    if not doc:
+        raise HTTPException(status_code=404, detail="Document not found")
+    
+    settings = await load_settings()
+    key = pdf_cache_key(doc, settings_cache.etag)
+    etag = f'"{key}"'
+    number = doc.get("invoice_number") or doc.get("estimate_number") or doc.get("certificate_number")
+    headers = {
+        "ETag": etag,
+        "Cache-Control": "private, no-cache",
+        "Content-Disposition": f'inline; filename="{number}.pdf"'
+    }
+    if etag_matches(request, etag):
+        return Response(status_code=304, headers=headers)
+    
+    path = await get_pdf_file(collection, doc, settings, key)
+    return FileResponse(path, media_type="application/pdf", headers=headers)
+
+# Export Routes
+# collection -> (model, sort key, date field used for date_from/date_to, has status)
+EXPORTS = {
+    "invoices": (Invoice, "invoice_number", "issue_date", True),
+    "estimates": (Estimate, "estimate_number", "issue_date", True),
+    "certificates": (LegacyCertificate, "certificate_number", "inspection_date", False),
+}
+
+def date_range_query(field: str, date_from: Optional[datetime], date_to: Optional[datetime]) -> dict:
+    if not date_from and not date_to:
+        return {}
+    bounds = {}
+    if date_from:
+        bounds["$gte"] = date_from
+    if date_to:
+        bounds["$lte"] = date_to
+    return {field: bounds}
+
+def export_default(value):
+    return value.isoformat() if isinstance(value, datetime) else str(value)
+
+def export_value(value):
+    if isinstance(value, (list, dict)):
+        return json.dumps(value, default=export_default)
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
+async def export_batches(cursor):
+    batch = []
+    async for doc in cursor:
+        batch.append(doc)
+        if len(batch) >= EXPORT_BATCH_SIZE:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+async def stream_ndjson(cursor):
+    async for batch in export_batches(cursor):
+        yield "".join(json.dumps(doc, default=export_default) + "\n" for doc in batch)
+
+async def stream_csv(cursor, columns: List[str]):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(columns)
+    async for batch in export_batches(cursor):
+        for doc in batch:
+            writer.writerow([export_value(doc.get(column)) for column in columns])
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue()
+
+@api_router.get("/export/{collection}")
+async def export_collection(
+    collection: str,
+    format: str = "csv",
+    date_from: Optional[datetime] = None,
+    date_to: Optional[datetime] = None,
+    status: Optional[str] = None,
+    current_user: TokenUser = Depends(get_read_user)
+):
+    if collection not in EXPORTS:
+        raise HTTPException(status_code=404, detail="Unknown export collection")
+    if format not in ["csv", "ndjson"]:
+        raise HTTPException(status_code=400, detail="Invalid format")
+    
+    model, sort_key, date_field, has_status = EXPORTS[collection]
+    query = date_range_query(date_field, date_from, date_to)
+    if status:
+        if not has_status:
+            raise HTTPException(status_code=400, detail=f"{collection} cannot be filtered by status")
+        query["status"] = status
+    
+    cursor = db[collection].find(query, {"_id": 0}).sort(sort_key, 1).batch_size(EXPORT_BATCH_SIZE)
+    headers = {"Content-Disposition": f'attachment; filename="{collection}.{format}"'}
+    
+    if format == "ndjson":
+        return StreamingResponse(stream_ndjson(cursor), media_type="application/x-ndjson", headers=headers)
+    return StreamingResponse(stream_csv(cursor, list(model.model_fields)), media_type="text/csv", headers=headers)
+
+# Import Routes
+# CSV cells holding JSON (as written by /export)
+IMPORT_JSON_COLUMNS = {"items"}
+# A quoted CSV value may span lines, but a stray quote would otherwise swallow
+# the rest of the file into one record
+IMPORT_MAX_RECORD_LINES = 100
+
+async def import_lines(request: Request):
+    """Yield decoded lines from the streamed request body."""
+    decoder = codecs.getincrementaldecoder("utf-8-sig")(errors="replace")
+    pending = ""
+    async for chunk in request.stream():
+        pending += decoder.decode(chunk)
+        lines = pending.split("\n")
+        pending = lines.pop()
+        for line in lines:
+            yield line.rstrip("\r")
+    if pending:
+        yield pending.rstrip("\r")
+
+async def import_rows(request: Request, format: str):
+    """Yield (row number, parsed row or error message) from an NDJSON or CSV body."""
+    row_number = 0
+    if format == "ndjson":
+        async for line in import_lines(request):
+            if not line.strip():
+                continue
+            row_number += 1
+            try:
+                row = json.loads(line)
+            except ValueError as e:
+                yield row_number, f"Invalid JSON: {e}"
+                continue
+            yield row_number, row if isinstance(row, dict) else "Row is not a JSON object"
+        return
+    
+    header = None
+    record = ""
+    record_lines = 0
+    async for line in import_lines(request):
+        # A quoted value may span lines; a record is complete once its quotes balance
+        record = f"{record}\n{line}" if record else line
+        record_lines += 1
+        if record.count('"') % 2:
+            if record_lines < IMPORT_MAX_RECORD_LINES:
+                continue
+            if header is None:
+                raise HTTPException(status_code=400, detail="Malformed CSV header: unbalanced quotes")
+            # Drop the record and carry on from the next line
+            record = ""
+            record_lines = 0
+            row_number += 1
+            yield row_number, f"Malformed row: unbalanced quotes over {IMPORT_MAX_RECORD_LINES} lines"
+            continue
+        values = next(csv.reader([record]), [])
+        record = ""
+        record_lines = 0
+        if header is None:
+            header = values
+            continue
+        if not any(values):
+            continue
+        row_number += 1
+        row = {}
+        for column, value in zip(header, values):
+            if value == "":
+                continue
+            if column in IMPORT_JSON_COLUMNS:
+                try:
+                    value = json.loads(value)
+                except ValueError:
+                    pass
+            row[column] = value
+        yield row_number, row
+    
+    if record:
+        if header is None:
+            raise HTTPException(status_code=400, detail="Malformed CSV header: unbalanced quotes")
+        row_number += 1
+        yield row_number, "Malformed row: unterminated quoted value at end of file"
+
+async def build_customer_docs(rows: list, current_user: User, errors: list) -> list:
+    last = await allocate_numbers("customer", len(rows))
+    first = last - len(rows) + 1
+    docs = []
+    for offset, (row_number, customer_data) in enumerate(rows):
+        customer = Customer(customer_number=f"C{str(first + offset).zfill(5)}", **customer_data.model_dump())
+        doc = customer.model_dump()
+        docs.append((row_number, doc))
+    return docs
+
+async def build_service_docs(rows: list, current_user: User, errors: list) -> list:
+    docs = []
+    for row_number, service_data in rows:
+        doc = Service(**service_data.model_dump()).model_dump()
+        docs.append((row_number, doc))
+    return docs
+
+async def build_invoice_docs(rows: list, current_user: User, errors: list) -> list:
+    customer_ids = list({invoice_data.customer_id for _, invoice_data in rows})
+    customers = {
+        customer["id"]: customer
+        async for customer in db.customers.find({"id": {"$in": customer_ids}}, {"_id": 0})
+    }
+    
+    valid = []
+    for row_number, invoice_data in rows:
+        if invoice_data.status not in ["paid", "unpaid"]:
+            errors.append({"row": row_number, "error": "Invalid status"})
+        elif invoice_data.customer_id not in customers:
+            errors.append({"row": row_number, "error": "Customer not found"})
+        else:
+            valid.append((row_number, invoice_data))
+    if not valid:
+        return []
+    
+    last = await allocate_numbers("invoice", len(valid))
+    first = last - len(valid) + 1
+    docs = []
+    for offset, (row_number, invoice_data) in enumerate(valid):
+        invoice = build_invoice(
+            invoice_data,
+            customers[invoice_data.customer_id],
+            f"INV{str(first + offset).zfill(5)}",
+            current_user.id,
+            status=invoice_data.status
+        )
+        docs.append((row_number, invoice_to_doc(invoice)))
+    return docs
+
+# collection -> (row model, builder turning validated rows into documents)
+IMPORTS = {
+    "customers": (CustomerCreate, build_customer_docs),
+    "services": (ServiceCreate, build_service_docs),
+    "invoices": (InvoiceImport, build_invoice_docs),
+}
+
+async def import_batch(collection: str, batch: list, current_user: User, errors: list) -> int:
+    model, build_docs = IMPORTS[collection]
+    
+    rows = []
+    for row_number, row in batch:
+        if isinstance(row, str):
+            errors.append({"row": row_number, "error": row})
+            continue
+        try:
+            rows.append((row_number, model(**row)))
+        except ValidationError as e:
+            errors.append({"row": row_number, "error": "; ".join(
+                f"{'.'.join(str(part) for part in err['loc'])}: {err['msg']}" for err in e.errors()
+            )})
+    if not rows:
+        return 0
+    
+    docs = await build_docs(rows, current_user, errors)
+    if not docs:
+        return 0
+    
+    failed = set()
+    try:
+        await db[collection].insert_many([doc for _, doc in docs], ordered=False)
+    except BulkWriteError as e:
+        for write_error in e.details.get("writeErrors", []):
+            failed.add(write_error["index"])
+            errors.append({"row": docs[write_error["index"]][0], "error": write_error["errmsg"]})
+    
+    inserted = [doc for i, (_, doc) in enumerate(docs) if i not in failed]
+    if collection == "invoices":
+        await update_rollups(added=inserted)
+    return len(inserted)
+
+@api_router.post("/import/{collection}")
+async def import_collection(
+    collection: str,
+    request: Request,
+    format: str = "csv",
+    current_user: User = Depends(get_current_user)
+):
+    if current_user.role != "admin":
+        raise HTTPException(status_code=403, detail="Only admins can import data")
+    if collection not in IMPORTS:
+        raise HTTPException(status_code=404, detail="Unknown import collection")
+    if format not in ["csv", "ndjson"]:
+        raise HTTPException(status_code=400, detail="Invalid format")
+    
+    errors = []
+    inserted = 0
+    rows = 0
+    batch = []
+    async for row in import_rows(request, format):
+        rows += 1
+        batch.append(row)
+        if len(batch) >= IMPORT_BATCH_SIZE:
+            inserted += await import_batch(collection, batch, current_user, errors)
+            batch = []
+    if batch:
+        inserted += await import_batch(collection, batch, current_user, errors)
+    
+    if inserted and collection in SUGGEST_INDEXES:
+        SUGGEST_INDEXES[collection].invalidate()
+    
+    errors.sort(key=lambda error: error["row"])
+    return {"rows": rows, "inserted": inserted, "errors": errors}
+
+# Reminder Routes
+def next_reminder_run(now: datetime) -> datetime:
+    run_at = now.replace(hour=REMINDER_RUN_HOUR, minute=0, second=0, microsecond=0)
+    return run_at if run_at > now else run_at + timedelta(days=1)
+
+def reminder_from_certificate(certificate: dict) -> dict:
+    reminder = Reminder(
+        certificate_id=certificate["id"],
+        certificate_number=certificate["certificate_number"],
+        certificate_type=certificate["certificate_type"],
+        landlord_customer_name=certificate["landlord_customer_name"],
+        recipient=certificate.get("landlord_customer_email") or None,
+        inspection_address=certificate["inspection_address"],
+        due_date=certificate["next_inspection_due"],
+    )
+    if not reminder.recipient:
+        reminder.status = "skipped"
+    return reminder.model_dump()
+
+async def insert_reminders(reminders: List[dict]) -> int:
+    if not reminders:
+        return 0
+    try:
+        result = await db.reminders.insert_many(reminders, ordered=False)
+        return len(result.inserted_ids)
+    except BulkWriteError as e:
+        # Duplicates are certificates already queued for this due date
+        other_errors = [error for error in e.details["writeErrors"] if error["code"] != 11000]
+        if other_errors:
+            raise
+        return e.details["nInserted"]
+
+async def queue_reminders() -> int:
+    """Queue a reminder for every certificate due within the lead time, in batches."""
+    projection = {
+        "_id": 0, "id": 1, "certificate_number": 1, "certificate_type": 1, "landlord_customer_name": 1,
+        "landlord_customer_email": 1, "inspection_address": 1, "next_inspection_due": 1
+    }
+    cursor = db.certificates.find(due_query(REMINDER_LEAD_DAYS), projection).batch_size(REMINDER_BATCH_SIZE)
+    queued = 0
+    batch = []
+    async for certificate in cursor:
+        batch.append(reminder_from_certificate(certificate))
+        if len(batch) >= REMINDER_BATCH_SIZE:
+            queued += await insert_reminders(batch)
+            batch = []
+    queued += await insert_reminders(batch)
+    return queued
+
+def reminder_message(reminder: dict, settings: CompanySettings, sender: str) -> EmailMessage:
+    title = CERTIFICATE_TITLES.get(reminder["certificate_type"], "certificate")
+    message = EmailMessage()
+    message["From"] = sender
+    message["To"] = reminder["recipient"]
+    message["Subject"] = f"{title} due {reminder['due_date']:%d/%m/%Y} - {reminder['inspection_address']}"
+    message.set_content(
+        f"Dear {reminder['landlord_customer_name']},\n\n"
+        f"Our records show that the {title} ({reminder['certificate_number']}) for "
+        f"{reminder['inspection_address']} is due for renewal on {reminder['due_date']:%d/%m/%Y}.\n\n"
+        f"Please get in touch to book your inspection.\n\n"
+        f"{settings.company_name}\n{settings.phone}\n"
+    )
+    return message
+
+def deliver_reminders(messages: List[tuple]) -> tuple:
+    """Send (reminder id, message) pairs over one SMTP connection.
+
+    Returns (id, error) pairs for the messages the server answered, and the
+    connection error that stopped the batch, if any. Refusals are per
+    message; anything else (refused connection, timeout, disconnect) means
+    the rest of the batch was never tried.
+    """
+    results = []
+    try:
+        with smtplib.SMTP(SMTP_HOST, SMTP_PORT, timeout=30) as smtp:
+            for reminder_id, message in messages:
+                try:
+                    smtp.send_message(message)
+                    results.append((reminder_id, None))
+                except (smtplib.SMTPRecipientsRefused, smtplib.SMTPSenderRefused, smtplib.SMTPDataError) as e:
+                    results.append((reminder_id, str(e)))
+    except OSError as e:
+        # SMTPException is an OSError too
+        return results, str(e) or type(e).__name__
+    return results, None
+
+async def send_reminders() -> dict:
+    """Send the queued reminders a batch at a time.
+
+    Each batch is claimed first (status "sending" under this run's run_id),
+    so the scheduled run and POST /reminders/run never send the same
+    reminder twice. If the SMTP connection fails, the unsent part of the
+    batch goes back to the queue with the error and the run stops.
+    """
+    stats = {"sent": 0, "failed": 0, "error": None}
+    if not SMTP_HOST:
+        return stats
+    
+    settings = await load_settings()
+    sender = SMTP_FROM or settings.email
+    if not sender:
+        logger.warning("Reminders queued but not sent: set SMTP_FROM or the company email")
+        return stats
+    
+    run_id = str(uuid.uuid4())
+    unclaim = {"$unset": {"run_id": "", "claimed_at": ""}}
+    await db.reminders.update_many(
+        {"status": "sending", "claimed_at": {"$lt": datetime.now(timezone.utc) - timedelta(seconds=REMINDER_CLAIM_SECONDS)}},
+        {"$set": {"status": "queued"}, **unclaim}
+    )
+    
+    while True:
+        batch = await db.reminders.find({"status": "queued"}, {"_id": 0, "id": 1}).sort("due_date", 1).to_list(REMINDER_BATCH_SIZE)
+        if not batch:
+            return stats
+        await db.reminders.update_many(
+            {"id": {"$in": [reminder["id"] for reminder in batch]}, "status": "queued"},
+            {"$set": {"status": "sending", "run_id": run_id, "claimed_at": datetime.now(timezone.utc)}}
+        )
+        # Only what this run claimed; another run may have taken some first
+        reminders = await db.reminders.find({"run_id": run_id, "status": "sending"}, {"_id": 0}).sort("due_date", 1).to_list(None)
+        if not reminders:
+            continue
+        
+        messages = [(reminder["id"], reminder_message(reminder, settings, sender)) for reminder in reminders]
+        results, connection_error = await asyncio.to_thread(deliver_reminders, messages)
+        now = datetime.now(timezone.utc)
+        if results:
+            await db.reminders.bulk_write([
+                UpdateOne({"id": reminder_id, "run_id": run_id},
+                          {"$set": {"status": "sent", "sent_at": now}, "$unset": {"run_id": "", "claimed_at": "", "error": ""}} if error is None
+                          else {"$set": {"status": "failed", "error": error}, **unclaim})
+                for reminder_id, error in results
+            ], ordered=False)
+        for _, error in results:
+            stats["failed" if error else "sent"] += 1
+        
+        if connection_error:
+            await db.reminders.update_many(
+                {"run_id": run_id, "status": "sending"},
+                {"$set": {"status": "queued", "error": connection_error}, **unclaim}
+            )
+            logger.error(f"Reminder delivery stopped, {len(messages) - len(results)} left queued: {connection_error}")
+            stats["error"] = connection_error
+            return stats
+
+async def run_reminders() -> dict:
+    start = time.perf_counter()
+    queued = await queue_reminders()
+    queue_seconds = time.perf_counter() - start
+    stats = await send_reminders()
+    elapsed = time.perf_counter() - start
+    logger.info(f"Reminders: {queued} queued in {queue_seconds:.2f} s, {stats['sent']} sent, {stats['failed']} failed")
+    return {"queued": queued, **stats, "queue_seconds": queue_seconds, "elapsed_seconds": elapsed}
+
+async def reminder_scheduler():
+    """Run the reminder queue once a day; the scheduler document makes sure only one worker does."""
+    try:
+        await db.scheduler.update_one(
+            {"id": "reminders"},
+            {"$setOnInsert": {"next_run_at": next_reminder_run(datetime.now(timezone.utc))}},
+            upsert=True
+        )
+    except DuplicateKeyError:
+        pass  # another worker created it first
+    
+    while True:
+        try:
+            now = datetime.now(timezone.utc)
+            claimed = await db.scheduler.find_one_and_update(
+                {"id": "reminders", "next_run_at": {"$lte": now}},
+                {"$set": {"next_run_at": next_reminder_run(now), "last_run_at": now}}
+            )
+            if claimed:
+                result = await run_reminders()
+                await db.scheduler.update_one({"id": "reminders"}, {"$set": {"last_result": result}})
+        except Exception:
+            logger.exception("Reminder run failed")
+        await asyncio.sleep(REMINDER_POLL_SECONDS)
+
+@api_router.post("/reminders/run")
+async def run_reminders_now(current_user: User = Depends(get_current_user)):
+    if current_user.role != "admin":
+        raise HTTPException(status_code=403, detail="Only admins can run reminders")
+    
+    return await run_reminders()
+
+@api_router.get("/reminders", response_model=List[Reminder])
+async def get_reminders(
+    response: Response,
+    status: Optional[str] = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    current_user: TokenUser = Depends(get_read_user)
+):
+    query = {"status": status} if status else {}
+    sort_keys = [("due_date", 1), ("id", 1)]
+    reminders, next_cursor = await paginate(db.reminders, sort_keys, limit, cursor, query=query)
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
+    
+    return reminders
+
+# Job Routes
+# Batch jobs run as background tasks in whichever process holds their lease
+background_tasks = set()
+
+PDF_BATCH_SORT_KEYS = {
+    "invoices": "invoice_number",
+    "estimates": "estimate_number",
+    "certificates": "certificate_number",
+}
+PDF_BATCH_DATE_FIELDS = {
+    "invoices": "issue_date",
+    "estimates": "issue_date",
+    "certificates": "next_inspection_due",
+}
+
+def start_background_task(coro):
+    task = asyncio.create_task(coro)
+    background_tasks.add(task)
+    task.add_done_callback(background_tasks.discard)
+    return task
+
+def pdf_batch_query(collection: str, filters: PdfBatchCreate) -> dict:
+    query = date_range_query(PDF_BATCH_DATE_FIELDS[collection], filters.date_from, filters.date_to)
+    if collection == "invoices" and filters.invoice_status:
+        query["status"] = filters.invoice_status
+    if collection == "certificates" and filters.certificate_type:
+        query["certificate_type"] = filters.certificate_type
+    return query
+
+def lease_expired_query() -> dict:
+    return {"$or": [{"lease_until": None}, {"lease_until": {"$lt": datetime.now(timezone.utc)}}]}
+
+async def claim_job(job_id: str) -> Optional[dict]:
+    """Take the lease on an unfinished job, unless another task already holds it.
+
+    The claimed job carries a fresh lease_token; every later write by this
+    task is filtered on it, so a task that stalled past its lease cannot
+    overwrite the progress of the task that took the job over.
+    """
+    now = datetime.now(timezone.utc)
+    return await db.jobs.find_one_and_update(
+        {"id": job_id, "status": {"$in": ["queued", "running"]}, **lease_expired_query()},
+        {"$set": {
+            "status": "running",
+            "lease_token": str(uuid.uuid4()),
+            "lease_until": now + timedelta(seconds=JOB_LEASE_SECONDS),
+            "updated_at": now
+        }},
+        projection={"_id": 0},
+        return_document=ReturnDocument.AFTER
+    )
+
+async def render_job_document(job_id: str, collection: str, doc: dict, settings: CompanySettings, settings_etag: str) -> dict:
+    item = {
+        "job_id": job_id,
+        "collection": collection,
+        "document_id": doc["id"],
+        "filename": f"{collection}/{doc[PDF_BATCH_SORT_KEYS[collection]]}.pdf"
+    }
+    try:
+        key = pdf_cache_key(doc, settings_etag)
+        await get_pdf_file(collection, doc, settings, key)
+        item["key"] = key
+    except Exception as e:
+        logger.exception(f"PDF batch {job_id}: could not render {item['filename']}")
+        item["error"] = str(e)
+    return item
+
+async def run_pdf_batch(job_id: str):
+    """Render every matching document, recording progress after each batch.
+
+    Progress is a position (collection index + keyset cursor), so a job whose
+    process died is picked up where it left off once its lease expires.
+    """
+    job = await claim_job(job_id)
+    if not job:
+        return
+    filters = PdfBatchCreate(**job["filters"])
+    leased = {"id": job_id, "lease_token": job["lease_token"]}
+    
+    try:
+        start_index = job.get("collection_index", 0)
+        for index in range(start_index, len(filters.collections)):
+            collection = filters.collections[index]
+            sort_keys = [(PDF_BATCH_SORT_KEYS[collection], 1)]
+            cursor = job.get("cursor") if index == start_index else None
+            
+            while True:
+                docs, cursor = await paginate(db[collection], sort_keys, PDF_BATCH_SIZE, cursor, query=pdf_batch_query(collection, filters))
+                settings = await load_settings()
+                settings_etag = settings_cache.etag
+                items = await asyncio.gather(*[
+                    render_job_document(job_id, collection, doc, settings, settings_etag) for doc in docs
+                ])
+                if items:
+                    await db.pdf_job_items.bulk_write([
+                        ReplaceOne({"job_id": job_id, "filename": item["filename"]}, item, upsert=True) for item in items
+                    ], ordered=False)
+                
+                # Counted rather than incremented so a batch redone after a restart is not counted twice
+                completed = await db.pdf_job_items.count_documents({"job_id": job_id, "key": {"$exists": True}})
+                failed = await db.pdf_job_items.count_documents({"job_id": job_id, "error": {"$exists": True}})
+                now = datetime.now(timezone.utc)
+                renewed = await db.jobs.update_one(leased, {"$set": {
+                    "collection_index": index if cursor else index + 1,
+                    "cursor": cursor,
+                    "completed": completed,
+                    "failed": failed,
+                    "lease_until": now + timedelta(seconds=JOB_LEASE_SECONDS),
+                    "updated_at": now
+                }})
+                if not renewed.matched_count:
+                    logger.warning(f"PDF batch {job_id}: lease lost to another task, stopping")
+                    return
+                if not cursor:
+                    break
+        
+        now = datetime.now(timezone.utc)
+        finished = await db.jobs.update_one(leased, {"$set": {
+            "status": "completed", "lease_token": None, "lease_until": None, "updated_at": now, "finished_at": now
+        }, "$unset": {"active_user": ""}})
+    except Exception as e:
+        logger.exception(f"PDF batch {job_id} failed")
+        now = datetime.now(timezone.utc)
+        finished = await db.jobs.update_one(leased, {"$set": {
+            "status": "failed", "error": str(e), "lease_token": None, "lease_until": None, "updated_at": now, "finished_at": now
+        }, "$unset": {"active_user": ""}})
+    if not finished.matched_count:
+        logger.warning(f"PDF batch {job_id}: lease lost to another task before it finished")
+
+async def resume_jobs():
+    """Periodically restart unfinished jobs whose lease has lapsed (e.g. after a restart)."""
+    while True:
+        try:
+            query = {"status": {"$in": ["queued", "running"]}, **lease_expired_query()}
+            async for job in db.jobs.find(query, {"_id": 0, "id": 1}):
+                start_background_task(run_pdf_batch(job["id"]))
+        except Exception:
+            logger.exception("Could not check for unfinished jobs")
+        await asyncio.sleep(JOB_LEASE_SECONDS)
+
+@api_router.post("/jobs/pdf-batch", response_model=PdfBatchJob, status_code=202)
+async def create_pdf_batch(filters: PdfBatchCreate, current_user: User = Depends(get_current_user)):
+    if current_user.role != "admin":
+        raise HTTPException(status_code=403, detail="Only admins can create PDF batches")
+    if not filters.collections:
+        raise HTTPException(status_code=400, detail="No collections selected")
+    
+    total = 0
+    for collection in filters.collections:
+        total += await db[collection].count_documents(pdf_batch_query(collection, filters))
+    
+    job = PdfBatchJob(filters=filters, total=total, created_by=current_user.id)
+    try:
+        await db.jobs.insert_one({**job.model_dump(), "active_user": current_user.id})
+    except DuplicateKeyError:
+        raise HTTPException(status_code=409, detail="A PDF batch is already running for this user")
+    start_background_task(run_pdf_batch(job.id))
+    return job
+
+@api_router.get("/jobs/{job_id}", response_model=PdfBatchJob)
+async def get_job(job_id: str, current_user: TokenUser = Depends(get_read_user)):
+    job = await db.jobs.find_one({"id": job_id}, {"_id": 0})
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    
+    return job
+
+class ZipStream:
+    """Write-only sink for ZipFile; take() hands over what has been written so far."""
+
+    def __init__(self):
+        self.chunks = []
+
+    def write(self, data) -> int:
+        self.chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def take(self) -> bytes:
+        data = b"".join(self.chunks)
+        self.chunks = []
+        return data
+
+async def read_job_item(item: dict) -> Optional[bytes]:
+    path = PDF_CACHE_DIR / item["collection"] / f"{item['key']}.pdf"
+    try:
+        return await asyncio.to_thread(path.read_bytes)
+    except FileNotFoundError:
+        # The document or settings changed since the job ran; render the current version
+        doc = await db[item["collection"]].find_one({"id": item["document_id"]}, {"_id": 0})
+        if not doc:
+            return None
+        settings = await load_settings()
+        key = pdf_cache_key(doc, settings_cache.etag)
+        path = await get_pdf_file(item["collection"], doc, settings, key)
+        return await asyncio.to_thread(path.read_bytes)
+
+async def stream_job_archive(job_id: str):
+    # PDFs are already compressed, so entries are stored as-is
+    sink = ZipStream()
+    with zipfile.ZipFile(sink, "w", compression=zipfile.ZIP_STORED) as archive:
+        items = db.pdf_job_items.find({"job_id": job_id, "key": {"$exists": True}}, {"_id": 0}).sort("filename", 1)
+        async for item in items:
+            data = await read_job_item(item)
+            if data is None:
+                continue
+            archive.writestr(item["filename"], data)
+            yield sink.take()
+    yield sink.take()
+
+@api_router.get("/jobs/{job_id}/archive")
+async def get_job_archive(job_id: str, current_user: TokenUser = Depends(get_read_user)):
+    job = await db.jobs.find_one({"id": job_id}, {"_id": 0, "status": 1})
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    if job["status"] != "completed":
+        raise HTTPException(status_code=409, detail=f"Job is {job['status']}")
+    
+    headers = {"Content-Disposition": f'attachment; filename="pdf-batch-{job_id}.zip"'}
+    return StreamingResponse(stream_job_archive(job_id), media_type="application/zip", headers=headers)
+
+# Slow Query Routes
+# slow_query_listener queues commands over SLOW_QUERY_MS; they are explained
+# and logged here, off the request path
+async def ensure_slow_query_log():
+    if await db.list_collection_names(filter={"name": "perf_slow_queries"}):
+        return
+    try:
+        await db.create_collection("perf_slow_queries", capped=True, size=SLOW_QUERY_LOG_BYTES)
+    except (CollectionInvalid, OperationFailure):
+        pass  # created by another worker in the meantime
+
+def find_key(value, key: str):
+    """First value stored under key anywhere in a nested explain document."""
+    if isinstance(value, dict):
+        if key in value:
+            return value[key]
+        value = list(value.values())
+    if isinstance(value, list):
+        for item in value:
+            found = find_key(item, key)
+            if found is not None:
+                return found
+    return None
+
+def explain_summary(explain: dict) -> dict:
+    planner = find_key(explain, "queryPlanner") or {}
+    stats = find_key(explain, "executionStats") or {}
+    plan = planner.get("winningPlan", {})
+    plan = plan.get("queryPlan", plan)  # slot-based engine plans nest the classic tree
+    stages = []
+    while plan:
+        stages.append(f"{plan.get('stage')} {plan['indexName']}" if plan.get("indexName") else plan.get("stage"))
+        plan = plan.get("inputStage") or (plan.get("inputStages") or [None])[0]
+    # Only stage and index names: index bounds and the parsed query hold values
+    return {
+        "plan": " > ".join(str(stage) for stage in stages),
+        "returned": stats.get("nReturned"),
+        "keys_examined": stats.get("totalKeysExamined"),
+        "docs_examined": stats.get("totalDocsExamined"),
+        "execution_ms": stats.get("executionTimeMillis"),
+    }
+
+async def explain_command(entry: dict) -> dict:
+    target = explain_target(entry["command_name"], entry["command"])
+    try:
+        explain = await client[entry["database"]].command({"explain": target, "verbosity": "executionStats"})
+    except Exception as e:
+        # e.g. a pipeline ending in $out cannot run under executionStats
+        return {"error": str(e)}
+    return explain_summary(explain)
+
+async def record_slow_queries():
+    last_explained = {}  # shape id -> monotonic time
+    while True:
+        entry = await slow_query_listener.queue.get()
+        try:
+            shape = command_shape(entry["command_name"], entry["command"])
+            record = {
+                "shape_id": shape_id(entry["collection"], entry["command_name"], shape),
+                "collection": entry["collection"],
+                "command": entry["command_name"],
+                # Stored as JSON: the shape's operator keys are not valid field names
+                "shape": json.dumps(shape, default=str),
+                "duration_ms": entry["duration_ms"],
+                "at": datetime.now(timezone.utc),
+            }
+            now = time.monotonic()
+            if now - last_explained.get(record["shape_id"], -SLOW_QUERY_EXPLAIN_INTERVAL_SECONDS) >= SLOW_QUERY_EXPLAIN_INTERVAL_SECONDS:
+                last_explained[record["shape_id"]] = now
+                record["explain"] = await explain_command(entry)
+            await db.perf_slow_queries.insert_one(record)
+        except Exception:
+            logger.exception("Could not log slow query")
+
+@api_router.get("/perf/slow-queries", response_model=List[SlowQueryShape])
+async def get_slow_queries(
+    collection: Optional[str] = None,
+    limit: int = Query(20, ge=1, le=100),
+    current_user: User = Depends(get_current_user)
+):
+    if current_user.role != "admin":
+        raise HTTPException(status_code=403, detail="Only admins can view slow queries")
+    
+    # Worst offenders by total time spent, across the retained log
+    pipeline = [
+        {"$match": {"collection": collection} if collection else {}},
+        {"$group": {
+            "_id": "$shape_id",
+            "collection": {"$first": "$collection"},
+            "command": {"$first": "$command"},
+            "shape": {"$first": "$shape"},
+            "count": {"$sum": 1},
+            "total_ms": {"$sum": "$duration_ms"},
+            "max_ms": {"$max": "$duration_ms"},
+            "last_seen": {"$max": "$at"},
+        }},
+        {"$sort": {"total_ms": -1}},
+        {"$limit": limit},
+    ]
+    groups = await db.perf_slow_queries.aggregate(pipeline).to_list(limit)
+    
+    explains = {}
+    explained = db.perf_slow_queries.find(
+        {"shape_id": {"$in": [group["_id"] for group in groups]}, "explain": {"$exists": True}},
+        {"_id": 0, "shape_id": 1, "explain": 1},
+        sort=[("at", -1)]
+    )
+    async for record in explained:
+        explains.setdefault(record["shape_id"], record["explain"])
+    
+    return [
+        SlowQueryShape(
+            shape_id=group["_id"],
+            collection=group["collection"],
+            command=group["command"],
+            shape=json.loads(group["shape"]),
+            count=group["count"],
+            total_ms=group["total_ms"],
+            max_ms=group["max_ms"],
+            avg_ms=group["total_ms"] / group["count"],
+            last_seen=group["last_seen"],
+            explain=explains.get(group["_id"]),
+        )
+        for group in groups
+    ]
+
+# Profile Routes
+# Profiles are recorded by ProfilingMiddleware and stored gzip-compressed
+@api_router.get("/perf/profiles", response_model=List[RequestProfile])
+async def get_profiles(
+    response: Response,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    current_user: User = Depends(get_current_user)
+):
+    if current_user.role != "admin":
+        raise HTTPException(status_code=403, detail="Only admins can view profiles")
+    
+    sort_keys = [("created_at", -1), ("id", -1)]
+    profiles, next_cursor = await paginate(db.perf_profiles, sort_keys, limit, cursor, projection={"_id": 0, "profile": 0})
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
+    
+    return profiles
+
+@api_router.get("/perf/profiles/{profile_id}")
+async def get_profile(profile_id: str, current_user: User = Depends(get_current_user)):
+    """The profile in speedscope format; open it at https://www.speedscope.app."""
+    if current_user.role != "admin":
+        raise HTTPException(status_code=403, detail="Only admins can view profiles")
+    
+    profile = await db.perf_profiles.find_one({"id": profile_id}, {"_id": 0, "profile": 1})
+    if not profile:
+        raise HTTPException(status_code=404, detail="Profile not found")
     
-    return {"message": "Logo uploaded successfully", "logo": logo_data}
+    headers = {"Content-Disposition": f'attachment; filename="{profile_id}.speedscope.json"'}
+    return Response(gzip.decompress(profile["profile"]), media_type="application/json", headers=headers)
 
 # Include the router in the main app
 app.include_router(api_router)
 
+# Outside /api so it is only reachable by an in-cluster scraper, not through the ingress
+@app.get("/metrics", include_in_schema=False)
+async def get_metrics():
+    return Response(exposition(request_metrics, command_metrics, slow_query_listener), media_type=EXPOSITION_CONTENT_TYPE)
+
+class IdempotencyMiddleware:
+    """Replay the stored response for a retried POST with the same Idempotency-Key.
+
+    Keys are scoped to the authenticated user. The first request reserves the
+    key, so a concurrent duplicate gets 409 instead of running twice; 5xx
+    responses, errors and cancellations release it so the client can retry.
+    The reservation is a lease until locked_until, so a key held by a worker
+    that died mid-request is taken over by the next retry once the lease
+    lapses instead of answering 409 until the record expires. The request
+    body is hashed as it streams through rather than buffered, and a key
+    reused for a different request is rejected with 422.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] != "POST":
+            return await self.app(scope, receive, send)
+        headers = Headers(scope=scope)
+        key = headers.get(IDEMPOTENCY_HEADER)
+        user_id = self.user_id(headers)
+        if not key or user_id is None:
+            return await self.app(scope, receive, send)
+        
+        record_id = f"{user_id}:{key}"
+        path = scope["path"] + (f"?{scope['query_string'].decode()}" if scope.get("query_string") else "")
+        lock = str(uuid.uuid4())
+        if not await self.reserve(record_id, path, lock):
+            record = await db.idempotency_keys.find_one({"id": record_id}, {"_id": 0})
+            return await self.replay(record, path, scope, receive, send)
+        
+        body_hash = hashlib.sha256()
+        response = {"status": None, "content_type": None, "body": bytearray()}
+        
+        async def hashing_receive():
+            message = await receive()
+            if message["type"] == "http.request":
+                body_hash.update(message.get("body", b""))
+            return message
+        
+        async def capturing_send(message):
+            if message["type"] == "http.response.start":
+                response["status"] = message["status"]
+                response["content_type"] = Headers(raw=message.get("headers", [])).get("content-type")
+            elif message["type"] == "http.response.body" and len(response["body"]) <= IDEMPOTENCY_MAX_RESPONSE_BYTES:
+                response["body"] += message.get("body", b"")
+            await send(message)
+        
+        stored = False
+        try:
+            await self.app(scope, hashing_receive, capturing_send)
+            if response["status"] is not None and response["status"] < 500 and len(response["body"]) <= IDEMPOTENCY_MAX_RESPONSE_BYTES:
+                # Filtered on the lock: if the lease lapsed and a retry took
+                # the key over, the retry's outcome is the one recorded
+                await db.idempotency_keys.update_one({"id": record_id, "lock": lock}, {
+                    "$set": {
+                        "state": "done",
+                        "body_hash": body_hash.hexdigest(),
+                        "status_code": response["status"],
+                        "content_type": response["content_type"],
+                        "body": bytes(response["body"])
+                    },
+                    "$unset": {"lock": "", "locked_until": ""}
+                })
+                stored = True
+        finally:
+            # Also on cancellation (client disconnect, shutdown), not just errors
+            if not stored:
+                await db.idempotency_keys.delete_one({"id": record_id, "lock": lock})
+
+    @staticmethod
+    async def reserve(record_id: str, path: str, lock: str) -> bool:
+        """Claim the key for this request; False if another request holds it or it is done."""
+        now = datetime.now(timezone.utc)
+        reservation = {
+            "path": path,
+            "state": "in_progress",
+            "lock": lock,
+            "locked_until": now + timedelta(seconds=IDEMPOTENCY_LOCK_SECONDS),
+            "created_at": now
+        }
+        try:
+            await db.idempotency_keys.insert_one({"id": record_id, **reservation})
+            return True
+        except DuplicateKeyError:
+            # Reservations made before the lease have no locked_until and wait for the TTL
+            taken = await db.idempotency_keys.update_one(
+                {"id": record_id, "state": "in_progress", "locked_until": {"$lt": now}},
+                {"$set": reservation}
+            )
+            return taken.modified_count == 1
+
+    @staticmethod
+    def user_id(headers: Headers) -> Optional[str]:
+        scheme, _, token = headers.get("authorization", "").partition(" ")
+        if scheme.lower() != "bearer" or not token:
+            return None
+        try:
+            return decode_token(token)["user_id"]
+        except HTTPException:
+            return None  # the route itself answers 401
+
+    async def replay(self, record: Optional[dict], path: str, scope, receive, send):
+        if record is None:
+            # Expired between the insert and the lookup
+            return await self.respond(scope, receive, send, 409, {"detail": "Idempotency-Key is being processed, retry shortly"})
+        if record["path"] != path:
+            return await self.respond(scope, receive, send, 422, {"detail": "Idempotency-Key was used for a different request"})
+        if record["state"] != "done":
+            return await self.respond(scope, receive, send, 409, {"detail": "A request with this Idempotency-Key is in progress"})
+        
+        body_hash = hashlib.sha256()
+        more_body = True
+        while more_body:
+            message = await receive()
+            if message["type"] == "http.disconnect":
+                return
+            body_hash.update(message.get("body", b""))
+            more_body = message.get("more_body", False)
+        if body_hash.hexdigest() != record["body_hash"]:
+            return await self.respond(scope, receive, send, 422, {"detail": "Idempotency-Key was used for a different request"})
+        
+        headers = [(b"content-length", str(len(record["body"])).encode()), (IDEMPOTENCY_REPLAYED_HEADER.lower().encode(), b"true")]
+        if record.get("content_type"):
+            headers.append((b"content-type", record["content_type"].encode()))
+        await send({"type": "http.response.start", "status": record["status_code"], "headers": headers})
+        await send({"type": "http.response.body", "body": record["body"]})
+
+    @staticmethod
+    async def respond(scope, receive, send, status_code: int, content: dict):
+        await JSONResponse(content, status_code=status_code)(scope, receive, send)
+
+class ProfilingMiddleware:
+    """Run a single request under a sampling profiler when an admin asks for it.
+
+    Profiling is requested with ?profile=1 or an X-Profile: 1 header and is
+    silently skipped unless the bearer token belongs to an admin. pyinstrument
+    runs in async mode, so time the request spends awaiting is attributed to
+    it rather than to whatever else the event loop ran meanwhile. Requests
+    without the flag only pay for the flag check.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not self.requested(scope):
+            return await self.app(scope, receive, send)
+        user = await self.admin(scope)
+        if user is None:
+            return await self.app(scope, receive, send)
+        
+        profile_id = str(uuid.uuid4())
+        status_code = 500
+        
+        async def profile_send(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                headers = list(message.get("headers", []))
+                headers.append((PROFILE_ID_HEADER.lower().encode(), profile_id.encode()))
+                message = {**message, "headers": headers}
+            await send(message)
+        
+        profiler = Profiler(interval=PROFILE_INTERVAL_SECONDS, async_mode="enabled")
+        profiler.start()
+        try:
+            await self.app(scope, receive, profile_send)
+        finally:
+            session = profiler.stop()
+            # Failed requests are kept too; they are often the ones worth a look
+            await self.store(profile_id, profiler, session, scope, status_code, user)
+
+    @staticmethod
+    def requested(scope) -> bool:
+        query_string = scope["query_string"]
+        if b"profile=" in query_string and parse_qs(query_string.decode("latin-1")).get("profile") == ["1"]:
+            return True
+        header = PROFILE_HEADER.lower().encode()
+        return any(name == header and value == b"1" for name, value in scope["headers"])
+
+    @staticmethod
+    async def admin(scope) -> Optional[User]:
+        scheme, _, token = Headers(scope=scope).get("authorization", "").partition(" ")
+        if scheme.lower() != "bearer" or not token:
+            return None
+        try:
+            user = await get_current_user(HTTPAuthorizationCredentials(scheme=scheme, credentials=token))
+        except HTTPException:
+            return None
+        return user if user.role == "admin" else None
+
+    @staticmethod
+    async def store(profile_id: str, profiler: Profiler, session, scope, status_code: int, user: User):
+        try:
+            profile = gzip.compress(profiler.output(SpeedscopeRenderer()).encode())
+            if len(profile) > PROFILE_MAX_BYTES:
+                logger.warning(f"Profile of {scope['method']} {scope['path']} is too large to store")
+                return
+            await db.perf_profiles.insert_one({
+                "id": profile_id,
+                "method": scope["method"],
+                "path": scope["path"],
+                "status_code": status_code,
+                "duration_ms": session.duration * 1000,
+                "sample_count": session.sample_count,
+                "user_id": user.id,
+                "created_at": datetime.now(timezone.utc),
+                "profile": profile,
+            })
+        except Exception:
+            logger.exception("Could not store request profile")
+
+app.add_middleware(ProfilingMiddleware)
+
+app.add_middleware(IdempotencyMiddleware)
+
 app.add_middleware(
     CORSMiddleware,
     allow_credentials=True,
     allow_origins=os.environ.get('CORS_ORIGINS', '*').split(','),
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER, IDEMPOTENCY_REPLAYED_HEADER, PROFILE_ID_HEADER],
 )
 
+# Added last so it is outermost and times everything, replays and preflights included
+app.add_middleware(MetricsMiddleware, metrics=request_metrics)
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
@@ -1092,6 +3465,22 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+@app.on_event("startup")
+async def startup_db_client():
+    await ensure_indexes()
+    await seed_counters()
+    start_background_task(backfill_seq())
+    start_background_task(resume_jobs())
+    start_background_task(reminder_scheduler())
+    if SLOW_QUERY_MS > 0:
+        await ensure_slow_query_log()
+        slow_query_listener.attach(asyncio.get_running_loop(), asyncio.Queue(SLOW_QUERY_QUEUE_SIZE))
+        start_background_task(record_slow_queries())
+
 @app.on_event("shutdown")
 async def shutdown_db_client():
-    client.close()
\ No newline at end of file
+    for task in background_tasks:
+        task.cancel()
+    client.close()
+    password_executor.shutdown(wait=False)
+    pdf_executor.shutdown(wait=False)
\ No newline at end of file
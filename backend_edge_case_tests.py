@@ -1,6 +1,10 @@
 import requests
 import sys
+import os
+import io
+import csv
 import json
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 
 class BrecklandHeatingEdgeCaseTests:
@@ -264,6 +268,486 @@ class BrecklandHeatingEdgeCaseTests:
             self.log_test("Convert already converted estimate", False, f"Should prevent double conversion, got: {result2}")
             return False
 
+    def test_concurrent_invoice_numbers(self, concurrency=200):
+        """Test that simultaneous invoice creation never hands out duplicate numbers"""
+        customer_data = {
+            "name": "Concurrency Test Customer",
+            "address": "123 Race Street",
+            "phone": "01234 567890"
+        }
+        
+        success, customer = self.make_request('POST', 'customers', customer_data, token=self.admin_token)
+        if not success:
+            self.log_test("Concurrent invoice numbering", False, "Could not create test customer")
+            return False
+            
+        invoice_data = {
+            "customer_id": customer['id'],
+            "items": [{
+                "service_id": "concurrency-service",
+                "service_name": "Concurrency Service",
+                "quantity": 1,
+                "price": 10.0,
+                "total": 10.0
+            }],
+            "issue_date": datetime.now().isoformat(),
+            "vat_rate": 20.0
+        }
+        
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            futures = [
+                executor.submit(self.make_request, 'POST', 'invoices', invoice_data, self.admin_token)
+                for _ in range(concurrency)
+            ]
+            results = [future.result() for future in futures]
+        
+        failures = [result for success, result in results if not success]
+        numbers = [result['invoice_number'] for success, result in results if success]
+        duplicates = len(numbers) - len(set(numbers))
+        
+        if not failures and duplicates == 0:
+            self.log_test(f"Concurrent invoice numbering ({concurrency} simultaneous creates)", True)
+            return True
+        else:
+            self.log_test(f"Concurrent invoice numbering ({concurrency} simultaneous creates)", False, f"{len(failures)} failed requests, {duplicates} duplicate invoice numbers")
+            return False
+
+    def test_concurrent_estimate_conversion(self, concurrency=10):
+        """Test that simultaneous conversions of one estimate create exactly one invoice"""
+        customer_data = {
+            "name": "Concurrent Convert Customer",
+            "address": "123 Race Street",
+            "phone": "01234 567890"
+        }
+
+        success, customer = self.make_request('POST', 'customers', customer_data, token=self.admin_token)
+        if not success:
+            self.log_test("Concurrent estimate conversion", False, "Could not create test customer")
+            return False
+
+        estimate_data = {
+            "customer_id": customer['id'],
+            "items": [{
+                "service_id": "concurrency-service",
+                "service_name": "Concurrency Service",
+                "quantity": 1,
+                "price": 10.0,
+                "total": 10.0
+            }],
+            "issue_date": datetime.now().isoformat(),
+            "vat_rate": 20.0
+        }
+
+        success, estimate = self.make_request('POST', 'estimates', estimate_data, token=self.admin_token)
+        if not success:
+            self.log_test("Concurrent estimate conversion", False, "Could not create test estimate")
+            return False
+
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            futures = [
+                executor.submit(self.make_request, 'POST', f'estimates/{estimate["id"]}/convert', None, self.admin_token)
+                for _ in range(concurrency)
+            ]
+            results = [future.result() for future in futures]
+
+        converted = [result for success, result in results if success]
+
+        if len(converted) == 1:
+            self.log_test(f"Concurrent estimate conversion ({concurrency} simultaneous converts)", True)
+            return True
+        else:
+            self.log_test(f"Concurrent estimate conversion ({concurrency} simultaneous converts)", False, f"{len(converted)} invoices created")
+            return False
+
+    def test_idempotent_retry(self):
+        """Test that a retried POST with the same Idempotency-Key replays the first response"""
+        customer_data = {
+            "name": "Idempotency Test Customer",
+            "address": "123 Retry Street",
+            "phone": "01234 567890"
+        }
+        headers = {
+            'Content-Type': 'application/json',
+            'Authorization': f'Bearer {self.admin_token}',
+            'Idempotency-Key': f'edge-case-{datetime.now().timestamp()}'
+        }
+
+        try:
+            first = requests.post(f"{self.api_url}/customers", json=customer_data, headers=headers)
+            retry = requests.post(f"{self.api_url}/customers", json=customer_data, headers=headers)
+            changed = requests.post(f"{self.api_url}/customers", json={**customer_data, "name": "Changed"}, headers=headers)
+        except Exception as e:
+            self.log_test("Idempotent retry", False, f"Request failed: {str(e)}")
+            return False
+
+        if (first.status_code == 200 and retry.status_code == 200
+                and retry.json()['id'] == first.json()['id']
+                and retry.headers.get('Idempotent-Replayed') == 'true'
+                and changed.status_code == 422):
+            self.log_test("Idempotent retry", True)
+            return True
+        else:
+            self.log_test("Idempotent retry", False, f"Got {first.status_code}, {retry.status_code}, {changed.status_code}")
+            return False
+
+    def test_rollups_with_offset_dates(self):
+        """Test that creating then deleting an invoice dated with a UTC offset leaves every report rollup unchanged"""
+        customer_data = {
+            "name": "Rollup Offset Customer",
+            "address": "123 Offset Street",
+            "phone": "01234 567890"
+        }
+
+        success, customer = self.make_request('POST', 'customers', customer_data, token=self.admin_token)
+        if not success:
+            self.log_test("Rollups with offset dates", False, "Could not create test customer")
+            return False
+
+        def reports():
+            # 1999 is never used by other tests; 23:30 at -02:00 falls in the next UTC month and quarter
+            _, revenue = self.make_request('GET', 'reports/revenue?year=1999', token=self.admin_token)
+            _, vat = self.make_request('GET', 'reports/vat?year=1999', token=self.admin_token)
+            _, debtors = self.make_request('GET', 'reports/aged-debtors', token=self.admin_token)
+            return revenue, vat, debtors.get('buckets') if isinstance(debtors, dict) else debtors
+
+        before = reports()
+        invoice_data = {
+            "customer_id": customer['id'],
+            "items": [{
+                "service_id": "offset-service",
+                "service_name": "Offset Service",
+                "quantity": 1,
+                "price": 100.0,
+                "total": 100.0
+            }],
+            "issue_date": "1999-03-31T23:30:00-02:00",
+            "due_date": "1999-03-31T23:30:00-02:00",
+            "vat_rate": 20.0
+        }
+
+        success, invoice = self.make_request('POST', 'invoices', invoice_data, token=self.admin_token)
+        if not success:
+            self.log_test("Rollups with offset dates", False, "Could not create test invoice")
+            return False
+        during = reports()
+        self.make_request('DELETE', f'invoices/{invoice["id"]}', token=self.admin_token)
+        after = reports()
+
+        if during[0] and during[0][0]['month'] == '1999-04' and during[1][0]['quarter'] == '1999-Q2' and after == before:
+            self.log_test("Rollups with offset dates", True)
+            return True
+        else:
+            self.log_test("Rollups with offset dates", False, f"Rollups before {before}, after {after}")
+            return False
+
+    def test_import_unbalanced_quotes(self):
+        """Test that a CSV row with a stray quote is reported rather than silently dropped"""
+        csv_body = (
+            "name,address,phone\n"
+            "Import Quote Customer,\"1 Quoted Street\nFlat 2\",01234 567890\n"
+            "Import Stray Quote,\"2 Unclosed Street,01234 567890\n"
+        )
+        headers = {'Content-Type': 'text/csv', 'Authorization': f'Bearer {self.admin_token}'}
+
+        try:
+            response = requests.post(f"{self.api_url}/import/customers?format=csv", data=csv_body.encode(), headers=headers)
+            result = response.json()
+        except Exception as e:
+            self.log_test("Import with unbalanced quotes", False, f"Request failed: {str(e)}")
+            return False
+
+        if (response.status_code == 200 and result['rows'] == 2 and result['inserted'] == 1
+                and [error['row'] for error in result['errors']] == [2]):
+            self.log_test("Import with unbalanced quotes", True)
+            return True
+        else:
+            self.log_test("Import with unbalanced quotes", False, f"Got {response.status_code}: {result}")
+            return False
+
+    def test_list_search_filter(self):
+        """Test that ?q= filters on the server and pages through every match, not just the first page"""
+        marker = f"Searchable {datetime.now().strftime('%H%M%S%f')}"
+        for i in range(3):
+            customer_data = {"name": f"{marker} (Customer {i})", "address": f"{i} Filter Lane", "phone": "01234 567890"}
+            success, _ = self.make_request('POST', 'customers', customer_data, token=self.admin_token)
+            if not success:
+                self.log_test("List search filter", False, "Could not create test customer")
+                return False
+
+        headers = {'Authorization': f'Bearer {self.admin_token}'}
+        names = []
+        params = {'q': marker.lower(), 'limit': 2}
+        try:
+            while True:
+                response = requests.get(f"{self.api_url}/customers", params=params, headers=headers)
+                if response.status_code != 200:
+                    self.log_test("List search filter", False, f"Got {response.status_code}: {response.text}")
+                    return False
+                names += [customer['name'] for customer in response.json()]
+                next_cursor = response.headers.get('X-Next-Cursor')
+                if not next_cursor:
+                    break
+                params['cursor'] = next_cursor
+        except Exception as e:
+            self.log_test("List search filter", False, f"Request failed: {str(e)}")
+            return False
+
+        expected = [f"{marker} (Customer {i})" for i in range(3)]
+        if names == expected:
+            self.log_test("List search filter", True)
+            return True
+        else:
+            self.log_test("List search filter", False, f"Expected {expected}, got {names}")
+            return False
+
+    def setup_search_records(self):
+        """Create a customer matching a marker word by name, one matching it by address, and an invoice"""
+        if getattr(self, 'search_marker', None):
+            return True
+        marker = f"srch{datetime.now().strftime('%H%M%S%f')}"
+        success, by_name = self.make_request('POST', 'customers', {
+            "name": f"{marker} Heating", "address": "1 Elm Road", "phone": "01234 567890"
+        }, token=self.admin_token)
+        if not success:
+            return False
+        success, by_address = self.make_request('POST', 'customers', {
+            "name": "Other Name", "address": f"2 {marker} Road", "phone": "01234 567890"
+        }, token=self.admin_token)
+        if not success:
+            return False
+        success, invoice = self.make_request('POST', 'invoices', {
+            "customer_id": by_name['id'],
+            "items": [{"service_id": "search-service", "service_name": "Search Service", "quantity": 1, "price": 10.0, "total": 10.0}],
+            "issue_date": datetime.now().isoformat(),
+            "vat_rate": 20.0
+        }, token=self.admin_token)
+        if not success:
+            return False
+        self.search_marker = marker
+        self.search_records = {"by_name": by_name, "by_address": by_address, "invoice": invoice}
+        return True
+
+    def search(self, q, limit, cursor=None):
+        params = {'q': q, 'limit': limit}
+        if cursor:
+            params['cursor'] = cursor
+        response = requests.get(f"{self.api_url}/search", params=params, headers={'Authorization': f'Bearer {self.admin_token}'})
+        if response.status_code != 200:
+            raise AssertionError(f"Got {response.status_code}: {response.text}")
+        return response.json(), response.headers.get('X-Next-Cursor')
+
+    def test_search_ranking(self):
+        """Test that a name match outranks address and customer name matches from any collection"""
+        try:
+            if not self.setup_search_records():
+                self.log_test("Search ranking", False, "Could not create search records")
+                return False
+            hits, _ = self.search(self.search_marker, 10)
+        except Exception as e:
+            self.log_test("Search ranking", False, str(e))
+            return False
+
+        ids = [hit['id'] for hit in hits]
+        expected = {self.search_records[key]['id'] for key in ("by_name", "by_address", "invoice")}
+        scores = [hit['score'] for hit in hits]
+        if (set(ids) == expected and ids[0] == self.search_records['by_name']['id']
+                and scores == sorted(scores, reverse=True) and scores[0] > scores[1]):
+            self.log_test("Search ranking", True)
+            return True
+        else:
+            self.log_test("Search ranking", False, f"Got {hits}")
+            return False
+
+    def test_search_typed_hits(self):
+        """Test that hits carry their record type, id and title"""
+        try:
+            if not self.setup_search_records():
+                self.log_test("Search typed hits", False, "Could not create search records")
+                return False
+            invoice = self.search_records['invoice']
+            hits, _ = self.search(invoice['invoice_number'], 5)
+            marker_hits, _ = self.search(self.search_marker, 10)
+        except Exception as e:
+            self.log_test("Search typed hits", False, str(e))
+            return False
+
+        types = {hit['id']: hit['type'] for hit in marker_hits}
+        expected_types = {
+            self.search_records['by_name']['id']: 'customer',
+            self.search_records['by_address']['id']: 'customer',
+            invoice['id']: 'invoice',
+        }
+        if (hits and hits[0]['type'] == 'invoice' and hits[0]['id'] == invoice['id']
+                and hits[0]['title'] == invoice['invoice_number'] and types == expected_types):
+            self.log_test("Search typed hits", True)
+            return True
+        else:
+            self.log_test("Search typed hits", False, f"Got {hits} and {marker_hits}")
+            return False
+
+    def test_search_offset_cursor(self):
+        """Test that paging with the search cursor returns the same hits as one large page"""
+        try:
+            if not self.setup_search_records():
+                self.log_test("Search offset cursor", False, "Could not create search records")
+                return False
+            full, _ = self.search(self.search_marker, 10)
+            paged, cursor = self.search(self.search_marker, 1)
+            while cursor:
+                page, cursor = self.search(self.search_marker, 1, cursor)
+                paged += page
+        except Exception as e:
+            self.log_test("Search offset cursor", False, str(e))
+            return False
+
+        if len(full) == 3 and [hit['id'] for hit in paged] == [hit['id'] for hit in full]:
+            self.log_test("Search offset cursor", True)
+            return True
+        else:
+            self.log_test("Search offset cursor", False, f"Paged {paged}, expected {full}")
+            return False
+
+    def test_certificate_put_replaces(self):
+        """Test that PUT replaces a certificate, removing fields the body leaves out"""
+        cert_data = {
+            "certificate_type": "CP12",
+            "landlord_customer_name": "Replace Test Landlord",
+            "landlord_customer_address": "1 Replace Road",
+            "landlord_customer_phone": "01234 567890",
+            "inspection_address": "1 Replace Road",
+            "inspection_date": datetime.now().isoformat(),
+            "engineer_name": "Replace Engineer",
+            "gas_safe_number": "123456"
+        }
+        success, certificate = self.make_request('POST', 'certificates', cert_data, token=self.admin_token)
+        if not success:
+            self.log_test("Certificate PUT replaces", False, f"Could not create certificate: {certificate}")
+            return False
+
+        replacement = {key: value for key, value in cert_data.items() if key != "gas_safe_number"}
+        success, updated = self.make_request('PUT', f"certificates/{certificate['id']}", replacement, token=self.admin_token)
+        if (success and updated.get('gas_safe_number') is None
+                and updated['certificate_number'] == certificate['certificate_number']):
+            self.log_test("Certificate PUT replaces", True)
+            return True
+        else:
+            self.log_test("Certificate PUT replaces", False, f"Got {updated}")
+            return False
+
+    def create_export_invoice(self):
+        """Create an invoice on a far-off date so a date-bounded export stays small"""
+        success, customer = self.make_request('POST', 'customers', {
+            "name": "Export Test Customer", "address": "1 Export Street", "phone": "01234 567890"
+        }, token=self.admin_token)
+        if not success:
+            return None
+        success, invoice = self.make_request('POST', 'invoices', {
+            "customer_id": customer['id'],
+            "items": [{"service_id": "export-service", "service_name": "Export Service", "quantity": 2, "price": 15.0, "total": 30.0}],
+            "issue_date": "2031-03-14T09:30:00+00:00",
+            "vat_rate": 20.0
+        }, token=self.admin_token)
+        return invoice if success else None
+
+    def test_export_format(self):
+        """Test the CSV and NDJSON export layouts: model columns, JSON cells for lists, ISO dates"""
+        invoice = self.create_export_invoice()
+        if not invoice:
+            self.log_test("Export format", False, "Could not create test invoice")
+            return False
+
+        headers = {'Authorization': f'Bearer {self.admin_token}'}
+        params = {'date_from': '2031-03-14T00:00:00+00:00', 'date_to': '2031-03-14T23:59:59+00:00'}
+        try:
+            csv_response = requests.get(f"{self.api_url}/export/invoices", params=dict(params, format='csv'), headers=headers)
+            ndjson_response = requests.get(f"{self.api_url}/export/invoices", params=dict(params, format='ndjson'), headers=headers)
+            bad_response = requests.get(f"{self.api_url}/export/invoices", params={'format': 'xml'}, headers=headers)
+        except Exception as e:
+            self.log_test("Export format", False, f"Request failed: {str(e)}")
+            return False
+
+        expected_columns = [
+            "id", "invoice_number", "seq", "customer_id", "customer_name", "customer_address", "customer_phone",
+            "customer_email", "items", "subtotal", "vat_rate", "vat_amount", "total", "status", "issue_date",
+            "due_date", "notes", "estimate_id", "created_by", "created_at"
+        ]
+        try:
+            rows = list(csv.reader(io.StringIO(csv_response.text)))
+            row = next(dict(zip(rows[0], values)) for values in rows[1:] if values[0] == invoice['id'])
+            lines = [json.loads(line) for line in ndjson_response.text.splitlines()]
+            line = next(line for line in lines if line['id'] == invoice['id'])
+            csv_ok = (csv_response.status_code == 200 and rows[0] == expected_columns
+                      and json.loads(row['items'])[0]['service_name'] == "Export Service"
+                      and datetime.fromisoformat(row['issue_date']) == datetime.fromisoformat("2031-03-14T09:30:00+00:00"))
+            ndjson_ok = (ndjson_response.status_code == 200 and len(lines) == len(rows) - 1
+                         and line['items'][0]['total'] == 30.0)
+        except (ValueError, KeyError, IndexError, StopIteration) as e:
+            self.log_test("Export format", False, f"Could not parse export: {str(e)}")
+            return False
+
+        if csv_ok and ndjson_ok and bad_response.status_code == 400:
+            self.log_test("Export format", True)
+            return True
+        else:
+            self.log_test("Export format", False, f"CSV {csv_response.status_code}: {row}, NDJSON {ndjson_response.status_code}: {line}, bad format {bad_response.status_code}")
+            return False
+
+    def test_fields_projection(self):
+        """Test that ?fields= returns only the requested fields, keeps paging, and rejects unknown fields"""
+        headers = {'Authorization': f'Bearer {self.admin_token}'}
+        summary = {"id", "invoice_number", "customer_name", "total", "status", "issue_date", "due_date"}
+        try:
+            view = requests.get(f"{self.api_url}/invoices", params={'fields': 'summary', 'limit': 1}, headers=headers)
+            next_page = requests.get(f"{self.api_url}/invoices", params={
+                'fields': 'summary', 'limit': 1, 'cursor': view.headers.get('X-Next-Cursor')
+            }, headers=headers)
+            listed = requests.get(f"{self.api_url}/invoices", params={'fields': 'invoice_number,total', 'limit': 5}, headers=headers)
+            unknown = requests.get(f"{self.api_url}/invoices", params={'fields': 'invoice_number,password'}, headers=headers)
+        except Exception as e:
+            self.log_test("Fields projection", False, f"Request failed: {str(e)}")
+            return False
+
+        view_rows, next_rows, listed_rows = view.json(), next_page.json(), listed.json()
+        if (view.status_code == 200 and len(view_rows) == 1 and set(view_rows[0]) == summary
+                and next_page.status_code == 200 and next_rows and next_rows[0]['id'] != view_rows[0]['id']
+                and listed.status_code == 200 and all(set(row) == {"id", "invoice_number", "total"} for row in listed_rows)
+                and unknown.status_code == 400):
+            self.log_test("Fields projection", True)
+            return True
+        else:
+            self.log_test("Fields projection", False, f"Got {view_rows}, {next_rows}, {listed_rows}, unknown fields {unknown.status_code}")
+            return False
+
+    def test_slow_query_shapes_redacted(self):
+        """Test that slow query shapes keep field names and operators but no literal values"""
+        sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "backend"))
+        from metrics import command_shape, redact
+
+        find = command_shape("find", {
+            "find": "invoices",
+            "filter": {"customer_id": "c-123", "$or": [{"status": "unpaid"}, {"total": {"$gte": 100}}], "items.service_id": {"$in": ["s1", "s2"]}},
+            "sort": {"seq": -1},
+            "limit": 51
+        })
+        aggregate = command_shape("aggregate", {
+            "aggregate": "invoices",
+            "pipeline": [{"$match": {"status": "paid", "issue_date": {"$gte": "2031-01-01"}}}, {"$sort": {"seq": -1}}, {"$limit": 5}]
+        })
+        update = command_shape("update", {"update": "estimates", "updates": [{"q": {"id": "e-1"}, "u": {"$set": {"status": "converted"}}}]})
+
+        expected_find = {
+            "filter": {"customer_id": "?", "$or": [{"status": "?"}, {"total": {"$gte": "?"}}], "items.service_id": {"$in": "?"}},
+            "sort": {"seq": -1}
+        }
+        expected_aggregate = {"pipeline": [{"$match": {"status": "?", "issue_date": {"$gte": "?"}}}, {"$sort": {"seq": -1}}, {"$limit": "?"}]}
+        if (find == expected_find and aggregate == expected_aggregate and update == {"filter": {"id": "?"}}
+                and redact(["a", "b"]) == "?"):
+            self.log_test("Slow query shapes redacted", True)
+            return True
+        else:
+            self.log_test("Slow query shapes redacted", False, f"Got {find}, {aggregate}, {update}")
+            return False
+
     def run_edge_case_tests(self):
         """Run all edge case tests"""
         print("🔍 Starting Breckland Heating Edge Case Tests...")
@@ -283,6 +767,19 @@ class BrecklandHeatingEdgeCaseTests:
         self.test_invalid_invoice_data()
         self.test_invalid_invoice_status_update()
         self.test_convert_already_converted_estimate()
+        self.test_concurrent_invoice_numbers()
+        self.test_concurrent_estimate_conversion()
+        self.test_idempotent_retry()
+        self.test_rollups_with_offset_dates()
+        self.test_import_unbalanced_quotes()
+        self.test_list_search_filter()
+        self.test_search_ranking()
+        self.test_search_typed_hits()
+        self.test_search_offset_cursor()
+        self.test_certificate_put_replaces()
+        self.test_export_format()
+        self.test_fields_projection()
+        self.test_slow_query_shapes_redacted()
         
         # Print summary
         print("=" * 60)
@@ -0,0 +1,363 @@
+import requests
+import sys
+import time
+import statistics
+import uuid
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+class BrecklandHeatingPerfTester:
+    def __init__(self, base_url="https://unified-repos.preview.emergentagent.com", iterations=20):
+        self.base_url = base_url
+        self.api_url = f"{base_url}/api"
+        self.iterations = iterations
+        self.admin_token = None
+        self.results = []
+
+    def log_result(self, name, latencies, payload_bytes):
+        """Log timing summary for a benchmark"""
+        latencies = sorted(latencies)
+        p50 = statistics.median(latencies)
+        p95 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))]
+        print(f"⏱️  {name}: p50 {p50:.1f} ms, p95 {p95:.1f} ms, {payload_bytes / 1024:.1f} KiB")
+
+        self.results.append({
+            "benchmark": name,
+            "p50_ms": p50,
+            "p95_ms": p95,
+            "payload_bytes": payload_bytes
+        })
+
+    def headers(self):
+        return {'Authorization': f'Bearer {self.admin_token}'}
+
+    def authenticate(self):
+        """Register a throwaway admin to run benchmarks as"""
+        self.admin_credentials = {
+            "email": f"perf_{uuid.uuid4().hex[:8]}@brecklandheating.com",
+            "password": "PerfTest123!"
+        }
+        user = dict(self.admin_credentials, name="Perf Admin", role="admin")
+        response = requests.post(f"{self.api_url}/auth/register", json=user)
+        if response.status_code != 200:
+            print(f"❌ Admin registration failed - {response.text}")
+            return False
+
+        self.admin_token = response.json()["token"]
+        return True
+
+    def time_requests(self, endpoints):
+        """Fetch all endpoints once; return (elapsed ms, total bytes)"""
+        start = time.perf_counter()
+        total_bytes = 0
+        for endpoint in endpoints:
+            response = requests.get(f"{self.api_url}/{endpoint}", headers=self.headers())
+            response.raise_for_status()
+            total_bytes += len(response.content)
+        return (time.perf_counter() - start) * 1000, total_bytes
+
+    def bench_dashboard(self):
+        """Compare the old dashboard list fan-out with /dashboard/stats"""
+        fanout_latencies, stats_latencies = [], []
+        fanout_bytes = stats_bytes = 0
+
+        for _ in range(self.iterations):
+            elapsed, fanout_bytes = self.time_requests(["customers", "invoices", "estimates"])
+            fanout_latencies.append(elapsed)
+
+            elapsed, stats_bytes = self.time_requests(["dashboard/stats"])
+            stats_latencies.append(elapsed)
+
+        self.log_result("Dashboard fan-out (customers+invoices+estimates)", fanout_latencies, fanout_bytes)
+        self.log_result("Dashboard stats aggregation", stats_latencies, stats_bytes)
+
+    def bench_reports(self):
+        """Latency of the rollup-backed report endpoints"""
+        for endpoint in ["reports/revenue", "reports/vat", "reports/aged-debtors"]:
+            latencies = []
+            payload_bytes = 0
+            for _ in range(self.iterations):
+                elapsed, payload_bytes = self.time_requests([endpoint])
+                latencies.append(elapsed)
+            self.log_result(f"/{endpoint}", latencies, payload_bytes)
+
+    def bench_list_latency(self, page_size=1000):
+        """Latency of full-size pages on every list endpoint (run before/after migrate_dates.py)"""
+        for collection in ["customers", "services", "invoices", "estimates", "certificates"]:
+            latencies = []
+            payload_bytes = 0
+            for _ in range(self.iterations):
+                elapsed, payload_bytes = self.time_requests([f"{collection}?limit={page_size}"])
+                latencies.append(elapsed)
+            self.log_result(f"/{collection} page of {page_size}", latencies, payload_bytes)
+
+    def bench_pagination(self, collection="invoices", page_size=100, max_pages=50):
+        """Walk a list endpoint page by page; keyset pages should cost the same at any depth"""
+        latencies = []
+        total_bytes = 0
+        cursor = None
+
+        for _ in range(max_pages):
+            params = {"limit": page_size}
+            if cursor:
+                params["cursor"] = cursor
+
+            start = time.perf_counter()
+            response = requests.get(f"{self.api_url}/{collection}", headers=self.headers(), params=params)
+            latencies.append((time.perf_counter() - start) * 1000)
+            response.raise_for_status()
+            total_bytes += len(response.content)
+
+            cursor = response.headers.get("X-Next-Cursor")
+            if not cursor:
+                break
+
+        self.log_result(f"Paginated /{collection} ({len(latencies)} pages of {page_size})", latencies, total_bytes)
+        if len(latencies) > 1:
+            print(f"   first page {latencies[0]:.1f} ms, last page {latencies[-1]:.1f} ms")
+
+    def bench_auth_overhead(self):
+        """Per-request cost of authentication: unauthenticated root vs /auth/me.
+
+        Run once against a server with USER_CACHE_TTL_SECONDS=0 and once with the
+        default cache; the difference in the reported overhead is the saving
+        per authenticated request.
+        """
+        anonymous_latencies, authed_latencies = [], []
+
+        for _ in range(self.iterations):
+            start = time.perf_counter()
+            requests.get(f"{self.api_url}/").raise_for_status()
+            anonymous_latencies.append((time.perf_counter() - start) * 1000)
+
+            elapsed, authed_bytes = self.time_requests(["auth/me"])
+            authed_latencies.append(elapsed)
+
+        self.log_result("Unauthenticated GET /api/", anonymous_latencies, 0)
+        self.log_result("Authenticated GET /api/auth/me", authed_latencies, authed_bytes)
+        overhead = statistics.median(authed_latencies) - statistics.median(anonymous_latencies)
+        print(f"   auth overhead per request (p50): {overhead:.2f} ms")
+
+    def bench_sparse_fieldsets(self, page_size=100):
+        """Payload and latency of full list pages vs the predefined summary views"""
+        for collection in ["invoices", "estimates", "certificates"]:
+            full_latencies, summary_latencies = [], []
+            full_bytes = summary_bytes = 0
+
+            for _ in range(self.iterations):
+                elapsed, full_bytes = self.time_requests([f"{collection}?limit={page_size}"])
+                full_latencies.append(elapsed)
+
+                elapsed, summary_bytes = self.time_requests([f"{collection}?limit={page_size}&fields=summary"])
+                summary_latencies.append(elapsed)
+
+            self.log_result(f"/{collection} full rows", full_latencies, full_bytes)
+            self.log_result(f"/{collection} summary view", summary_latencies, summary_bytes)
+
+    def bench_search(self, queries=("Street", "NR19", "INV00001", "Customer 42")):
+        """Latency of ranked /search queries (target: well under 50 ms at 100k documents)"""
+        for query in queries:
+            latencies = []
+            payload_bytes = 0
+            for _ in range(self.iterations):
+                start = time.perf_counter()
+                response = requests.get(f"{self.api_url}/search", headers=self.headers(), params={"q": query})
+                latencies.append((time.perf_counter() - start) * 1000)
+                response.raise_for_status()
+                payload_bytes = len(response.content)
+            self.log_result(f"/search?q={query}", latencies, payload_bytes)
+
+    def bench_suggest(self, prefixes=("a", "jo", "smi", "c000")):
+        """Latency of the customer typeahead vs downloading the full customer list"""
+        for prefix in prefixes:
+            latencies = []
+            payload_bytes = 0
+            for _ in range(self.iterations):
+                elapsed, payload_bytes = self.time_requests([f"customers/suggest?prefix={prefix}"])
+                latencies.append(elapsed)
+            self.log_result(f"/customers/suggest?prefix={prefix}", latencies, payload_bytes)
+
+    def bench_export(self, collection="invoices"):
+        """Rows and bytes per second streamed by /export in each format"""
+        for export_format in ["ndjson", "csv"]:
+            start = time.perf_counter()
+            rows = total_bytes = 0
+            with requests.get(
+                f"{self.api_url}/export/{collection}",
+                headers=self.headers(),
+                params={"format": export_format},
+                stream=True
+            ) as response:
+                response.raise_for_status()
+                for chunk in response.iter_content(chunk_size=64 * 1024):
+                    total_bytes += len(chunk)
+                    rows += chunk.count(b"\n")
+            elapsed = time.perf_counter() - start
+
+            if export_format == "csv":
+                rows -= 1  # header row
+            print(f"⏱️  Export /{collection} as {export_format}: {rows} rows in {elapsed:.2f} s "
+                  f"({rows / elapsed:.0f} rows/s, {total_bytes / elapsed / 1024 / 1024:.1f} MiB/s)")
+
+    def bench_import(self, rows=20000):
+        """Rows per second through POST /import/customers with a streamed CSV body"""
+        def csv_body():
+            yield b"name,address,phone,email\n"
+            for i in range(rows):
+                yield f"Import Customer {i},{i} Perf Street,01234 {i:06d},import{i}@example.com\n".encode()
+
+        start = time.perf_counter()
+        response = requests.post(
+            f"{self.api_url}/import/customers",
+            headers=self.headers(),
+            params={"format": "csv"},
+            data=csv_body()
+        )
+        elapsed = time.perf_counter() - start
+        response.raise_for_status()
+        result = response.json()
+        print(f"⏱️  Import {rows} customers: {result['inserted']} inserted, {len(result['errors'])} errors "
+              f"in {elapsed:.2f} s ({result['inserted'] / elapsed:.0f} rows/s)")
+
+    def bench_certificate_types(self):
+        """Latency and response size of a single certificate of each type"""
+        certificate = {
+            "landlord_customer_name": "Perf Landlord",
+            "landlord_customer_address": "1 Perf Street",
+            "landlord_customer_phone": "01234 567890",
+            "inspection_address": "1 Perf Street",
+            "inspection_date": "2025-01-01T00:00:00Z",
+            "engineer_name": "Perf Engineer"
+        }
+        for certificate_type in ["CP12", "CD11", "CD10", "TI133D", "BENCHMARK"]:
+            response = requests.post(
+                f"{self.api_url}/certificates",
+                headers=self.headers(),
+                json=dict(certificate, certificate_type=certificate_type)
+            )
+            response.raise_for_status()
+            certificate_id = response.json()["id"]
+
+            latencies = []
+            payload_bytes = 0
+            for _ in range(self.iterations):
+                elapsed, payload_bytes = self.time_requests([f"certificates/{certificate_id}"])
+                latencies.append(elapsed)
+            self.log_result(f"GET {certificate_type} certificate", latencies, payload_bytes)
+
+    def bench_pdf_batch(self, poll_interval=0.5):
+        """Documents per second through a month-end style PDF batch job and its ZIP"""
+        start = time.perf_counter()
+        response = requests.post(
+            f"{self.api_url}/jobs/pdf-batch",
+            headers=self.headers(),
+            json={"collections": ["invoices", "certificates"]}
+        )
+        response.raise_for_status()
+        job = response.json()
+
+        while job["status"] in ["queued", "running"]:
+            time.sleep(poll_interval)
+            job = requests.get(f"{self.api_url}/jobs/{job['id']}", headers=self.headers()).json()
+        rendered = time.perf_counter() - start
+
+        archive_bytes = 0
+        with requests.get(f"{self.api_url}/jobs/{job['id']}/archive", headers=self.headers(), stream=True) as response:
+            response.raise_for_status()
+            for chunk in response.iter_content(chunk_size=64 * 1024):
+                archive_bytes += len(chunk)
+        elapsed = time.perf_counter() - start
+
+        print(f"⏱️  PDF batch: {job['completed']} rendered, {job['failed']} failed in {rendered:.2f} s "
+              f"({job['completed'] / rendered:.1f} docs/s); ZIP of {archive_bytes / 1024 / 1024:.1f} MiB "
+              f"after {elapsed:.2f} s")
+
+    def bench_reminders(self, within_days=30):
+        """Indexed due-certificate query and one reminder run (start an SMTP stand-in to time delivery)"""
+        latencies = []
+        payload_bytes = 0
+        for _ in range(self.iterations):
+            elapsed, payload_bytes = self.time_requests([f"certificates/due?within_days={within_days}&fields=summary"])
+            latencies.append(elapsed)
+        self.log_result(f"/certificates/due?within_days={within_days}", latencies, payload_bytes)
+
+        response = requests.post(f"{self.api_url}/reminders/run", headers=self.headers())
+        response.raise_for_status()
+        result = response.json()
+        queue_rate = result["queued"] / result["queue_seconds"] if result["queue_seconds"] else 0
+        send_seconds = result["elapsed_seconds"] - result["queue_seconds"]
+        send_rate = result["sent"] / send_seconds if send_seconds else 0
+        print(f"⏱️  Reminder run: {result['queued']} queued ({queue_rate:.0f}/s), "
+              f"{result['sent']} sent ({send_rate:.0f}/s), {result['failed']} failed")
+
+    def sample_latencies(self, endpoint, stop_event, latencies):
+        while not stop_event.is_set():
+            elapsed, _ = self.time_requests([endpoint])
+            latencies.append(elapsed)
+
+    def bench_login_burst(self, logins=100, concurrency=20, duration=5.0):
+        """p99 of GET /invoices on its own and while a burst of logins runs bcrypt"""
+        def p99(values):
+            values = sorted(values)
+            return values[min(len(values) - 1, int(len(values) * 0.99))]
+
+        quiet_latencies = []
+        stop = threading.Event()
+        sampler = threading.Thread(target=self.sample_latencies, args=("invoices?limit=10", stop, quiet_latencies))
+        sampler.start()
+        time.sleep(duration)
+        stop.set()
+        sampler.join()
+
+        burst_latencies = []
+        stop = threading.Event()
+        sampler = threading.Thread(target=self.sample_latencies, args=("invoices?limit=10", stop, burst_latencies))
+        sampler.start()
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            list(executor.map(
+                lambda _: requests.post(f"{self.api_url}/auth/login", json=self.admin_credentials),
+                range(logins)
+            ))
+        stop.set()
+        sampler.join()
+
+        pool = requests.get(f"{self.api_url}/auth/password-pool", headers=self.headers()).json()
+        print(f"⏱️  GET /invoices p99: {p99(quiet_latencies):.1f} ms idle, {p99(burst_latencies):.1f} ms during {logins} logins")
+        print(f"   password pool after burst: {pool}")
+
+    def run_all_benchmarks(self):
+        """Run all API benchmarks"""
+        print("🚀 Starting Breckland Heating API Benchmarks...")
+        print(f"Benchmarking against: {self.base_url} ({self.iterations} iterations)")
+        print("=" * 60)
+
+        if not self.authenticate():
+            return False
+
+        self.bench_auth_overhead()
+        self.bench_dashboard()
+        self.bench_reports()
+        self.bench_list_latency()
+        self.bench_pagination("invoices")
+        self.bench_pagination("certificates")
+        self.bench_sparse_fieldsets()
+        self.bench_certificate_types()
+        self.bench_search()
+        self.bench_suggest()
+        self.bench_export("invoices")
+        self.bench_import()
+        self.bench_pdf_batch()
+        self.bench_reminders()
+        self.bench_login_burst()
+
+        print("=" * 60)
+        return True
+
+def main():
+    base_url = sys.argv[1] if len(sys.argv) > 1 else "https://unified-repos.preview.emergentagent.com"
+    tester = BrecklandHeatingPerfTester(base_url)
+    success = tester.run_all_benchmarks()
+    return 0 if success else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -6,6 +6,7 @@ import { Badge } from '@/components/ui/badge';
 import { Separator } from '@/components/ui/separator';
 import { toast } from '@/hooks/use-toast';
 import axios from 'axios';
+import { assetUrl } from '@/lib/utils';
 
 const BACKEND_URL = process.env.REACT_APP_BACKEND_URL;
 const API = `${BACKEND_URL}/api`;
@@ -192,7 +193,7 @@ const CertificateDetail = () => {
                       <p className="text-xs text-gray-600 mb-1">Signature</p>
                       <div className="border border-gray-300 p-1 inline-block rounded">
                         <img
-                          src={certificate.engineer_signature}
+                          src={assetUrl(certificate.engineer_signature)}
                           alt="Engineer Signature"
                           className="max-h-12 print:max-h-10"
                           data-testid="detail-engineer-signature"
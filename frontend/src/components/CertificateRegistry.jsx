@@ -7,42 +7,27 @@ import { Table, TableBody, TableCell, TableHead, TableHeader, TableRow } from '@
 import { Badge } from '@/components/ui/badge';
 import { toast } from '@/hooks/use-toast';
 import axios from 'axios';
+import { usePagedList } from '@/hooks/use-paged-list';
+import LoadMore from './LoadMore';
 
 const BACKEND_URL = process.env.REACT_APP_BACKEND_URL;
 const API = `${BACKEND_URL}/api`;
 
 const CertificateRegistry = () => {
   const navigate = useNavigate();
-  const [certificates, setCertificates] = useState([]);
-  const [filteredCertificates, setFilteredCertificates] = useState([]);
   const [loading, setLoading] = useState(true);
   const [searchTerm, setSearchTerm] = useState('');
+  const certificateList = usePagedList(`${API}/certificates`, { q: searchTerm.trim() || undefined });
+  const certificates = certificateList.rows;
   
   useEffect(() => {
     fetchCertificates();
   }, []);
   
-  useEffect(() => {
-    // Filter certificates based on search term
-    if (searchTerm) {
-      const filtered = certificates.filter(cert => 
-        cert.serial_number.toLowerCase().includes(searchTerm.toLowerCase()) ||
-        cert.property_address.toLowerCase().includes(searchTerm.toLowerCase()) ||
-        cert.landlord_name.toLowerCase().includes(searchTerm.toLowerCase()) ||
-        cert.engineer_name.toLowerCase().includes(searchTerm.toLowerCase())
-      );
-      setFilteredCertificates(filtered);
-    } else {
-      setFilteredCertificates(certificates);
-    }
-  }, [searchTerm, certificates]);
-  
   const fetchCertificates = async () => {
     try {
       setLoading(true);
-      const response = await axios.get(`${API}/certificates`);
-      setCertificates(response.data);
-      setFilteredCertificates(response.data);
+      await certificateList.reload();
     } catch (error) {
       console.error('Error fetching certificates:', error);
       toast({
@@ -137,7 +122,7 @@ const CertificateRegistry = () => {
             />
           </div>
           
-          {filteredCertificates.length === 0 ? (
+          {certificates.length === 0 ? (
             <div className="text-center py-12">
               <p className="text-gray-500 text-lg">
                 {searchTerm ? 'No certificates found matching your search.' : 'No certificates yet. Create your first one!'}
@@ -168,7 +153,7 @@ const CertificateRegistry = () => {
                   </TableRow>
                 </TableHeader>
                 <TableBody>
-                  {filteredCertificates.map((cert) => (
+                  {certificates.map((cert) => (
                     <TableRow key={cert.id} data-testid={`certificate-row-${cert.serial_number}`}>
                       <TableCell className="font-semibold">{cert.serial_number}</TableCell>
                       <TableCell className="max-w-xs truncate">{cert.property_address}</TableCell>
@@ -213,8 +198,9 @@ const CertificateRegistry = () => {
           )}
           
           <div className="mt-6 text-sm text-gray-500">
-            Showing {filteredCertificates.length} of {certificates.length} certificates
+            Showing {certificates.length}{certificateList.hasMore ? '+' : ''} certificates
           </div>
+          <LoadMore list={certificateList} label="certificates" />
         </CardContent>
       </Card>
     </div>
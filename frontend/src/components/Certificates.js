@@ -1,6 +1,8 @@
 import { useState, useEffect } from 'react';
 import { useNavigate } from 'react-router-dom';
 import axios from 'axios';
+import { assetUrl } from '@/lib/utils';
+import { usePagedList } from '@/hooks/use-paged-list';
 import { Button } from '@/components/ui/button';
 import { Input } from '@/components/ui/input';
 import { Label } from '@/components/ui/label';
@@ -10,17 +12,21 @@ import { Select, SelectContent, SelectItem, SelectTrigger, SelectValue } from '@
 import { Checkbox } from '@/components/ui/checkbox';
 import { toast } from 'sonner';
 import { Plus, FileCheck, Eye, Trash2, Search, Edit, ShieldCheck } from 'lucide-react';
+import LoadMore from './LoadMore';
 
 const BACKEND_URL = process.env.REACT_APP_BACKEND_URL;
 const API = `${BACKEND_URL}/api`;
 
 const Certificates = () => {
   const navigate = useNavigate();
-  const [certificates, setCertificates] = useState([]);
-  const [filteredCertificates, setFilteredCertificates] = useState([]);
   const [settings, setSettings] = useState(null);
   const [searchTerm, setSearchTerm] = useState('');
   const [certificateTypeFilter, setCertificateTypeFilter] = useState('ALL');
+  const certificateList = usePagedList(`${API}/certificates`, {
+    q: searchTerm.trim() || undefined,
+    certificate_type: certificateTypeFilter === 'ALL' ? undefined : certificateTypeFilter
+  });
+  const certificates = certificateList.rows;
   const [loading, setLoading] = useState(true);
   const [createDialogOpen, setCreateDialogOpen] = useState(false);
   const [viewDialogOpen, setViewDialogOpen] = useState(false);
@@ -69,18 +75,12 @@ const Certificates = () => {
     fetchData();
   }, []);
 
-  useEffect(() => {
-    filterCertificates();
-  }, [searchTerm, certificates, certificateTypeFilter]);
-
   const fetchData = async () => {
     try {
-      const [certsRes, settingsRes] = await Promise.all([
-        axios.get(`${API}/certificates`),
+      const [, settingsRes] = await Promise.all([
+        certificateList.reload(),
         axios.get(`${API}/settings`)
       ]);
-      setCertificates(certsRes.data);
-      setFilteredCertificates(certsRes.data);
       setSettings(settingsRes.data);
     } catch (error) {
       toast.error('Failed to load data');
@@ -89,27 +89,6 @@ const Certificates = () => {
     }
   };
 
-  const filterCertificates = () => {
-    let filtered = certificates;
-    
-    // Filter by certificate type
-    if (certificateTypeFilter !== 'ALL') {
-      filtered = filtered.filter(cert => cert.certificate_type === certificateTypeFilter);
-    }
-    
-    // Filter by search term
-    if (searchTerm) {
-      filtered = filtered.filter(
-        (cert) =>
-          cert.certificate_number.toLowerCase().includes(searchTerm.toLowerCase()) ||
-          cert.landlord_customer_name.toLowerCase().includes(searchTerm.toLowerCase()) ||
-          cert.inspection_address.toLowerCase().includes(searchTerm.toLowerCase())
-      );
-    }
-    
-    setFilteredCertificates(filtered);
-  };
-
   const addAppliance = () => {
     if (!currentAppliance.appliance_type || !currentAppliance.make_model) {
       toast.error('Please fill in appliance type and make/model');
@@ -291,9 +270,6 @@ const Certificates = () => {
               className="flex items-center gap-2"
             >
               All Certificates
-              <span className="px-2 py-0.5 text-xs rounded-full bg-slate-200 text-slate-700">
-                {certificates.length}
-              </span>
             </Button>
             <Button
               variant={certificateTypeFilter === 'CP12' ? 'default' : 'outline'}
@@ -301,9 +277,6 @@ const Certificates = () => {
               className="flex items-center gap-2"
             >
               CP12
-              <span className="px-2 py-0.5 text-xs rounded-full bg-blue-100 text-blue-700">
-                {certificates.filter(c => c.certificate_type === 'CP12').length}
-              </span>
             </Button>
             <Button
               variant={certificateTypeFilter === 'BENCHMARK' ? 'default' : 'outline'}
@@ -311,9 +284,6 @@ const Certificates = () => {
               className="flex items-center gap-2"
             >
               Benchmark
-              <span className="px-2 py-0.5 text-xs rounded-full bg-emerald-100 text-emerald-700">
-                {certificates.filter(c => c.certificate_type === 'BENCHMARK').length}
-              </span>
             </Button>
             <Button
               variant={certificateTypeFilter === 'CD11' ? 'default' : 'outline'}
@@ -321,9 +291,6 @@ const Certificates = () => {
               className="flex items-center gap-2"
             >
               CD11
-              <span className="px-2 py-0.5 text-xs rounded-full bg-orange-100 text-orange-700">
-                {certificates.filter(c => c.certificate_type === 'CD11').length}
-              </span>
             </Button>
             <Button
               variant={certificateTypeFilter === 'CD10' ? 'default' : 'outline'}
@@ -331,9 +298,6 @@ const Certificates = () => {
               className="flex items-center gap-2"
             >
               CD10
-              <span className="px-2 py-0.5 text-xs rounded-full bg-green-100 text-green-700">
-                {certificates.filter(c => c.certificate_type === 'CD10').length}
-              </span>
             </Button>
             <Button
               variant={certificateTypeFilter === 'TI133D' ? 'default' : 'outline'}
@@ -341,9 +305,6 @@ const Certificates = () => {
               className="flex items-center gap-2"
             >
               TI/133D
-              <span className="px-2 py-0.5 text-xs rounded-full bg-purple-100 text-purple-700">
-                {certificates.filter(c => c.certificate_type === 'TI133D').length}
-              </span>
             </Button>
           </div>
           
@@ -365,11 +326,11 @@ const Certificates = () => {
       <Card className="border-0 shadow-lg">
         <CardHeader>
           <CardTitle className="text-2xl" style={{ fontFamily: 'Space Grotesk' }}>
-            All Certificates ({filteredCertificates.length})
+            All Certificates ({certificates.length}{certificateList.hasMore ? '+' : ''})
           </CardTitle>
         </CardHeader>
         <CardContent>
-          {filteredCertificates.length === 0 ? (
+          {certificates.length === 0 ? (
             <div className="text-center py-12">
               <FileCheck className="w-16 h-16 text-slate-300 mx-auto mb-4" />
               <p className="text-slate-500 text-lg">No certificates found</p>
@@ -390,7 +351,7 @@ const Certificates = () => {
                   </tr>
                 </thead>
                 <tbody>
-                  {filteredCertificates.map((cert) => (
+                  {certificates.map((cert) => (
                     <tr key={cert.id}>
                       <td className="font-semibold text-green-600">{cert.certificate_number}</td>
                       <td>
@@ -451,6 +412,7 @@ const Certificates = () => {
               </table>
             </div>
           )}
+          <LoadMore list={certificateList} label="certificates" />
         </CardContent>
       </Card>
 
@@ -867,7 +829,7 @@ const Certificates = () => {
                 <div className="flex items-start justify-between">
                   <div className="flex items-start gap-4">
                     {settings.logo && (
-                      <img src={settings.logo} alt={settings.company_name} className="h-16 w-auto object-contain" />
+                      <img src={assetUrl(settings.logo)} alt={settings.company_name} className="h-16 w-auto object-contain" />
                     )}
                     <div>
                       <h2 className="text-2xl font-bold text-slate-900" style={{ fontFamily: 'Space Grotesk' }}>
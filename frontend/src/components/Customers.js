@@ -1,5 +1,6 @@
 import { useState, useEffect } from 'react';
 import axios from 'axios';
+import { usePagedList } from '@/hooks/use-paged-list';
 import { Button } from '@/components/ui/button';
 import { Input } from '@/components/ui/input';
 import { Label } from '@/components/ui/label';
@@ -7,14 +8,15 @@ import { Card, CardContent, CardHeader, CardTitle } from '@/components/ui/card';
 import { Dialog, DialogContent, DialogDescription, DialogHeader, DialogTitle, DialogTrigger } from '@/components/ui/dialog';
 import { toast } from 'sonner';
 import { Plus, Search, Edit, Trash2, User } from 'lucide-react';
+import LoadMore from './LoadMore';
 
 const BACKEND_URL = process.env.REACT_APP_BACKEND_URL;
 const API = `${BACKEND_URL}/api`;
 
 const Customers = () => {
-  const [customers, setCustomers] = useState([]);
-  const [filteredCustomers, setFilteredCustomers] = useState([]);
   const [searchTerm, setSearchTerm] = useState('');
+  const customerList = usePagedList(`${API}/customers`, { q: searchTerm.trim() || undefined });
+  const customers = customerList.rows;
   const [loading, setLoading] = useState(true);
   const [dialogOpen, setDialogOpen] = useState(false);
   const [editingCustomer, setEditingCustomer] = useState(null);
@@ -29,15 +31,9 @@ const Customers = () => {
     fetchCustomers();
   }, []);
 
-  useEffect(() => {
-    filterCustomers();
-  }, [searchTerm, customers]);
-
   const fetchCustomers = async () => {
     try {
-      const response = await axios.get(`${API}/customers`);
-      setCustomers(response.data);
-      setFilteredCustomers(response.data);
+      await customerList.reload();
     } catch (error) {
       toast.error('Failed to load customers');
     } finally {
@@ -45,21 +41,6 @@ const Customers = () => {
     }
   };
 
-  const filterCustomers = () => {
-    if (!searchTerm) {
-      setFilteredCustomers(customers);
-      return;
-    }
-    const filtered = customers.filter(
-      (customer) =>
-        customer.name.toLowerCase().includes(searchTerm.toLowerCase()) ||
-        customer.email?.toLowerCase().includes(searchTerm.toLowerCase()) ||
-        customer.phone.includes(searchTerm) ||
-        customer.customer_number.includes(searchTerm)
-    );
-    setFilteredCustomers(filtered);
-  };
-
   const handleSubmit = async (e) => {
     e.preventDefault();
     try {
@@ -226,11 +207,11 @@ const Customers = () => {
       <Card className="border-0 shadow-lg">
         <CardHeader>
           <CardTitle className="text-2xl" style={{ fontFamily: 'Space Grotesk' }}>
-            All Customers ({filteredCustomers.length})
+            All Customers ({customers.length}{customerList.hasMore ? '+' : ''})
           </CardTitle>
         </CardHeader>
         <CardContent>
-          {filteredCustomers.length === 0 ? (
+          {customers.length === 0 ? (
             <div className="text-center py-12">
               <User className="w-16 h-16 text-slate-300 mx-auto mb-4" />
               <p className="text-slate-500 text-lg">No customers found</p>
@@ -250,7 +231,7 @@ const Customers = () => {
                   </tr>
                 </thead>
                 <tbody>
-                  {filteredCustomers.map((customer) => (
+                  {customers.map((customer) => (
                     <tr key={customer.id}>
                       <td className="font-semibold text-blue-600">{customer.customer_number}</td>
                       <td className="font-medium">{customer.name}</td>
@@ -285,6 +266,7 @@ const Customers = () => {
               </table>
             </div>
           )}
+          <LoadMore list={customerList} label="customers" />
         </CardContent>
       </Card>
     </div>
@@ -1,5 +1,6 @@
 import { useState, useEffect } from 'react';
 import axios from 'axios';
+import { assetUrl } from '@/lib/utils';
 import { Card, CardContent, CardHeader, CardTitle } from '@/components/ui/card';
 import { Users, FileText, ClipboardList, DollarSign, TrendingUp, AlertCircle } from 'lucide-react';
 import { toast } from 'sonner';
@@ -26,33 +27,23 @@ const Dashboard = () => {
 
   const fetchDashboardData = async () => {
     try {
-      const [customersRes, invoicesRes, estimatesRes, settingsRes] = await Promise.all([
-        axios.get(`${API}/customers`),
-        axios.get(`${API}/invoices`),
-        axios.get(`${API}/estimates`),
+      const [statsRes, settingsRes] = await Promise.all([
+        axios.get(`${API}/dashboard/stats`),
         axios.get(`${API}/settings`)
       ]);
 
-      const customers = customersRes.data;
-      const invoices = invoicesRes.data;
-      const estimates = estimatesRes.data;
-
-      const unpaid = invoices.filter(inv => inv.status === 'unpaid').length;
-      const totalRev = invoices
-        .filter(inv => inv.status === 'paid')
-        .reduce((sum, inv) => sum + inv.total, 0);
-      const pending = estimates.filter(est => est.status === 'pending').length;
+      const data = statsRes.data;
 
       setStats({
-        totalCustomers: customers.length,
-        totalInvoices: invoices.length,
-        totalEstimates: estimates.length,
-        unpaidInvoices: unpaid,
-        totalRevenue: totalRev,
-        pendingEstimates: pending
+        totalCustomers: data.total_customers,
+        totalInvoices: data.total_invoices,
+        totalEstimates: data.total_estimates,
+        unpaidInvoices: data.unpaid_invoices,
+        totalRevenue: data.total_revenue,
+        pendingEstimates: data.pending_estimates
       });
 
-      setRecentInvoices(invoices.slice(0, 5));
+      setRecentInvoices(data.recent_invoices);
       setSettings(settingsRes.data);
     } catch (error) {
       toast.error('Failed to load dashboard data');
@@ -123,7 +114,7 @@ const Dashboard = () => {
             <div className="flex items-center gap-6">
               {settings.logo && (
                 <img
-                  src={settings.logo}
+                  src={assetUrl(settings.logo)}
                   alt={settings.company_name}
                   className="h-20 w-auto object-contain"
                 />
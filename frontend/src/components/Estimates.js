@@ -1,25 +1,26 @@
 import { useState, useEffect } from 'react';
 import axios from 'axios';
+import { assetUrl } from '@/lib/utils';
 import { Button } from '@/components/ui/button';
 import { Input } from '@/components/ui/input';
 import { Label } from '@/components/ui/label';
 import { Card, CardContent, CardHeader, CardTitle } from '@/components/ui/card';
 import { Dialog, DialogContent, DialogDescription, DialogHeader, DialogTitle } from '@/components/ui/dialog';
-import { Select, SelectContent, SelectItem, SelectTrigger, SelectValue } from '@/components/ui/select';
 import { toast } from 'sonner';
 import { Plus, ClipboardList, Eye, Trash2, Search, ArrowRight } from 'lucide-react';
 import ErrorBoundary from './ErrorBoundary';
+import LoadMore from './LoadMore';
+import SuggestSelect from './SuggestSelect';
+import { usePagedList } from '@/hooks/use-paged-list';
 
 const BACKEND_URL = process.env.REACT_APP_BACKEND_URL;
 const API = `${BACKEND_URL}/api`;
 
 const Estimates = () => {
-  const [estimates, setEstimates] = useState([]);
-  const [filteredEstimates, setFilteredEstimates] = useState([]);
-  const [customers, setCustomers] = useState([]);
-  const [services, setServices] = useState([]);
   const [settings, setSettings] = useState(null);
   const [searchTerm, setSearchTerm] = useState('');
+  const estimateList = usePagedList(`${API}/estimates`, { q: searchTerm.trim() || undefined });
+  const estimates = estimateList.rows;
   const [loading, setLoading] = useState(true);
   const [createDialogOpen, setCreateDialogOpen] = useState(false);
   const [viewDialogOpen, setViewDialogOpen] = useState(false);
@@ -34,6 +35,7 @@ const Estimates = () => {
   });
   const [currentItem, setCurrentItem] = useState({
     service_id: '',
+    service: null,
     quantity: 1,
     price: 0
   });
@@ -42,22 +44,12 @@ const Estimates = () => {
     fetchData();
   }, []);
 
-  useEffect(() => {
-    filterEstimates();
-  }, [searchTerm, estimates]);
-
   const fetchData = async () => {
     try {
-      const [estimatesRes, customersRes, servicesRes, settingsRes] = await Promise.all([
-        axios.get(`${API}/estimates`),
-        axios.get(`${API}/customers`),
-        axios.get(`${API}/services`),
+      const [, settingsRes] = await Promise.all([
+        estimateList.reload(),
         axios.get(`${API}/settings`)
       ]);
-      setEstimates(estimatesRes.data);
-      setFilteredEstimates(estimatesRes.data);
-      setCustomers(customersRes.data);
-      setServices(servicesRes.data);
       setSettings(settingsRes.data);
     } catch (error) {
       toast.error('Failed to load data');
@@ -66,25 +58,12 @@ const Estimates = () => {
     }
   };
 
-  const filterEstimates = () => {
-    if (!searchTerm) {
-      setFilteredEstimates(estimates);
-      return;
-    }
-    const filtered = estimates.filter(
-      (estimate) =>
-        estimate.estimate_number.toLowerCase().includes(searchTerm.toLowerCase()) ||
-        estimate.customer_name.toLowerCase().includes(searchTerm.toLowerCase())
-    );
-    setFilteredEstimates(filtered);
-  };
-
   const addItem = () => {
     if (!currentItem.service_id) {
       toast.error('Please select a service');
       return;
     }
-    const service = services.find((s) => s.id === currentItem.service_id);
+    const service = currentItem.service;
     const price = currentItem.price || service.price;
     const total = currentItem.quantity * price;
 
@@ -98,7 +77,7 @@ const Estimates = () => {
     };
 
     setFormData({ ...formData, items: [...formData.items, item] });
-    setCurrentItem({ service_id: '', quantity: 1, price: 0 });
+    setCurrentItem({ service_id: '', service: null, quantity: 1, price: 0 });
   };
 
   const removeItem = (index) => {
@@ -163,7 +142,7 @@ const Estimates = () => {
       notes: '',
       vat_rate: 20
     });
-    setCurrentItem({ service_id: '', quantity: 1, price: 0 });
+    setCurrentItem({ service_id: '', service: null, quantity: 1, price: 0 });
   };
 
   const viewEstimate = (estimate) => {
@@ -223,11 +202,11 @@ const Estimates = () => {
       <Card className="border-0 shadow-lg">
         <CardHeader>
           <CardTitle className="text-2xl" style={{ fontFamily: 'Space Grotesk' }}>
-            All Estimates ({filteredEstimates.length})
+            All Estimates ({estimates.length}{estimateList.hasMore ? '+' : ''})
           </CardTitle>
         </CardHeader>
         <CardContent>
-          {filteredEstimates.length === 0 ? (
+          {estimates.length === 0 ? (
             <div className="text-center py-12">
               <ClipboardList className="w-16 h-16 text-slate-300 mx-auto mb-4" />
               <p className="text-slate-500 text-lg">No estimates found</p>
@@ -247,7 +226,7 @@ const Estimates = () => {
                   </tr>
                 </thead>
                 <tbody>
-                  {filteredEstimates.map((estimate) => (
+                  {estimates.map((estimate) => (
                     <tr key={estimate.id}>
                       <td className="font-semibold text-purple-600">{estimate.estimate_number}</td>
                       <td>{estimate.customer_name}</td>
@@ -297,6 +276,7 @@ const Estimates = () => {
               </table>
             </div>
           )}
+          <LoadMore list={estimateList} label="estimates" />
         </CardContent>
       </Card>
 
@@ -314,22 +294,13 @@ const Estimates = () => {
               <div className="space-y-2">
                 <Label>Customer *</Label>
                 <ErrorBoundary>
-                  <Select value={formData.customer_id} onValueChange={(value) => setFormData({ ...formData, customer_id: value })}>
-                    <SelectTrigger data-testid="estimate-customer-select">
-                      <SelectValue placeholder="Select customer" />
-                    </SelectTrigger>
-                    <SelectContent>
-                      {customers && customers.length > 0 ? (
-                        customers.map((customer) => (
-                          <SelectItem key={customer.id} value={customer.id}>
-                            {customer.name} ({customer.customer_number})
-                          </SelectItem>
-                        ))
-                      ) : (
-                        <div className="p-2 text-sm text-slate-500">No customers available</div>
-                      )}
-                    </SelectContent>
-                  </Select>
+                  <SuggestSelect
+                    collection="customers"
+                    onSelect={(customer) => setFormData({ ...formData, customer_id: customer.id })}
+                    getLabel={(customer) => `${customer.name} (${customer.customer_number})`}
+                    placeholder="Search customers"
+                    testId="estimate-customer-select"
+                  />
                 </ErrorBoundary>
               </div>
               <div className="space-y-2">
@@ -372,25 +343,16 @@ const Estimates = () => {
               <div className="grid grid-cols-12 gap-2">
                 <div className="col-span-5">
                   <ErrorBoundary>
-                    <Select value={currentItem.service_id} onValueChange={(value) => {
-                      const service = services.find(s => s.id === value);
-                      setCurrentItem({ ...currentItem, service_id: value, price: service?.price || 0 });
-                    }}>
-                      <SelectTrigger data-testid="estimate-service-select">
-                        <SelectValue placeholder="Select service" />
-                      </SelectTrigger>
-                      <SelectContent>
-                        {services && services.length > 0 ? (
-                          services.map((service) => (
-                            <SelectItem key={service.id} value={service.id}>
-                              {service.name} (£{service.price.toFixed(2)})
-                            </SelectItem>
-                          ))
-                        ) : (
-                          <div className="p-2 text-sm text-slate-500">No services available</div>
-                        )}
-                      </SelectContent>
-                    </Select>
+                    <SuggestSelect
+                      // Remounted once the item is added, which clears the search
+                      key={formData.items.length}
+                      collection="services"
+                      onSelect={(service) => setCurrentItem({ ...currentItem, service_id: service.id, service, price: service.price })}
+                      getLabel={(service) => service.name}
+                      renderItem={(service) => `${service.name} (£${service.price.toFixed(2)})`}
+                      placeholder="Search services"
+                      testId="estimate-service-select"
+                    />
                   </ErrorBoundary>
                 </div>
                 <div className="col-span-2">
@@ -502,7 +464,7 @@ const Estimates = () => {
                   <div className="flex items-start gap-4">
                     {settings.logo && (
                       <img
-                        src={settings.logo}
+                        src={assetUrl(settings.logo)}
                         alt={settings.company_name}
                         className="h-16 w-auto object-contain"
                       />
@@ -1,25 +1,26 @@
 import { useState, useEffect } from 'react';
 import axios from 'axios';
+import { assetUrl } from '@/lib/utils';
 import { Button } from '@/components/ui/button';
 import { Input } from '@/components/ui/input';
 import { Label } from '@/components/ui/label';
 import { Card, CardContent, CardHeader, CardTitle } from '@/components/ui/card';
 import { Dialog, DialogContent, DialogDescription, DialogHeader, DialogTitle } from '@/components/ui/dialog';
-import { Select, SelectContent, SelectItem, SelectTrigger, SelectValue } from '@/components/ui/select';
 import { toast } from 'sonner';
 import { Plus, FileText, Eye, Trash2, Search, DollarSign, CheckCircle, XCircle } from 'lucide-react';
 import ErrorBoundary from './ErrorBoundary';
+import LoadMore from './LoadMore';
+import SuggestSelect from './SuggestSelect';
+import { usePagedList } from '@/hooks/use-paged-list';
 
 const BACKEND_URL = process.env.REACT_APP_BACKEND_URL;
 const API = `${BACKEND_URL}/api`;
 
 const Invoices = () => {
-  const [invoices, setInvoices] = useState([]);
-  const [filteredInvoices, setFilteredInvoices] = useState([]);
-  const [customers, setCustomers] = useState([]);
-  const [services, setServices] = useState([]);
   const [settings, setSettings] = useState(null);
   const [searchTerm, setSearchTerm] = useState('');
+  const invoiceList = usePagedList(`${API}/invoices`, { q: searchTerm.trim() || undefined });
+  const invoices = invoiceList.rows;
   const [loading, setLoading] = useState(true);
   const [createDialogOpen, setCreateDialogOpen] = useState(false);
   const [viewDialogOpen, setViewDialogOpen] = useState(false);
@@ -34,6 +35,7 @@ const Invoices = () => {
   });
   const [currentItem, setCurrentItem] = useState({
     service_id: '',
+    service: null,
     quantity: 1,
     price: 0
   });
@@ -42,22 +44,12 @@ const Invoices = () => {
     fetchData();
   }, []);
 
-  useEffect(() => {
-    filterInvoices();
-  }, [searchTerm, invoices]);
-
   const fetchData = async () => {
     try {
-      const [invoicesRes, customersRes, servicesRes, settingsRes] = await Promise.all([
-        axios.get(`${API}/invoices`),
-        axios.get(`${API}/customers`),
-        axios.get(`${API}/services`),
+      const [, settingsRes] = await Promise.all([
+        invoiceList.reload(),
         axios.get(`${API}/settings`)
       ]);
-      setInvoices(invoicesRes.data);
-      setFilteredInvoices(invoicesRes.data);
-      setCustomers(customersRes.data);
-      setServices(servicesRes.data);
       setSettings(settingsRes.data);
     } catch (error) {
       toast.error('Failed to load data');
@@ -66,25 +58,12 @@ const Invoices = () => {
     }
   };
 
-  const filterInvoices = () => {
-    if (!searchTerm) {
-      setFilteredInvoices(invoices);
-      return;
-    }
-    const filtered = invoices.filter(
-      (invoice) =>
-        invoice.invoice_number.toLowerCase().includes(searchTerm.toLowerCase()) ||
-        invoice.customer_name.toLowerCase().includes(searchTerm.toLowerCase())
-    );
-    setFilteredInvoices(filtered);
-  };
-
   const addItem = () => {
     if (!currentItem.service_id) {
       toast.error('Please select a service');
       return;
     }
-    const service = services.find((s) => s.id === currentItem.service_id);
+    const service = currentItem.service;
     const price = currentItem.price || service.price;
     const total = currentItem.quantity * price;
 
@@ -98,7 +77,7 @@ const Invoices = () => {
     };
 
     setFormData({ ...formData, items: [...formData.items, item] });
-    setCurrentItem({ service_id: '', quantity: 1, price: 0 });
+    setCurrentItem({ service_id: '', service: null, quantity: 1, price: 0 });
   };
 
   const removeItem = (index) => {
@@ -161,7 +140,7 @@ const Invoices = () => {
       notes: '',
       vat_rate: 20
     });
-    setCurrentItem({ service_id: '', quantity: 1, price: 0 });
+    setCurrentItem({ service_id: '', service: null, quantity: 1, price: 0 });
   };
 
   const viewInvoice = (invoice) => {
@@ -221,11 +200,11 @@ const Invoices = () => {
       <Card className="border-0 shadow-lg">
         <CardHeader>
           <CardTitle className="text-2xl" style={{ fontFamily: 'Space Grotesk' }}>
-            All Invoices ({filteredInvoices.length})
+            All Invoices ({invoices.length}{invoiceList.hasMore ? '+' : ''})
           </CardTitle>
         </CardHeader>
         <CardContent>
-          {filteredInvoices.length === 0 ? (
+          {invoices.length === 0 ? (
             <div className="text-center py-12">
               <FileText className="w-16 h-16 text-slate-300 mx-auto mb-4" />
               <p className="text-slate-500 text-lg">No invoices found</p>
@@ -245,7 +224,7 @@ const Invoices = () => {
                   </tr>
                 </thead>
                 <tbody>
-                  {filteredInvoices.map((invoice) => (
+                  {invoices.map((invoice) => (
                     <tr key={invoice.id}>
                       <td className="font-semibold text-blue-600">{invoice.invoice_number}</td>
                       <td>{invoice.customer_name}</td>
@@ -306,6 +285,7 @@ const Invoices = () => {
               </table>
             </div>
           )}
+          <LoadMore list={invoiceList} label="invoices" />
         </CardContent>
       </Card>
 
@@ -323,22 +303,13 @@ const Invoices = () => {
               <div className="space-y-2">
                 <Label>Customer *</Label>
                 <ErrorBoundary>
-                  <Select value={formData.customer_id} onValueChange={(value) => setFormData({ ...formData, customer_id: value })}>
-                    <SelectTrigger data-testid="invoice-customer-select">
-                      <SelectValue placeholder="Select customer" />
-                    </SelectTrigger>
-                    <SelectContent>
-                      {customers && customers.length > 0 ? (
-                        customers.map((customer) => (
-                          <SelectItem key={customer.id} value={customer.id}>
-                            {customer.name} ({customer.customer_number})
-                          </SelectItem>
-                        ))
-                      ) : (
-                        <div className="p-2 text-sm text-slate-500">No customers available</div>
-                      )}
-                    </SelectContent>
-                  </Select>
+                  <SuggestSelect
+                    collection="customers"
+                    onSelect={(customer) => setFormData({ ...formData, customer_id: customer.id })}
+                    getLabel={(customer) => `${customer.name} (${customer.customer_number})`}
+                    placeholder="Search customers"
+                    testId="invoice-customer-select"
+                  />
                 </ErrorBoundary>
               </div>
               <div className="space-y-2">
@@ -381,25 +352,16 @@ const Invoices = () => {
               <div className="grid grid-cols-12 gap-2">
                 <div className="col-span-5">
                   <ErrorBoundary>
-                    <Select value={currentItem.service_id} onValueChange={(value) => {
-                      const service = services.find(s => s.id === value);
-                      setCurrentItem({ ...currentItem, service_id: value, price: service?.price || 0 });
-                    }}>
-                      <SelectTrigger data-testid="invoice-service-select">
-                        <SelectValue placeholder="Select service" />
-                      </SelectTrigger>
-                      <SelectContent>
-                        {services && services.length > 0 ? (
-                          services.map((service) => (
-                            <SelectItem key={service.id} value={service.id}>
-                              {service.name} (£{service.price.toFixed(2)})
-                            </SelectItem>
-                          ))
-                        ) : (
-                          <div className="p-2 text-sm text-slate-500">No services available</div>
-                        )}
-                      </SelectContent>
-                    </Select>
+                    <SuggestSelect
+                      // Remounted once the item is added, which clears the search
+                      key={formData.items.length}
+                      collection="services"
+                      onSelect={(service) => setCurrentItem({ ...currentItem, service_id: service.id, service, price: service.price })}
+                      getLabel={(service) => service.name}
+                      renderItem={(service) => `${service.name} (£${service.price.toFixed(2)})`}
+                      placeholder="Search services"
+                      testId="invoice-service-select"
+                    />
                   </ErrorBoundary>
                 </div>
                 <div className="col-span-2">
@@ -511,7 +473,7 @@ const Invoices = () => {
                   <div className="flex items-start gap-4">
                     {settings.logo && (
                       <img
-                        src={settings.logo}
+                        src={assetUrl(settings.logo)}
                         alt={settings.company_name}
                         className="h-16 w-auto object-contain"
                       />
@@ -0,0 +1,25 @@
+import { Button } from '@/components/ui/button';
+import { toast } from 'sonner';
+
+// Footer for a usePagedList table: fetches the next page on demand
+const LoadMore = ({ list, label = 'rows' }) => {
+  if (!list.hasMore) return null;
+
+  const handleClick = async () => {
+    try {
+      await list.loadMore();
+    } catch (error) {
+      toast.error(`Failed to load more ${label}`);
+    }
+  };
+
+  return (
+    <div className="flex justify-center pt-6">
+      <Button variant="outline" onClick={handleClick} disabled={list.loadingMore} data-testid={`load-more-${label}`}>
+        {list.loadingMore ? 'Loading...' : `Load more ${label}`}
+      </Button>
+    </div>
+  );
+};
+
+export default LoadMore;
@@ -1,5 +1,6 @@
 import { useState, useEffect } from 'react';
 import axios from 'axios';
+import { usePagedList } from '@/hooks/use-paged-list';
 import { Button } from '@/components/ui/button';
 import { Input } from '@/components/ui/input';
 import { Label } from '@/components/ui/label';
@@ -7,14 +8,15 @@ import { Card, CardContent, CardHeader, CardTitle } from '@/components/ui/card';
 import { Dialog, DialogContent, DialogDescription, DialogHeader, DialogTitle, DialogTrigger } from '@/components/ui/dialog';
 import { toast } from 'sonner';
 import { Plus, Edit, Trash2, Wrench, Search } from 'lucide-react';
+import LoadMore from './LoadMore';
 
 const BACKEND_URL = process.env.REACT_APP_BACKEND_URL;
 const API = `${BACKEND_URL}/api`;
 
 const Services = () => {
-  const [services, setServices] = useState([]);
-  const [filteredServices, setFilteredServices] = useState([]);
   const [searchTerm, setSearchTerm] = useState('');
+  const serviceList = usePagedList(`${API}/services`, { q: searchTerm.trim() || undefined });
+  const services = serviceList.rows;
   const [loading, setLoading] = useState(true);
   const [dialogOpen, setDialogOpen] = useState(false);
   const [editingService, setEditingService] = useState(null);
@@ -28,15 +30,9 @@ const Services = () => {
     fetchServices();
   }, []);
 
-  useEffect(() => {
-    filterServices();
-  }, [searchTerm, services]);
-
   const fetchServices = async () => {
     try {
-      const response = await axios.get(`${API}/services`);
-      setServices(response.data);
-      setFilteredServices(response.data);
+      await serviceList.reload();
     } catch (error) {
       toast.error('Failed to load services');
     } finally {
@@ -44,18 +40,6 @@ const Services = () => {
     }
   };
 
-  const filterServices = () => {
-    if (!searchTerm) {
-      setFilteredServices(services);
-      return;
-    }
-    const filtered = services.filter((service) =>
-      service.name.toLowerCase().includes(searchTerm.toLowerCase()) ||
-      service.description?.toLowerCase().includes(searchTerm.toLowerCase())
-    );
-    setFilteredServices(filtered);
-  };
-
   const handleSubmit = async (e) => {
     e.preventDefault();
     try {
@@ -215,7 +199,7 @@ const Services = () => {
 
       {/* Services Grid */}
       <div className="grid grid-cols-1 md:grid-cols-2 lg:grid-cols-3 gap-6">
-        {filteredServices.length === 0 ? (
+        {services.length === 0 ? (
           <Card className="col-span-full border-0 shadow-lg">
             <CardContent className="py-12">
               <div className="text-center">
@@ -226,7 +210,7 @@ const Services = () => {
             </CardContent>
           </Card>
         ) : (
-          filteredServices.map((service) => (
+          services.map((service) => (
             <Card key={service.id} className="border-0 shadow-lg card-hover">
               <CardHeader className="pb-3">
                 <div className="flex items-start justify-between">
@@ -270,6 +254,7 @@ const Services = () => {
           ))
         )}
       </div>
+      <LoadMore list={serviceList} label="services" />
     </div>
   );
 };
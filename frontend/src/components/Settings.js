@@ -1,5 +1,6 @@
 import { useState, useEffect } from 'react';
 import axios from 'axios';
+import { assetUrl } from '@/lib/utils';
 import { Button } from '@/components/ui/button';
 import { Input } from '@/components/ui/input';
 import { Label } from '@/components/ui/label';
@@ -134,7 +135,7 @@ const Settings = ({ user }) => {
             {settings.logo && (
               <div className="flex justify-center">
                 <img
-                  src={settings.logo}
+                  src={assetUrl(settings.logo)}
                   alt="Company Logo"
                   className="max-w-xs max-h-32 object-contain border rounded-lg p-4 bg-white"
                 />
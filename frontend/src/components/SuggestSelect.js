@@ -0,0 +1,83 @@
+import { useEffect, useState } from 'react';
+import axios from 'axios';
+import { Input } from '@/components/ui/input';
+
+const BACKEND_URL = process.env.REACT_APP_BACKEND_URL;
+const API = `${BACKEND_URL}/api`;
+
+// Typeahead over /{collection}/suggest: matches are fetched as the user types,
+// so a picker never has to load the whole collection up front
+const SuggestSelect = ({ collection, onSelect, getLabel, renderItem = getLabel, placeholder, testId }) => {
+  const [query, setQuery] = useState('');
+  const [matches, setMatches] = useState(null);
+  const [open, setOpen] = useState(false);
+
+  useEffect(() => {
+    const prefix = query.trim();
+    if (!open || !prefix) {
+      setMatches(null);
+      return;
+    }
+    let cancelled = false;
+    const timer = setTimeout(async () => {
+      try {
+        const response = await axios.get(`${API}/${collection}/suggest`, { params: { prefix } });
+        if (!cancelled) setMatches(response.data);
+      } catch (error) {
+        if (!cancelled) setMatches([]);
+      }
+    }, 200);
+    return () => {
+      cancelled = true;
+      clearTimeout(timer);
+    };
+  }, [collection, query, open]);
+
+  const handleSelect = (doc) => {
+    onSelect(doc);
+    setQuery(getLabel(doc));
+    setOpen(false);
+  };
+
+  return (
+    <div className="relative">
+      <Input
+        value={query}
+        placeholder={placeholder}
+        className="bg-white"
+        data-testid={testId}
+        onChange={(e) => {
+          setQuery(e.target.value);
+          setOpen(true);
+        }}
+        onFocus={() => setOpen(true)}
+        onBlur={() => setOpen(false)}
+      />
+      {open && query.trim() && (
+        <div className="absolute z-50 mt-1 w-full max-h-60 overflow-y-auto rounded-md border bg-white shadow-lg">
+          {matches === null ? (
+            <div className="p-2 text-sm text-slate-500">Searching...</div>
+          ) : matches.length === 0 ? (
+            <div className="p-2 text-sm text-slate-500">No matches</div>
+          ) : (
+            matches.map((doc) => (
+              <button
+                type="button"
+                key={doc.id}
+                className="w-full px-3 py-2 text-left text-sm hover:bg-slate-100"
+                // Keep focus on the input so its blur does not close the list before the click lands
+                onMouseDown={(e) => e.preventDefault()}
+                onClick={() => handleSelect(doc)}
+                data-testid={`${testId}-option-${doc.id}`}
+              >
+                {renderItem(doc)}
+              </button>
+            ))
+          )}
+        </div>
+      )}
+    </div>
+  );
+};
+
+export default SuggestSelect;
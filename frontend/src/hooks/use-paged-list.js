@@ -0,0 +1,61 @@
+import { useCallback, useEffect, useRef, useState } from 'react';
+import axios from 'axios';
+import { toast } from 'sonner';
+
+// One page of a keyset-paginated list endpoint at a time. reload() fetches the
+// first page again; loadMore() appends the next one by following the
+// X-Next-Cursor header, so memory grows only as far as the user scrolls.
+// params (e.g. { q, certificate_type }) are filters applied by the server; when
+// they change the first page is fetched again after a short debounce.
+export function usePagedList(url, params = {}, pageSize = 50) {
+  const [rows, setRows] = useState([]);
+  const [cursor, setCursor] = useState(null);
+  const [loadingMore, setLoadingMore] = useState(false);
+  const paramsKey = JSON.stringify(params);
+  // Bumped by every reload so a slow response for old filters is dropped
+  const generation = useRef(0);
+
+  const fetchPage = useCallback(async (after) => {
+    const response = await axios.get(url, {
+      params: { ...JSON.parse(paramsKey), limit: pageSize, ...(after ? { cursor: after } : {}) }
+    });
+    return { page: response.data, next: response.headers['x-next-cursor'] || null };
+  }, [url, paramsKey, pageSize]);
+
+  const reload = useCallback(async () => {
+    const current = ++generation.current;
+    const { page, next } = await fetchPage(null);
+    if (current !== generation.current) return;
+    setRows(page);
+    setCursor(next);
+  }, [fetchPage]);
+
+  const loadMore = useCallback(async () => {
+    if (!cursor) return;
+    const current = generation.current;
+    setLoadingMore(true);
+    try {
+      const { page, next } = await fetchPage(cursor);
+      if (current !== generation.current) return;
+      setRows((previous) => [...previous, ...page]);
+      setCursor(next);
+    } finally {
+      setLoadingMore(false);
+    }
+  }, [cursor, fetchPage]);
+
+  // The owning screen does the first load itself; after that, reload on filter changes
+  const mounted = useRef(false);
+  useEffect(() => {
+    if (!mounted.current) {
+      mounted.current = true;
+      return;
+    }
+    const timer = setTimeout(() => {
+      reload().catch(() => toast.error('Failed to load results'));
+    }, 300);
+    return () => clearTimeout(timer);
+  }, [reload]);
+
+  return { rows, reload, loadMore, hasMore: Boolean(cursor), loadingMore };
+}
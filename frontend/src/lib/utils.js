@@ -4,3 +4,12 @@ import { twMerge } from "tailwind-merge"
 export function cn(...inputs) {
   return twMerge(clsx(inputs));
 }
+
+// Asset references come back as backend-relative /api/assets/{id} paths;
+// inline data URLs and absolute URLs are passed through untouched.
+export function assetUrl(value) {
+  if (value && value.startsWith('/api/')) {
+    return `${process.env.REACT_APP_BACKEND_URL}${value}`;
+  }
+  return value;
+}